@@ -2,6 +2,7 @@ import gzip
 import os
 import pathlib
 import pickle
+import tracemalloc
 from typing import List
 
 from succinct.string_index import StringIndex
@@ -34,7 +35,12 @@ def my_func(input_file_path: pathlib.Path) -> None:
         pickle.dump(lines, f)
     size = os.path.getsize(f.name)
     print(f"\tGzipped size: {size}")
+    tracemalloc.start()
     idx = StringIndex(lines)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num_chars = sum(len(line) for line in lines)
+    print(f"\tPeak construction memory: {peak} ({peak / max(1, num_chars):.1f} bytes per character)")
 
     with open(out_idx, 'wb') as f:
         pickle.dump(idx, f)
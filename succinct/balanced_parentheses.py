@@ -0,0 +1,453 @@
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from bitarray import bitarray
+from typing_extensions import Final
+
+from succinct.louds import LoudsBinaryTree, LoudsOrdinalTree
+from succinct.packed_int_array import PackedIntArray
+from succinct.poppy import Poppy
+
+
+BLOCK_SIZE: Final = 256
+
+
+def _byte_tables() -> "Tuple[array[int], array[int]]":
+    """
+    For each byte, the excess (opening minus closing parentheses) of its 8
+    bits, and the minimum excess of its nonempty prefixes. Bits are read from
+    the most significant one, as in `Poppy`.
+    """
+    excesses = array('b')
+    minimums = array('b')
+    for byte in range(256):
+        excess = 0
+        minimum = 8
+        for shift in reversed(range(8)):
+            excess += 1 if (byte >> shift) & 1 else -1
+            minimum = min(minimum, excess)
+        excesses.append(excess)
+        minimums.append(minimum)
+    return excesses, minimums
+
+
+_BYTE_EXCESS, _BYTE_MIN = _byte_tables()
+
+
+class BalancedParenthesesTree:
+    """
+    Balanced parentheses (BP) representation of an ordinal tree, as described
+    in Chapter 8.2 of "Compact Data Structures". A depth-first traversal writes
+    a 1 ("(") when it enters a node and a 0 (")") when it leaves it, for 2n
+    bits in a `Poppy`.
+
+    Nodes are identified by their preorder rank, with the root being 0. Node i
+    is opened at position `select(i)`. The excess of a position is the number
+    of 1s minus the number of 0s up to and including it, so the node opened at
+    position p has depth excess(p) - 1.
+
+    Navigation reduces to searching for the next (or previous) position whose
+    excess drops to a target value. A range min-max tree keeps the minimum
+    excess of every block of 256 bits and of every range of blocks (as a
+    segment tree), so that such searches only scan the bits of at most two
+    blocks, using per-byte tables.
+    """
+    def __init__(self, bit_array: bitarray) -> None:
+        """
+        Builds the tree from its parentheses, which must describe a single
+        tree.
+        """
+        self._size = len(bit_array)
+        if self._size < 2:
+            raise ValueError("A tree must have at least one node")
+        self._bits = bit_array
+        self._poppy = Poppy(bit_array)
+        self._memory_view = memoryview(bit_array)
+        self._block_size = BLOCK_SIZE
+
+        # A single tree is a sequence whose excess only drops to zero at the
+        # very end.
+        min_excess, _ = self._scan_min(0, self._size - 1, 0)
+        if min_excess < 1 or self._excess(self._size - 1) != 0:
+            raise ValueError("The bit array is not a balanced parentheses sequence of a tree")
+
+        num_blocks = -(-self._size // self._block_size)
+        block_mins: List[int] = []
+        block_end_excesses: List[int] = []
+        excess = 0
+        for block in range(num_blocks):
+            start = block * self._block_size
+            block_min, excess = self._scan_min(start, min(start + self._block_size, self._size), excess)
+            block_mins.append(block_min)
+            block_end_excesses.append(excess)
+        self._block_end_excesses = PackedIntArray(block_end_excesses)
+
+        # A segment tree of minimums over the blocks. Missing leaves hold a
+        # value that no search targets.
+        num_leaves = 1
+        while num_leaves < num_blocks:
+            num_leaves *= 2
+        sentinel = self._size
+        mins = [sentinel] * num_leaves + block_mins + [sentinel] * (num_leaves - num_blocks)
+        for node in reversed(range(1, num_leaves)):
+            mins[node] = min(mins[2 * node], mins[2 * node + 1])
+        self._num_leaves = num_leaves
+        self._mins = PackedIntArray(mins)
+
+    @classmethod
+    def from_parents(cls, parents: Sequence[int]) -> "Tuple[BalancedParenthesesTree, PackedIntArray]":
+        """
+        Builds the tree given the parent of each node, with -1 for the root.
+        The children of a node are ordered by their position in `parents`.
+
+        Returns the tree along with the preorder of the nodes, i.e., the
+        position in `parents` of the node with each identifier.
+        """
+        louds, level_order = LoudsOrdinalTree.from_parents(parents)
+        tree, louds_ids, _ = cls.from_louds(louds)
+        return tree, PackedIntArray(level_order.get_many(louds_ids))
+
+    @classmethod
+    def from_louds(
+        cls,
+        louds: Union[LoudsBinaryTree, LoudsOrdinalTree]
+    ) -> "Tuple[BalancedParenthesesTree, PackedIntArray, PackedIntArray]":
+        """
+        Builds the tree with the same topology as a LOUDS tree. (The children
+        of a binary tree node are kept in order, but whether an only child is
+        a left or a right child is not.)
+
+        Returns the tree, the LOUDS identifier of each node, and the
+        identifier of the node with each LOUDS identifier.
+        """
+        if isinstance(louds, LoudsOrdinalTree):
+            degrees = louds.degrees()
+            # The children of node v are the nodes in [first_children[v],
+            # first_children[v + 1]).
+            first_children = list(accumulate([1] + degrees))
+
+        bits = bitarray()
+        louds_ids: List[int] = []
+        # Negative entries mark where a node is left.
+        stack = [louds.get_root()]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                bits.append(False)
+                continue
+            bits.append(True)
+            louds_ids.append(node)
+            stack.append(-1)
+            if isinstance(louds, LoudsOrdinalTree):
+                stack.extend(reversed(range(first_children[node], first_children[node + 1])))
+            else:
+                for child in (louds.get_right_child(node), louds.get_left_child(node)):
+                    if child is not None:
+                        stack.append(child)
+
+        preorder_ids = [0] * len(louds_ids)
+        for preorder_id, louds_id in enumerate(louds_ids):
+            preorder_ids[louds_id] = preorder_id
+        return cls(bits), PackedIntArray(louds_ids), PackedIntArray(preorder_ids)
+
+    def __len__(self) -> int:
+        return self._size // 2
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state['_memory_view']
+        return state
+
+    def __setstate__(self, d: Dict[str, Any]) -> None:
+        self.__dict__ = d
+        self._memory_view = memoryview(self._bits)
+
+    def _check_node(self, i: int) -> None:
+        if not (0 <= i < len(self)):
+            raise IndexError(f"Node out of bounds: {i}")
+
+    def _check_open(self, p: int) -> None:
+        if not (0 <= p < self._size):
+            raise IndexError(f"Index out of bounds: {p}")
+        if not self._bits[p]:
+            raise ValueError(f"Position {p} is not an opening parenthesis")
+
+    def _excess(self, p: int) -> int:
+        if p < 0:
+            return 0
+        return 2 * self._poppy.rank(p) - p - 1
+
+    def _scan_min(self, start: int, end: int, excess: int) -> Tuple[int, int]:
+        """
+        Returns the minimum excess in positions [start, end), along with the
+        excess at end - 1, given the excess at start - 1.
+        """
+        bits, memory_view = self._bits, self._memory_view
+        minimum = self._size
+        p = start
+        while p < end and p % 8:
+            excess += 1 if bits[p] else -1
+            minimum = min(minimum, excess)
+            p += 1
+        while p + 8 <= end:
+            byte = memory_view[p >> 3]
+            minimum = min(minimum, excess + _BYTE_MIN[byte])
+            excess += _BYTE_EXCESS[byte]
+            p += 8
+        while p < end:
+            excess += 1 if bits[p] else -1
+            minimum = min(minimum, excess)
+            p += 1
+        return minimum, excess
+
+    def _scan_forward(self, start: int, end: int, excess: int, target: int) -> int:
+        """
+        Returns the first position in [start, end) whose excess is at most
+        `target`, or -1, given the excess at start - 1.
+        """
+        bits, memory_view = self._bits, self._memory_view
+        p = start
+        while p < end and p % 8:
+            excess += 1 if bits[p] else -1
+            if excess <= target:
+                return p
+            p += 1
+        while p + 8 <= end:
+            byte = memory_view[p >> 3]
+            if excess + _BYTE_MIN[byte] <= target:
+                break
+            excess += _BYTE_EXCESS[byte]
+            p += 8
+        while p < end:
+            excess += 1 if bits[p] else -1
+            if excess <= target:
+                return p
+            p += 1
+        return -1
+
+    def _scan_backward(self, start: int, end: int, excess: int, target: int) -> int:
+        """
+        Returns the last position in [start, end) whose excess is at most
+        `target`, or -1, given the excess at end - 1.
+        """
+        bits, memory_view = self._bits, self._memory_view
+        p = end - 1
+        while p >= start and (p + 1) % 8:
+            if excess <= target:
+                return p
+            excess -= 1 if bits[p] else -1
+            p -= 1
+        while p - 7 >= start:
+            byte = memory_view[(p - 7) >> 3]
+            excess_before = excess - _BYTE_EXCESS[byte]
+            if excess_before + _BYTE_MIN[byte] <= target:
+                break
+            excess = excess_before
+            p -= 8
+        while p >= start:
+            if excess <= target:
+                return p
+            excess -= 1 if bits[p] else -1
+            p -= 1
+        return -1
+
+    def _next_block(self, block: int, target: int) -> int:
+        """
+        Returns the first block after `block` whose minimum excess is at most
+        `target`, or -1.
+        """
+        mins = self._mins
+        node = self._num_leaves + block
+        while node > 1:
+            if node % 2 == 0 and mins[node + 1] <= target:
+                node += 1
+                while node < self._num_leaves:
+                    node = 2 * node if mins[2 * node] <= target else 2 * node + 1
+                return node - self._num_leaves
+            node //= 2
+        return -1
+
+    def _previous_block(self, block: int, target: int) -> int:
+        """
+        Returns the last block before `block` whose minimum excess is at most
+        `target`, or -1.
+        """
+        mins = self._mins
+        node = self._num_leaves + block
+        while node > 1:
+            if node % 2 == 1 and mins[node - 1] <= target:
+                node -= 1
+                while node < self._num_leaves:
+                    node = 2 * node + 1 if mins[2 * node + 1] <= target else 2 * node
+                return node - self._num_leaves
+            node //= 2
+        return -1
+
+    def _forward_search(self, p: int, target: int) -> int:
+        """
+        Returns the first position after p whose excess is at most `target`,
+        or -1.
+        """
+        block_size = self._block_size
+        block = p // block_size
+        block_end = min((block + 1) * block_size, self._size)
+        q = self._scan_forward(p + 1, block_end, self._excess(p), target)
+        if q != -1:
+            return q
+        block = self._next_block(block, target)
+        if block == -1:
+            return -1
+        start = block * block_size
+        return self._scan_forward(
+            start,
+            min(start + block_size, self._size),
+            self._block_end_excesses[block - 1],
+            target
+        )
+
+    def _backward_search(self, p: int, target: int) -> int:
+        """
+        Returns the last position before p whose excess is at most `target`.
+        If there is none, -1 is returned, which (having excess 0) is the
+        answer whenever `target` is nonnegative.
+        """
+        block_size = self._block_size
+        block = p // block_size
+        q = self._scan_backward(block * block_size, p, self._excess(p - 1), target)
+        if q != -1:
+            return q
+        block = self._previous_block(block, target)
+        if block == -1:
+            return -1
+        start = block * block_size
+        return self._scan_backward(
+            start,
+            start + block_size,
+            self._block_end_excesses[block],
+            target
+        )
+
+    def _range_min(self, p: int, q: int) -> int:
+        """
+        Returns the minimum excess in positions [p, q].
+        """
+        block_size = self._block_size
+        first_block, last_block = p // block_size, q // block_size
+        if first_block == last_block:
+            return self._scan_min(p, q + 1, self._excess(p - 1))[0]
+
+        minimum, _ = self._scan_min(p, (first_block + 1) * block_size, self._excess(p - 1))
+        last_start = last_block * block_size
+        last_min, _ = self._scan_min(last_start, q + 1, self._block_end_excesses[last_block - 1])
+        minimum = min(minimum, last_min)
+
+        # The blocks strictly in between, bottom-up through the segment tree.
+        mins = self._mins
+        left = self._num_leaves + first_block + 1
+        right = self._num_leaves + last_block
+        while left < right:
+            if left % 2 == 1:
+                minimum = min(minimum, mins[left])
+                left += 1
+            if right % 2 == 1:
+                right -= 1
+                minimum = min(minimum, mins[right])
+            left //= 2
+            right //= 2
+        return minimum
+
+    def find_close(self, p: int) -> int:
+        """
+        Returns the position of the parenthesis that closes the one opened at
+        position p.
+        """
+        self._check_open(p)
+        return self._forward_search(p, self._excess(p) - 1)
+
+    def enclose(self, p: int) -> int:
+        """
+        Returns the position of the opening parenthesis of the pair that most
+        tightly encloses the one opened at position p, or -1 for the root.
+        """
+        self._check_open(p)
+        if p == 0:
+            return -1
+        return self._backward_search(p, self._excess(p) - 2) + 1
+
+    def _node_at(self, p: int) -> int:
+        return self._poppy.rank(p) - 1
+
+    def _open(self, i: int) -> int:
+        self._check_node(i)
+        return self._poppy.select(i)
+
+    def get_root(self) -> int:
+        return 0
+
+    def parent(self, i: int) -> Optional[int]:
+        p = self._open(i)
+        if p == 0:
+            return None
+        return self._node_at(self.enclose(p))
+
+    def depth(self, i: int) -> int:
+        """
+        Returns the depth of node i, with the root at depth 0.
+        """
+        return self._excess(self._open(i)) - 1
+
+    def subtree_size(self, i: int) -> int:
+        """
+        Returns the number of nodes in the subtree rooted at node i, including
+        node i itself.
+        """
+        p = self._open(i)
+        return (self.find_close(p) - p + 1) // 2
+
+    def is_leaf(self, i: int) -> bool:
+        return not self._bits[self._open(i) + 1]
+
+    def first_child(self, i: int) -> Optional[int]:
+        return None if self.is_leaf(i) else i + 1
+
+    def next_sibling(self, i: int) -> Optional[int]:
+        q = self.find_close(self._open(i)) + 1
+        if q >= self._size or not self._bits[q]:
+            return None
+        return self._node_at(q)
+
+    def is_ancestor(self, i: int, j: int) -> bool:
+        """
+        Returns whether node i is an ancestor of node j (or node j itself).
+        """
+        self._check_node(j)
+        return i <= j < i + self.subtree_size(i)
+
+    def level_ancestor(self, i: int, d: int) -> Optional[int]:
+        """
+        Returns the ancestor of node i that is d levels above it, or None if
+        node i has depth less than d.
+        """
+        p = self._open(i)
+        excess = self._excess(p)
+        if not (0 <= d < excess):
+            return None
+        if d == 0:
+            return i
+        return self._node_at(self._backward_search(p, excess - d - 1) + 1)
+
+    def lca(self, i: int, j: int) -> int:
+        """
+        Returns the lowest common ancestor of nodes i and j.
+        """
+        if i > j:
+            i, j = j, i
+        p, q = self._open(i), self._open(j)
+        if q <= self.find_close(p):
+            return i
+        # The leftmost minimum in between closes a child of the LCA, and is
+        # followed by the opening of another one.
+        minimum = self._range_min(p, q)
+        m = self._forward_search(p, minimum)
+        return self._node_at(self.enclose(m + 1))
@@ -0,0 +1,241 @@
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+from typing_extensions import Protocol
+
+from bitarray import bitarray
+
+from succinct.compressed_runs_bit_array import CompressedRunsBitArray
+from succinct.elias_fano_bit_array import EliasFanoBitArray
+from succinct.poppy import Poppy
+from succinct.rle_bit_array import RunLengthEncodedBitArray
+from succinct.rrr_bit_array import (
+    BLOCK_SIZE,
+    CLASS_WIDTH,
+    SUPERBLOCK_SIZE,
+    RRRBitArray,
+    block_entropy_bits
+)
+
+
+class BitVector(Protocol):
+    """
+    The operations shared by every bit array representation in this package.
+
+    - `rank(i)` and `rank_zero(i)` count the 1 (resp. 0) bits up to and
+      including position `i`.
+
+    - `select(rank)` and `select_zero(rank_zero)` return the position of the
+      bit with the given (zero-based) rank, or -1 if no such bit exists.
+
+    Representations whose queries are slow one at a time may also answer
+    batches with `rank_many(positions)`, `select_many(ranks)`, and
+    `select_zero_many(ranks_zero)`, which `Permutation` uses when present.
+    """
+    def __len__(self) -> int:
+        pass
+
+    def __getitem__(self, key: int) -> bool:
+        pass
+
+    def rank(self, i: int) -> int:
+        pass
+
+    def rank_zero(self, i: int) -> int:
+        pass
+
+    def select(self, rank: int) -> int:
+        pass
+
+    def select_zero(self, rank_zero: int) -> int:
+        pass
+
+
+BitVectorFactory = Callable[[bitarray], BitVector]
+
+
+@dataclass(frozen=True)
+class BitArrayStatistics:
+    """
+    Summary statistics of a bit array that drive the choice of representation.
+    """
+    size: int
+    num_ones: int
+    num_runs: int
+    num_one_runs: int
+    block_entropy_bits: int
+
+    @property
+    def num_zeros(self) -> int:
+        return self.size - self.num_ones
+
+    @property
+    def num_zero_runs(self) -> int:
+        return self.num_runs - self.num_one_runs
+
+    @classmethod
+    def from_bit_array(cls, bit_array: bitarray) -> "BitArrayStatistics":
+        size = len(bit_array)
+        if size == 0:
+            return cls(size=0, num_ones=0, num_runs=0, num_one_runs=0, block_entropy_bits=0)
+
+        head = bit_array[:-1]
+        tail = bit_array[1:]
+        num_runs = 1 + (head ^ tail).count()
+        num_one_runs = int(bit_array[0]) + (tail & ~head).count()
+        return cls(
+            size=size,
+            num_ones=bit_array.count(),
+            num_runs=num_runs,
+            num_one_runs=num_one_runs,
+            block_entropy_bits=block_entropy_bits(bit_array)
+        )
+
+
+@dataclass(frozen=True)
+class BitVectorCandidate:
+    """
+    A representation that could be used for a particular bit array, along with
+    its estimated size (in bits) and its estimated cost per rank/select query
+    (in units of "one Poppy query").
+    """
+    name: str
+    size_in_bits: float
+    query_cost: float
+    factory: BitVectorFactory
+
+
+BitVectorPolicy = Callable[[BitVectorCandidate], float]
+
+
+def minimize_space(candidate: BitVectorCandidate) -> float:
+    return candidate.size_in_bits
+
+
+def minimize_query_cost(candidate: BitVectorCandidate) -> float:
+    return candidate.query_cost
+
+
+def _optimal_num_lower_bits(num_values: int, universe: int) -> int:
+    if num_values == 0 or universe <= num_values:
+        return 0
+    return int(math.floor(math.log2(universe / num_values)))
+
+
+def _poppy_bits(size: int) -> float:
+    # Poppy pads its input to a multiple of 64 bits and spends ~4% on top of
+    # that for its rank and select structures.
+    return 64 * math.ceil(size / 64) * 1.04
+
+
+def _elias_fano_bits(num_values: int, universe: int, num_lower_bits: int) -> float:
+    if num_values == 0:
+        return 0
+    upper_bits = num_values + (universe >> num_lower_bits) + 1
+    return num_values * num_lower_bits + _poppy_bits(upper_bits)
+
+
+def candidates(stats: BitArrayStatistics) -> List[BitVectorCandidate]:
+    """
+    Returns every representation that could hold a bit array with the given
+    statistics, with its estimated cost.
+    """
+    n = stats.size
+
+    ef_lower_bits = _optimal_num_lower_bits(stats.num_ones, n)
+
+    # CompressedRunsBitArray stores the run starts of the 0 bits and of the 1
+    # bits as two Elias-Fano bit arrays, sharing one `num_lower_bits`.
+    runs_lower_bits = _optimal_num_lower_bits(stats.num_runs + 2, n + 2)
+
+    def _elias_fano_factory(bit_array: bitarray) -> BitVector:
+        return EliasFanoBitArray(bit_array, num_lower_bits=ef_lower_bits)
+
+    def _compressed_runs_factory(bit_array: bitarray) -> BitVector:
+        return CompressedRunsBitArray(bit_array, num_lower_bits=runs_lower_bits)
+
+    return [
+        BitVectorCandidate(
+            name="poppy",
+            size_in_bits=_poppy_bits(n),
+            query_cost=1.0,
+            factory=Poppy
+        ),
+        BitVectorCandidate(
+            name="elias_fano",
+            size_in_bits=_elias_fano_bits(stats.num_ones, n, ef_lower_bits),
+            query_cost=1.0 + math.log2(stats.num_ones + 1),
+            factory=_elias_fano_factory
+        ),
+        BitVectorCandidate(
+            name="compressed_runs",
+            size_in_bits=(
+                _elias_fano_bits(stats.num_zero_runs + 1, stats.num_zeros + 1, runs_lower_bits) +
+                _elias_fano_bits(stats.num_one_runs + 1, stats.num_ones + 1, runs_lower_bits)
+            ),
+            query_cost=(1.0 + math.log2(stats.num_runs + 1)) ** 2,
+            factory=_compressed_runs_factory
+        ),
+        BitVectorCandidate(
+            name="run_length_encoded",
+            # A start, a length, and a prefix sum for each run of 1 bits.
+            size_in_bits=3 * stats.num_one_runs * max(1, n.bit_length()),
+            # `rank` binary searches the runs; `select` binary searches `rank`.
+            query_cost=(1.0 + math.log2(stats.num_one_runs + 1)) * (1.0 + math.log2(n + 1)),
+            factory=RunLengthEncodedBitArray
+        ),
+        BitVectorCandidate(
+            name="rrr",
+            size_in_bits=(
+                stats.block_entropy_bits +
+                CLASS_WIDTH * math.ceil(n / BLOCK_SIZE) +
+                # 16-bit rank and offset samples per superblock.
+                32 * math.ceil(n / SUPERBLOCK_SIZE)
+            ),
+            # Decodes up to a superblock's worth of classes per query.
+            query_cost=4.0,
+            factory=RRRBitArray
+        ),
+    ]
+
+
+def choose_bit_vector(
+    bit_array: bitarray,
+    *,
+    policy: BitVectorPolicy = minimize_space
+) -> BitVectorCandidate:
+    """
+    Measures the density and the run structure of `bit_array` and returns the
+    candidate representation that minimizes `policy`. Ties are broken in favor
+    of the candidate with the cheaper queries.
+    """
+    stats = BitArrayStatistics.from_bit_array(bit_array)
+    scored: List[Tuple[float, float, int, BitVectorCandidate]] = [
+        (policy(candidate), candidate.query_cost, i, candidate)
+        for i, candidate in enumerate(candidates(stats))
+    ]
+    return min(scored)[-1]
+
+
+def make_bit_vector(
+    bit_array: bitarray,
+    *,
+    policy: BitVectorPolicy = minimize_space
+) -> BitVector:
+    """
+    Builds the representation of `bit_array` chosen by `choose_bit_vector`.
+    """
+    return choose_bit_vector(bit_array, policy=policy).factory(bit_array)
+
+
+class AdaptiveBitVectorFactory:
+    """
+    A `BitVectorFactory` that picks a representation for each bit array it is
+    given, according to `policy`. Pass an instance of this class wherever a
+    data structure accepts a `bit_vector_factory`.
+    """
+    def __init__(self, policy: BitVectorPolicy = minimize_space) -> None:
+        self._policy = policy
+
+    def __call__(self, bit_array: bitarray) -> BitVector:
+        return make_bit_vector(bit_array, policy=self._policy)
@@ -1,10 +1,92 @@
-from typing import Iterator, Optional
+from itertools import zip_longest
+from typing import Callable, Iterable, Iterator, List, Optional
+from typing_extensions import Final
 
 from bitarray import bitarray
 
 from succinct.elias_fano_bit_array import EliasFanoBitArray
 
 
+def _run_lengths(run_starts: bitarray) -> List[int]:
+    """
+    Returns the gaps between the 1 bits of a bit array that marks the start
+    of each run (and the end of the last one) with a 1.
+    """
+    positions = list(run_starts.search(bitarray('1')))
+    return [stop - start for start, stop in zip(positions, positions[1:])]
+
+
+SCAN_LIMIT: Final = 16
+
+
+class _RunStartCursor:
+    """
+    Reads the positions of the 1 bits of an `EliasFanoBitArray` by rank, for
+    ranks that mostly increase by a little at a time: nearby ranks are reached
+    by decoding forward from the previous one, and others with a `select`.
+    The position before the current one is kept as well, so that looking one
+    rank ahead and then back does not start over.
+    """
+    def __init__(self, bits: EliasFanoBitArray) -> None:
+        self._bits = bits
+        self._rank = -1
+        self._position = -1
+        self._previous_position = -1
+        self._positions = bits.select_from(0)
+
+    def __getitem__(self, rank: int) -> int:
+        if rank == self._rank - 1:
+            return self._previous_position
+        if not (self._rank <= rank <= self._rank + SCAN_LIMIT):
+            start = max(rank - 1, 0)
+            self._positions = self._bits.select_from(start)
+            self._rank = start - 1
+        while self._rank < rank:
+            self._previous_position = self._position
+            self._position = next(self._positions)
+            self._rank += 1
+        return self._position
+
+
+def _advance(
+    read: Callable[[int], int],
+    search: Callable[[int, int, int], int],
+    low: int,
+    high: int,
+    target: int
+) -> int:
+    """
+    Returns the largest j in [low, high) with f(j) <= target, for an increasing
+    f with f(low) <= target, where `read` computes f for nearby j, one at a
+    time, and `search(low, high, target)` takes over after `SCAN_LIMIT` steps.
+    """
+    for _ in range(SCAN_LIMIT):
+        if low + 1 >= high or read(low + 1) > target:
+            return low
+        low += 1
+    return search(low, high, target)
+
+
+def _gallop(f: Callable[[int], int], low: int, high: int, target: int) -> int:
+    """
+    Returns the largest j in [low, high) with f(j) <= target, for an increasing
+    f with f(low) <= target. The probes at low + 1, low + 3, low + 7, ... are
+    followed by a binary search, so that this takes O(log(j - low + 1)) calls.
+    """
+    step = 1
+    while low + step < high and f(low + step) <= target:
+        low += step
+        step *= 2
+    high = min(low + step, high)
+    while high - low > 1:
+        mid = (low + high) >> 1
+        if f(mid) <= target:
+            low = mid
+        else:
+            high = mid
+    return low
+
+
 class CompressedRunsBitArray:
     def __init__(
         self,
@@ -37,6 +119,8 @@ class CompressedRunsBitArray:
 
         zeros_bit_array.append(True)
         ones_bit_array.append(True)
+        self._num_zero_runs = zeros_bit_array.count() - 1
+        self._num_one_runs = ones_bit_array.count() - 1
 
         self._zeros_poppy = EliasFanoBitArray(zeros_bit_array, num_lower_bits=num_lower_bits)
         self._ones_poppy = EliasFanoBitArray(ones_bit_array, num_lower_bits=num_lower_bits)
@@ -49,8 +133,28 @@ class CompressedRunsBitArray:
         return len(self._zeros_poppy) + len(self._ones_poppy) - 2
 
     def __iter__(self) -> Iterator[bool]:
-        for i in range(len(self)):
-            yield self[i]
+        return map(bool, self.to_bitarray())
+
+    def to_bitarray(self) -> bitarray:
+        """
+        Decodes the whole bit array from the lengths of its runs, which
+        alternate between 1s and 0s, in a single pass over them.
+        """
+        result = bitarray()
+        if self._first_bit is None:
+            return result
+        one_run_lengths = _run_lengths(self._ones_poppy.to_bitarray())
+        zero_run_lengths = _run_lengths(self._zeros_poppy.to_bitarray())
+        if self._first_bit:
+            runs = zip_longest(one_run_lengths, zero_run_lengths, fillvalue=0)
+            first, second = bitarray('1'), bitarray('0')
+        else:
+            runs = zip_longest(zero_run_lengths, one_run_lengths, fillvalue=0)
+            first, second = bitarray('0'), bitarray('1')
+        for first_length, second_length in runs:
+            result.extend(first * first_length)
+            result.extend(second * second_length)
+        return result
 
     def __getitem__(self, i: int) -> bool:
         if self._first_bit is None:
@@ -94,17 +198,111 @@ class CompressedRunsBitArray:
         return low
 
     def select(self, rank: int) -> int:
-        if self._first_bit is None:
-            raise IndexError("CompressedRunsBitArray is empty.")
+        # Both Elias-Fano arrays end with a sentinel 1 bit.
+        if not (0 <= rank < len(self._ones_poppy) - 1):
+            return -1
         if self._first_bit:
             return rank + self._zeros_poppy.select(self._ones_poppy.rank(rank) - 1)
         else:
             return rank + self._zeros_poppy.select(self._ones_poppy.rank(rank))
 
     def select_zero(self, rank_zero: int) -> int:
-        if self._first_bit is None:
-            raise IndexError("CompressedRunsBitArray is empty.")
+        if not (0 <= rank_zero < len(self._zeros_poppy) - 1):
+            return -1
         if self._first_bit:
             return rank_zero + self._ones_poppy.select(self._zeros_poppy.rank(rank_zero))
         else:
             return rank_zero + self._ones_poppy.select(self._zeros_poppy.rank(rank_zero) - 1)
+
+    def _select_many(
+        self,
+        ranks: Iterable[int],
+        same: EliasFanoBitArray,
+        num_runs: int,
+        other: EliasFanoBitArray,
+        shift: int
+    ) -> List[int]:
+        """
+        Answers a batch of selects of one kind of bit, where `same` holds the
+        run starts of that kind of bit and `other` those of the other kind.
+        The ranks are visited in sorted order, and the run that holds each of
+        them is found by moving forward from the run of the previous one, or
+        with a `rank` on `same` when it is far ahead.
+        """
+        ranks = list(ranks)
+        results = [-1] * len(ranks)
+        num_bits = len(same) - 1
+        same_cursor = _RunStartCursor(same)
+        other_cursor = _RunStartCursor(other)
+
+        def search(low: int, high: int, rank: int) -> int:
+            return same.rank(rank) - 1
+
+        run = 0
+        for idx in sorted(range(len(ranks)), key=ranks.__getitem__):
+            rank = ranks[idx]
+            if 0 <= rank < num_bits:
+                run = _advance(same_cursor.__getitem__, search, run, num_runs, rank)
+                results[idx] = rank + other_cursor[run + shift]
+        return results
+
+    def select_many(self, ranks: Iterable[int]) -> List[int]:
+        """
+        Returns `select(rank)` for each of the given ranks.
+        """
+        return self._select_many(
+            ranks, self._ones_poppy, self._num_one_runs, self._zeros_poppy, 0 if self._first_bit else 1
+        )
+
+    def select_zero_many(self, ranks_zero: Iterable[int]) -> List[int]:
+        """
+        Returns `select_zero(rank_zero)` for each of the given ranks.
+        """
+        return self._select_many(
+            ranks_zero, self._zeros_poppy, self._num_zero_runs, self._ones_poppy, 1 if self._first_bit else 0
+        )
+
+    def rank_many(self, positions: Iterable[int]) -> List[int]:
+        """
+        Returns `rank(i)` for each of the given positions, which may also be -1
+        (for a rank of 0). The positions are visited in sorted order, moving
+        forward over the runs of 1 bits, rather than with a binary search over
+        `select` per position.
+        """
+        if self._first_bit is None:
+            raise IndexError("CompressedRunsBitArray is empty.")
+        positions = list(positions)
+        results = [0] * len(positions)
+        num_one_runs = self._num_one_runs
+        if num_one_runs == 0:
+            return results
+
+        shift = 0 if self._first_bit else 1
+        ones_cursor = _RunStartCursor(self._ones_poppy)
+        zeros_cursor = _RunStartCursor(self._zeros_poppy)
+        ones_select = self._ones_poppy.select
+        zeros_select = self._zeros_poppy.select
+
+        def run_start(run: int) -> int:
+            return ones_cursor[run] + zeros_cursor[run + shift]
+
+        def run_start_select(run: int) -> int:
+            return ones_select(run) + zeros_select(run + shift)
+
+        def search(low: int, high: int, i: int) -> int:
+            return _gallop(run_start_select, low, high, i)
+
+        run = 0
+        first_start = run_start(0)
+        for idx in sorted(range(len(positions)), key=positions.__getitem__):
+            i = positions[idx]
+            if i < first_start:
+                continue
+            run = _advance(run_start, search, run, num_one_runs, i)
+            # The cursors are at most one run past `run`, so these reads
+            # (in increasing order of rank) do not move them back.
+            ones = ones_cursor[run]
+            start = ones + zeros_cursor[run + shift]
+            next_ones = ones_cursor[run + 1]
+            results[idx] = ones + min(next_ones - ones, i - start + 1)
+        return results
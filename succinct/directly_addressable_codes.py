@@ -0,0 +1,156 @@
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from bitarray import bitarray
+
+from succinct.packed_int_array import WORD_SIZE, PackedIntArray
+from succinct.bit_vector import BitVector, BitVectorFactory
+from succinct.poppy import Poppy
+
+
+def _optimal_chunk_width(bit_lengths: "Counter[int]") -> int:
+    """
+    Returns the chunk width that minimizes the total size of the levels, given
+    a histogram of the bit lengths of the values.
+    """
+    max_bit_length = max(max(bit_lengths, default=1), 1)
+    best_width = min(max_bit_length, WORD_SIZE)
+    best_size = float("inf")
+    for width in range(1, best_width + 1):
+        size = 0.0
+        level = 0
+        while level * width < max_bit_length:
+            # The values that are still being decoded at this level.
+            num_values = sum(
+                count for bit_length, count in bit_lengths.items()
+                if bit_length > level * width or level == 0
+            )
+            is_last_level = (level + 1) * width >= max_bit_length
+            # Each chunk, plus a continuation bit (with Poppy's ~4% overhead)
+            # on every level but the last.
+            size += num_values * (width + (0 if is_last_level else 1.04))
+            level += 1
+        if size < best_size:
+            best_width, best_size = width, size
+    return best_width
+
+
+class DirectlyAddressableCodes:
+    """
+    "DACs: Bringing direct access to variable-length codes" by Brisaboa,
+    Ladra, and Navarro.
+
+    Stores an array of nonnegative integers whose values are mostly small,
+    with rare large ones (run lengths, string lengths, node sizes, ...). Each
+    value is cut into chunks of `chunk_width` bits, least significant first.
+    Level k holds the k-th chunk of every value that has more than k chunks,
+    along with a bit array (a `Poppy` unless another `bit_vector_factory` is
+    given) marking the values that continue on level k + 1. Accessing a value takes one rank per additional chunk, i.e.,
+    O(log(max value)) time.
+
+    Unlike `EliasFano`, the values need not be monotone. If no `chunk_width` is
+    given, the one that minimizes the total size is used.
+    """
+    def __init__(
+        self,
+        values: Iterable[int],
+        *,
+        chunk_width: Optional[int] = None,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> None:
+        if not isinstance(values, Sequence):
+            values = list(values)
+        for value in values:
+            if value < 0:
+                raise ValueError(f"The value '{value}' is negative")
+
+        if chunk_width is None:
+            chunk_width = _optimal_chunk_width(Counter(value.bit_length() for value in values))
+        self._chunk_width = chunk_width
+        self._size = len(values)
+
+        mask = (1 << chunk_width) - 1
+        self._chunks: List[PackedIntArray] = []
+        self._continues: List[BitVector] = []
+
+        current: Sequence[int] = values
+        while True:
+            self._chunks.append(
+                PackedIntArray((value & mask for value in current), width=chunk_width)
+            )
+            remaining = [value >> chunk_width for value in current]
+            continues = bitarray(value != 0 for value in remaining)
+            if not continues.any():
+                break
+            self._continues.append(bit_vector_factory(continues))
+            current = [value for value in remaining if value != 0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def chunk_width(self) -> int:
+        return self._chunk_width
+
+    @property
+    def num_levels(self) -> int:
+        return len(self._chunks)
+
+    def __getitem__(self, key: int) -> int:
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        value = 0
+        shift = 0
+        for level, chunks in enumerate(self._chunks):
+            value |= chunks[key] << shift
+            if level == len(self._continues) or not self._continues[level][key]:
+                break
+            key = self._continues[level].rank(key) - 1
+            shift += self._chunk_width
+        return value
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Decodes all of the values in order. Instead of a rank per chunk, this
+        keeps a cursor into each level.
+        """
+        iterators = [iter(chunks) for chunks in self._chunks]
+        positions = [0] * len(self._chunks)
+        for _ in range(self._size):
+            value = 0
+            shift = 0
+            level = 0
+            while True:
+                value |= next(iterators[level]) << shift
+                position = positions[level]
+                positions[level] += 1
+                if level == len(self._continues) or not self._continues[level][position]:
+                    break
+                level += 1
+                shift += self._chunk_width
+            yield value
+
+    def get_many(self, keys: Iterable[int]) -> List[int]:
+        """
+        Returns the values at the given positions, decoding them one level at
+        a time.
+        """
+        keys = list(keys)
+        for key in keys:
+            if not (0 <= key < self._size):
+                raise IndexError(f"Index out of bounds: {key}")
+
+        values = [0] * len(keys)
+        pending = list(range(len(keys)))
+        shift = 0
+        for level, chunks in enumerate(self._chunks):
+            for idx in pending:
+                values[idx] |= chunks[keys[idx]] << shift
+            if level == len(self._continues):
+                break
+            continues = self._continues[level]
+            pending = [idx for idx in pending if continues[keys[idx]]]
+            for idx in pending:
+                keys[idx] = continues.rank(keys[idx]) - 1
+            shift += self._chunk_width
+        return values
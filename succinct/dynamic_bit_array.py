@@ -0,0 +1,314 @@
+from typing import Iterator, List, Optional, Tuple, Union
+
+from bitarray import bitarray
+from bitarray.util import count_n
+from typing_extensions import Final
+
+from succinct.poppy import Poppy
+
+
+LEAF_CAPACITY: Final = 2048
+MAX_CHILDREN: Final = 32
+
+
+class _Leaf:
+    def __init__(self, bits: bitarray) -> None:
+        self.bits = bits
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def ones(self) -> int:
+        return self.bits.count()
+
+
+class _InnerNode:
+    """
+    Besides its children, an inner node records the number of bits and the
+    number of 1 bits below each child.
+    """
+    def __init__(self, children: "List[_Node]") -> None:
+        self.children = children
+        self.sizes = [len(child) for child in children]
+        self.ones_counts = [child.ones() for child in children]
+
+    def __len__(self) -> int:
+        return sum(self.sizes)
+
+    def ones(self) -> int:
+        return sum(self.ones_counts)
+
+    def child_at(self, i: int) -> Tuple[int, int, int]:
+        """
+        Returns the index of the child that contains position i, along with the
+        number of bits and 1 bits in the preceding children.
+        """
+        bits_before = 0
+        ones_before = 0
+        last = len(self.children) - 1
+        for child_idx, size in enumerate(self.sizes):
+            if i < bits_before + size or child_idx == last:
+                return child_idx, bits_before, ones_before
+            bits_before += size
+            ones_before += self.ones_counts[child_idx]
+        raise AssertionError("Unreachable")
+
+
+_Node = Union[_Leaf, _InnerNode]
+
+
+def _is_underfull(node: _Node) -> bool:
+    if isinstance(node, _Leaf):
+        return len(node.bits) < LEAF_CAPACITY // 4
+    return len(node.children) < MAX_CHILDREN // 4
+
+
+def _split(node: _Node) -> Tuple[_Node, _Node]:
+    if isinstance(node, _Leaf):
+        half = len(node.bits) // 2
+        return _Leaf(node.bits[:half]), _Leaf(node.bits[half:])
+    half = len(node.children) // 2
+    return _InnerNode(node.children[:half]), _InnerNode(node.children[half:])
+
+
+def _is_overfull(node: _Node) -> bool:
+    if isinstance(node, _Leaf):
+        return len(node.bits) > LEAF_CAPACITY
+    return len(node.children) > MAX_CHILDREN
+
+
+def _concatenate(left: _Node, right: _Node) -> _Node:
+    if isinstance(left, _Leaf) and isinstance(right, _Leaf):
+        return _Leaf(left.bits + right.bits)
+    assert isinstance(left, _InnerNode) and isinstance(right, _InnerNode)
+    return _InnerNode(left.children + right.children)
+
+
+class DynamicBitArray:
+    """
+    A bit array that supports `insert`, `delete`, and `set` in addition to
+    `rank`, `rank_zero`, `select`, and `select_zero`, all in O(log n) time.
+
+    The bits are stored in the leaves of a B-tree, in chunks of up to 2048 bits.
+    Each inner node has up to 32 children and keeps the number of bits and the
+    number of 1 bits below each of them. Call `freeze` to get a static `Poppy`
+    for read-heavy phases.
+    """
+    def __init__(self, bit_array: Optional[bitarray] = None) -> None:
+        if bit_array is None:
+            bit_array = bitarray()
+
+        # Bulk load: fill the leaves halfway so that they have room to grow.
+        step = LEAF_CAPACITY // 2
+        nodes: List[_Node] = [
+            _Leaf(bit_array[start:start + step])
+            for start in range(0, len(bit_array), step)
+        ] or [_Leaf(bitarray())]
+        while len(nodes) > 1:
+            step = MAX_CHILDREN // 2
+            nodes = [
+                _InnerNode(nodes[start:start + step])
+                for start in range(0, len(nodes), step)
+            ]
+        self._root = nodes[0]
+        self._size = len(bit_array)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[bool]:
+        for leaf in self._leaves(self._root):
+            yield from (bool(b) for b in leaf.bits)
+
+    def _leaves(self, node: _Node) -> Iterator[_Leaf]:
+        if isinstance(node, _Leaf):
+            yield node
+        else:
+            for child in node.children:
+                yield from self._leaves(child)
+
+    def to_bitarray(self) -> bitarray:
+        result = bitarray()
+        for leaf in self._leaves(self._root):
+            result.extend(leaf.bits)
+        return result
+
+    def freeze(self) -> Poppy:
+        """
+        Returns a static copy of this bit array.
+        """
+        return Poppy(self.to_bitarray())
+
+    def __getitem__(self, key: int) -> bool:
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        node = self._root
+        while isinstance(node, _InnerNode):
+            child_idx, bits_before, _ = node.child_at(key)
+            key -= bits_before
+            node = node.children[child_idx]
+        return bool(node.bits[key])
+
+    def __setitem__(self, key: int, bit: bool) -> None:
+        self.set(key, bit)
+
+    def set(self, i: int, bit: bool) -> None:
+        if not (0 <= i < self._size):
+            raise IndexError(f"Index out of bounds: {i}")
+        path: List[Tuple[_InnerNode, int]] = []
+        node = self._root
+        while isinstance(node, _InnerNode):
+            child_idx, bits_before, _ = node.child_at(i)
+            path.append((node, child_idx))
+            i -= bits_before
+            node = node.children[child_idx]
+
+        delta = int(bool(bit)) - node.bits[i]
+        node.bits[i] = bool(bit)
+        for inner_node, child_idx in path:
+            inner_node.ones_counts[child_idx] += delta
+
+    def append(self, bit: bool) -> None:
+        self.insert(self._size, bit)
+
+    def insert(self, i: int, bit: bool) -> None:
+        """
+        Inserts `bit` before position i.
+        """
+        if not (0 <= i <= self._size):
+            raise IndexError(f"Index out of bounds: {i}")
+        sibling = self._insert(self._root, i, bool(bit))
+        if sibling is not None:
+            self._root = _InnerNode([self._root, sibling])
+        self._size += 1
+
+    def _insert(self, node: _Node, i: int, bit: bool) -> Optional[_Node]:
+        """
+        Inserts the bit below `node`. If `node` overflows, it is split in two,
+        and the new right half is returned.
+        """
+        if isinstance(node, _Leaf):
+            node.bits.insert(i, bit)
+        else:
+            child_idx, bits_before, _ = node.child_at(i)
+            child = node.children[child_idx]
+            sibling = self._insert(child, i - bits_before, bit)
+            node.sizes[child_idx] += 1
+            node.ones_counts[child_idx] += bit
+            if sibling is not None:
+                node.sizes[child_idx] = len(child)
+                node.ones_counts[child_idx] = child.ones()
+                node.children.insert(child_idx + 1, sibling)
+                node.sizes.insert(child_idx + 1, len(sibling))
+                node.ones_counts.insert(child_idx + 1, sibling.ones())
+
+        if not _is_overfull(node):
+            return None
+        left, right = _split(node)
+        if isinstance(node, _Leaf):
+            assert isinstance(left, _Leaf)
+            node.bits = left.bits
+        else:
+            assert isinstance(left, _InnerNode)
+            node.children, node.sizes, node.ones_counts = left.children, left.sizes, left.ones_counts
+        return right
+
+    def delete(self, i: int) -> bool:
+        """
+        Removes the bit at position i and returns it.
+        """
+        if not (0 <= i < self._size):
+            raise IndexError(f"Index out of bounds: {i}")
+        bit = self._delete(self._root, i)
+        root = self._root
+        if isinstance(root, _InnerNode) and len(root.children) == 1:
+            self._root = root.children[0]
+        self._size -= 1
+        return bit
+
+    def __delitem__(self, key: int) -> None:
+        self.delete(key)
+
+    def _delete(self, node: _Node, i: int) -> bool:
+        if isinstance(node, _Leaf):
+            bit = bool(node.bits[i])
+            del node.bits[i]
+            return bit
+
+        child_idx, bits_before, _ = node.child_at(i)
+        child = node.children[child_idx]
+        bit = self._delete(child, i - bits_before)
+        node.sizes[child_idx] -= 1
+        node.ones_counts[child_idx] -= bit
+
+        if _is_underfull(child) and len(node.children) > 1:
+            self._rebalance(node, child_idx)
+        return bit
+
+    @staticmethod
+    def _rebalance(node: _InnerNode, child_idx: int) -> None:
+        """
+        Merges an underfull child with a neighbor, splitting the result again
+        if it is too large.
+        """
+        left_idx = child_idx - 1 if child_idx > 0 else child_idx
+        merged = _concatenate(node.children[left_idx], node.children[left_idx + 1])
+        replacement = list(_split(merged)) if _is_overfull(merged) else [merged]
+
+        node.children[left_idx:left_idx + 2] = replacement
+        node.sizes[left_idx:left_idx + 2] = [len(n) for n in replacement]
+        node.ones_counts[left_idx:left_idx + 2] = [n.ones() for n in replacement]
+
+    def rank(self, i: int) -> int:
+        """
+        Returns the number of 1 bits up to and including position i.
+        """
+        if not (0 <= i < self._size):
+            raise IndexError(f"Index out of bounds: {i}")
+        rank = 0
+        node = self._root
+        while isinstance(node, _InnerNode):
+            child_idx, bits_before, ones_before = node.child_at(i)
+            i -= bits_before
+            rank += ones_before
+            node = node.children[child_idx]
+        return rank + node.bits.count(1, 0, i + 1)
+
+    def rank_zero(self, i: int) -> int:
+        """
+        Returns the number of 0 bits up to and including position i.
+        """
+        return i - self.rank(i) + 1
+
+    def select(self, rank: int) -> int:
+        """
+        Returns the position of the 1-bit having the provided rank.
+        If no such bit exists, -1 is returned.
+        """
+        return self._select(rank, ones=True)
+
+    def select_zero(self, rank_zero: int) -> int:
+        """
+        Returns the position of the 0-bit having the provided rank.
+        If no such bit exists, -1 is returned.
+        """
+        return self._select(rank_zero, ones=False)
+
+    def _select(self, rank: int, *, ones: bool) -> int:
+        total = self._root.ones() if ones else self._size - self._root.ones()
+        if not (0 <= rank < total):
+            return -1
+
+        position = 0
+        node = self._root
+        while isinstance(node, _InnerNode):
+            for child_idx, size in enumerate(node.sizes):
+                count = node.ones_counts[child_idx] if ones else size - node.ones_counts[child_idx]
+                if rank < count:
+                    break
+                rank -= count
+                position += size
+            node = node.children[child_idx]
+
+        bits = node.bits if ones else ~node.bits
+        return position + count_n(bits, rank + 1) - 1
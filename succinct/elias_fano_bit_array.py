@@ -35,8 +35,18 @@ class EliasFanoBitArray:
         return self._size
 
     def __iter__(self) -> Iterator[bool]:
-        for i in range(len(self)):
-            yield self[i]
+        return map(bool, self.to_bitarray())
+
+    def to_bitarray(self) -> bitarray:
+        """
+        Decodes the whole bit array from the positions of the 1 bits, in order.
+        """
+        result = bitarray(self._size)
+        result.setall(False)
+        if self._one_bit_positions is not None:
+            for i in self._one_bit_positions:
+                result[i] = True
+        return result
 
     def __getitem__(self, i: int) -> bool:
         if self._one_bit_positions is None:
@@ -60,22 +70,7 @@ class EliasFanoBitArray:
     def rank(self, i: int) -> int:
         if self._one_bit_positions is None:
             return 0
-        low = 0
-        high = len(self._one_bit_positions) - 1
-
-        while low <= high:
-            mid = (low + high) >> 1
-            mid_val = self._one_bit_positions[mid]
-            if mid_val < i:
-                low = mid + 1
-            elif mid_val > i:
-                high = mid - 1
-            else:
-                return mid + 1
-
-        if mid >= 0:
-            return high + 1
-        raise ValueError(f"Unable to find a bit with rank {i}.")
+        return self._one_bit_positions.bisect_right(i)
 
     def rank_zero(self, i: int) -> int:
         return i - self.rank(i) + 1
@@ -86,6 +81,15 @@ class EliasFanoBitArray:
 
         return self._one_bit_positions[rank]
 
+    def select_from(self, rank: int) -> Iterator[int]:
+        """
+        Yields `select(rank)`, `select(rank + 1)`, ... for as long as there are
+        1 bits, decoding the positions sequentially.
+        """
+        if self._one_bit_positions is None:
+            return iter(())
+        return self._one_bit_positions.iter_from(rank)
+
     def select_zero(self, rank_zero: int) -> int:
         low = 0
         high = len(self) - 1
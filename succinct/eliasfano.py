@@ -81,6 +81,70 @@ class EliasFano:
     def __len__(self) -> int:
         return self._size
 
+    def bisect_right(self, value: int) -> int:
+        """
+        Returns the number of values that are at most `value`, i.e., where it
+        would be inserted to keep the values sorted, like `bisect.bisect_right`.
+        A `select_zero` on the upper bits skips the values whose upper bits are
+        smaller than those of `value`, and the few that share them are then
+        compared one at a time.
+        """
+        if value < 0:
+            return 0
+        num_lower_bits = self._num_lower_bits
+        high = value >> num_lower_bits
+        # Each value is a 1 in the upper bits, and the kth 0 ends the values
+        # whose upper bits are k.
+        if high == 0:
+            i = position = 0
+        else:
+            zero = self._upper_poppy.select_zero(high - 1)
+            if zero == -1:
+                return self._size
+            i = zero - (high - 1)
+            position = zero + 1
+        low = value & ((1 << num_lower_bits) - 1)
+        while i < self._size and self._upper_bits[position]:
+            if self._lower_bits is not None:
+                lower_offset = i * num_lower_bits
+                if int(self._lower_bits[lower_offset:lower_offset + num_lower_bits].to01(), 2) > low:
+                    break
+            i += 1
+            position += 1
+        return i
+
     def __iter__(self) -> Iterator[int]:
-        for i in range(self._size):
-            yield self[i]
+        """
+        Decodes the values in order with a single scan of the upper bits,
+        rather than a `select` per value.
+        """
+        num_lower_bits = self._num_lower_bits
+        for i, position in enumerate(self._upper_bits.search(bitarray('1'))):
+            if i == self._size:
+                break
+            if self._lower_bits is not None:
+                lower_offset = i * num_lower_bits
+                lower = int(self._lower_bits[lower_offset:lower_offset + num_lower_bits].to01(), 2)
+            else:
+                lower = 0
+            yield ((position - i) << num_lower_bits) | lower
+
+    def iter_from(self, start: int) -> Iterator[int]:
+        """
+        Decodes the values from index `start` onward, in order, with a single
+        `select` followed by a scan of the upper bits.
+        """
+        if not (0 <= start < self._size):
+            return
+        num_lower_bits = self._num_lower_bits
+        upper_bits = self._upper_bits
+        position = self._upper_poppy.select(start)
+        for i in range(start, self._size):
+            if i > start:
+                position = upper_bits.index(True, position + 1)
+            if self._lower_bits is not None:
+                lower_offset = i * num_lower_bits
+                lower = int(self._lower_bits[lower_offset:lower_offset + num_lower_bits].to01(), 2)
+            else:
+                lower = 0
+            yield ((position - i) << num_lower_bits) | lower
@@ -0,0 +1,226 @@
+import math
+from typing import Iterable, Iterator, Optional, Tuple
+
+from typing_extensions import Final
+
+from succinct.eliasfano import EliasFano
+
+
+BUCKET_SIZE: Final = 16
+
+
+def _write_varint(data: bytearray, value: int) -> None:
+    """
+    Appends `value` in LEB128 format: 7 bits per byte, least significant
+    first, with the high bit set on every byte but the last.
+    """
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Returns the LEB128 value at `pos` and the position after it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    length = 0
+    max_length = min(len(a), len(b))
+    while length < max_length and a[length] == b[length]:
+        length += 1
+    return length
+
+
+class FrontCodedDictionary:
+    """
+    A static dictionary of sorted strings (URLs, paths, ...) using bucketed
+    front coding, as described in Section 11.2.3 of "Compact Data Structures".
+
+    The keys are encoded in UTF-8 and split into buckets of `bucket_size`
+    consecutive keys. The first key of each bucket (its header) is stored in
+    full, and every other key as the length of the prefix it shares with the
+    key before it plus the remaining bytes, with lengths as varints. The
+    start of each bucket is recorded with `EliasFano`.
+
+    The id of a key is its position in the sorted order, so the keys with any
+    given prefix have consecutive ids. Lookups binary search over the bucket
+    headers and then decode at most one bucket.
+    """
+    def __init__(
+        self,
+        keys: Iterable[str],
+        *,
+        bucket_size: int = BUCKET_SIZE
+    ) -> None:
+        """
+        Builds the dictionary from keys in strictly increasing order.
+        """
+        if bucket_size < 1:
+            raise ValueError(f"The bucket size must be positive, not {bucket_size}")
+        self._bucket_size = bucket_size
+
+        data = bytearray()
+        bucket_offsets = []
+        previous: Optional[bytes] = None
+        size = 0
+        for key in keys:
+            encoded = key.encode('utf-8')
+            # UTF-8 preserves the order of code points.
+            if previous is not None and encoded <= previous:
+                raise ValueError(f"The keys are not in strictly increasing order: {previous!r}, {encoded!r}")
+            if size % bucket_size == 0:
+                bucket_offsets.append(len(data))
+                _write_varint(data, len(encoded))
+                data.extend(encoded)
+            else:
+                assert previous is not None
+                common_prefix_length = _common_prefix_length(previous, encoded)
+                _write_varint(data, common_prefix_length)
+                _write_varint(data, len(encoded) - common_prefix_length)
+                data.extend(encoded[common_prefix_length:])
+            previous = encoded
+            size += 1
+
+        self._size = size
+        self._data = bytes(data)
+        self._num_buckets = len(bucket_offsets)
+        self._num_lower_bits = max(0, int(math.log2(max(1, len(data)) / max(1, self._num_buckets))))
+        self._bucket_offsets = EliasFano(
+            iter(bucket_offsets),
+            num_values=self._num_buckets,
+            max_value=len(data),
+            num_lower_bits=self._num_lower_bits
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_range(0, self._size)
+
+    def __contains__(self, key: str) -> bool:
+        return self.locate(key) is not None
+
+    def size_in_bytes(self) -> int:
+        """
+        Returns the size of the encoded keys plus that of the Elias-Fano
+        bucket offsets.
+        """
+        num_upper_bits = self._num_buckets + (len(self._data) >> self._num_lower_bits) + 1
+        num_lower_bits = self._num_buckets * self._num_lower_bits
+        return len(self._data) + (num_upper_bits + num_lower_bits + 7) // 8
+
+    def _header(self, bucket: int) -> bytes:
+        length, pos = _read_varint(self._data, self._bucket_offsets[bucket])
+        return self._data[pos:pos + length]
+
+    def _decode_bucket(self, bucket: int) -> Iterator[bytes]:
+        """
+        Yields the keys of a bucket, in order.
+        """
+        data = self._data
+        length, pos = _read_varint(data, self._bucket_offsets[bucket])
+        key = data[pos:pos + length]
+        pos += length
+        yield key
+        for _ in range(min(self._bucket_size, self._size - bucket * self._bucket_size) - 1):
+            common_prefix_length, pos = _read_varint(data, pos)
+            suffix_length, pos = _read_varint(data, pos)
+            key = key[:common_prefix_length] + data[pos:pos + suffix_length]
+            pos += suffix_length
+            yield key
+
+    def extract(self, key_id: int) -> str:
+        """
+        Returns the key with the given id.
+        """
+        if not (0 <= key_id < self._size):
+            raise IndexError(f"Index out of bounds: {key_id}")
+        bucket, index = divmod(key_id, self._bucket_size)
+        for i, key in enumerate(self._decode_bucket(bucket)):
+            if i == index:
+                return key.decode('utf-8')
+        raise AssertionError("Unreachable")
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """
+        Yields the keys with ids in [start, stop), decoding each bucket in a
+        single pass.
+        """
+        start, stop = max(0, start), min(stop, self._size)
+        key_id = start
+        while key_id < stop:
+            bucket, index = divmod(key_id, self._bucket_size)
+            for i, key in enumerate(self._decode_bucket(bucket)):
+                if i >= index:
+                    yield key.decode('utf-8')
+                    key_id += 1
+                    if key_id == stop:
+                        return
+
+    def _lower_bound(self, encoded: bytes) -> Tuple[int, Optional[bytes]]:
+        """
+        Returns the number of keys less than `encoded`, i.e., the id of the
+        smallest key greater than or equal to it, along with that key (or None
+        if there is no such key).
+        """
+        # Find the first bucket whose header is at least `encoded`.
+        low, high = 0, self._num_buckets
+        while low < high:
+            mid = (low + high) // 2
+            if self._header(mid) < encoded:
+                low = mid + 1
+            else:
+                high = mid
+        if low == 0:
+            return 0, (self._header(0) if self._num_buckets > 0 else None)
+
+        # The answer is in the previous bucket, or is the header of the next one.
+        bucket = low - 1
+        for i, key in enumerate(self._decode_bucket(bucket)):
+            if key >= encoded:
+                return bucket * self._bucket_size + i, key
+        if low == self._num_buckets:
+            return self._size, None
+        return low * self._bucket_size, self._header(low)
+
+    def locate(self, key: str) -> Optional[int]:
+        """
+        Returns the id of the given key, or None if it is not in the
+        dictionary.
+        """
+        encoded = key.encode('utf-8')
+        key_id, found = self._lower_bound(encoded)
+        return key_id if found == encoded else None
+
+    def prefix_range(self, prefix: str) -> range:
+        """
+        Returns the (contiguous) ids of the keys that start with `prefix`.
+        """
+        encoded = prefix.encode('utf-8')
+        start, _ = self._lower_bound(encoded)
+        if not encoded:
+            return range(start, self._size)
+        # UTF-8 never uses the byte 0xFF, so the last byte can be incremented
+        # to get the smallest string after all those starting with `prefix`.
+        stop, _ = self._lower_bound(encoded[:-1] + bytes([encoded[-1] + 1]))
+        return range(start, stop)
+
+    def prefix_iter(self, prefix: str) -> Iterator[str]:
+        """
+        Yields the keys that start with `prefix`, in sorted order.
+        """
+        ids = self.prefix_range(prefix)
+        return self.iter_range(ids.start, ids.stop)
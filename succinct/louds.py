@@ -1,7 +1,9 @@
-import math
 from collections import deque
-from typing import Callable, Optional, TypeVar
+from itertools import accumulate, compress
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
 
+from succinct.bit_vector import BitVectorFactory
+from succinct.packed_int_array import PackedIntArray
 from succinct.poppy import Poppy
 
 from bitarray import bitarray
@@ -15,20 +17,26 @@ class LoudsBinaryTree:
         *,
         root: A,
         get_left_child: Callable[[A], Optional[A]],
-        get_right_child: Callable[[A], Optional[A]]
+        get_right_child: Callable[[A], Optional[A]],
+        bit_vector_factory: BitVectorFactory = Poppy
     ) -> None:
         queue = deque([root])
 
         self._bits = bitarray()
+        self._size = 1
         while queue:
             tree_node = queue.popleft()
             for child in [get_left_child(tree_node), get_right_child(tree_node)]:
                 if child is not None:
                     self._bits.append(True)
                     queue.append(child)
+                    self._size += 1
                 else:
                     self._bits.append(False)
-        self._poppy = Poppy(self._bits)
+        self._poppy = bit_vector_factory(self._bits)
+
+    def __len__(self) -> int:
+        return self._size
 
     def get_root(self) -> int:
         return 0
@@ -36,7 +44,16 @@ class LoudsBinaryTree:
     def get_parent(self, i: int) -> Optional[int]:
         if i == 0:
             return None
-        return math.floor(self._poppy.select(i - 1) / 2)
+        return self._poppy.select(i - 1) >> 1
+
+    def is_right_child(self, i: int) -> bool:
+        """
+        Returns whether node i is the right child of its parent. (The root is
+        not.)
+        """
+        if i == 0:
+            return False
+        return bool(self._poppy.select(i - 1) & 1)
 
     def get_left_child(self, i: int) -> Optional[int]:
         if not self._bits[2 * i]:
@@ -50,3 +67,262 @@ class LoudsBinaryTree:
 
     def is_leaf(self, i: int) -> bool:
         return not (self._bits[2 * i] or self._bits[2 * i + 1])
+
+    def level_order(self) -> Iterator[Tuple[int, Optional[int], Optional[int]]]:
+        """
+        Yields each node in level order along with its left and right children.
+        Since children are numbered in level order too, their ids come from a
+        running count of the children seen so far rather than from a rank per
+        node.
+        """
+        bits = self._bits
+        next_child = 1
+        for i in range(self._size):
+            left: Optional[int] = None
+            right: Optional[int] = None
+            if bits[2 * i]:
+                left = next_child
+                next_child += 1
+            if bits[2 * i + 1]:
+                right = next_child
+                next_child += 1
+            yield i, left, right
+
+    def parents(self, ids: Iterable[int]) -> List[Optional[int]]:
+        """
+        Returns the parent of each of the given nodes.
+        """
+        select = self._poppy.select
+        return [None if i == 0 else select(i - 1) >> 1 for i in ids]
+
+    def children(self, ids: Iterable[int]) -> List[Tuple[Optional[int], Optional[int]]]:
+        """
+        Returns the left and right children of each of the given nodes. Both
+        children share a single rank.
+        """
+        bits = self._bits
+        rank = self._poppy.rank
+        result: List[Tuple[Optional[int], Optional[int]]] = []
+        for i in ids:
+            left_bit, right_bit = bits[2 * i], bits[2 * i + 1]
+            if not (left_bit or right_bit):
+                result.append((None, None))
+                continue
+            ones = rank(2 * i + 1)
+            result.append((ones - right_bit if left_bit else None, ones if right_bit else None))
+        return result
+
+    def get_path(self, i: int) -> List[Tuple[int, bool]]:
+        """
+        Returns the nodes on the path from the root to node i, each paired with
+        whether it is a right child, using a single `select` per level.
+        """
+        path: List[Tuple[int, bool]] = []
+        select = self._poppy.select
+        while i != 0:
+            position = select(i - 1)
+            path.append((i, bool(position & 1)))
+            i = position >> 1
+        path.append((0, False))
+        path.reverse()
+        return path
+
+
+class LoudsOrdinalTree:
+    """
+    LOUDS representation of an ordinal tree (a tree whose nodes have any
+    number of ordered children), as described in Chapter 8.1 of "Compact Data
+    Structures". Each node is written in level order as its degree in unary
+    (d 1s followed by a 0), after a "10" prefix for a virtual super-root, for
+    about 2n bits plus the overhead of the bit array, which
+    `bit_vector_factory` builds (`Poppy` by default).
+
+    Nodes are identified by their level-order position, with the root being 0.
+    The children of a node have consecutive identifiers.
+    """
+    def __init__(
+        self,
+        degrees: Iterable[int],
+        *,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> None:
+        """
+        Builds the tree from the degrees of its nodes, listed in level order.
+        """
+        degrees = list(degrees)
+        if not degrees:
+            raise ValueError("A tree must have at least one node")
+        if sum(degrees) != len(degrees) - 1 or any(d < 0 for d in degrees):
+            raise ValueError("The degrees do not describe a tree")
+
+        num_nodes = len(degrees)
+        bits = bitarray(2 * num_nodes + 1)
+        bits.setall(True)
+        # Zero 0 ends the super-root, and zero k + 1 ends node k.
+        bits[1] = False
+        for node, ones_before in enumerate(accumulate(degrees)):
+            bits[ones_before + node + 2] = False
+
+        self._size = num_nodes
+        self._bits = bits
+        self._poppy = bit_vector_factory(bits)
+
+    @classmethod
+    def from_parents(
+        cls,
+        parents: Sequence[int],
+        *,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> "Tuple[LoudsOrdinalTree, PackedIntArray]":
+        """
+        Builds the tree given the parent of each node, with -1 for the root.
+        The children of a node are ordered by their position in `parents`.
+
+        Returns the tree along with the level order of the nodes, i.e., the
+        position in `parents` of the node with each identifier.
+        """
+        num_nodes = len(parents)
+        roots = [node for node, parent in enumerate(parents) if parent == -1]
+        if len(roots) != 1:
+            raise ValueError(f"Expected exactly one root, found {len(roots)}")
+
+        # Bucket the nodes by parent (a counting sort) to get the children of
+        # each node as a slice of a single list.
+        offsets = [0] * (num_nodes + 1)
+        for parent in parents:
+            if not (-1 <= parent < num_nodes):
+                raise ValueError(f"Invalid parent: {parent}")
+            if parent != -1:
+                offsets[parent + 1] += 1
+        offsets = list(accumulate(offsets))
+        targets = [0] * (num_nodes - 1)
+        cursors = offsets[:-1]
+        for node, parent in enumerate(parents):
+            if parent != -1:
+                targets[cursors[parent]] = node
+                cursors[parent] += 1
+
+        return cls._from_children(roots[0], offsets, targets, bit_vector_factory)
+
+    @classmethod
+    def from_adjacency(
+        cls,
+        adjacency: Iterable[Iterable[int]],
+        *,
+        root: int = 0,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> "Tuple[LoudsOrdinalTree, PackedIntArray]":
+        """
+        Builds the tree given the ordered children of each node.
+
+        Returns the tree along with the level order of the nodes, i.e., the
+        position in `adjacency` of the node with each identifier.
+        """
+        offsets = [0]
+        targets: List[int] = []
+        for children in adjacency:
+            targets.extend(children)
+            offsets.append(len(targets))
+        if not (0 <= root < len(offsets) - 1):
+            raise ValueError(f"Invalid root: {root}")
+        return cls._from_children(root, offsets, targets, bit_vector_factory)
+
+    @classmethod
+    def _from_children(
+        cls,
+        root: int,
+        offsets: List[int],
+        targets: List[int],
+        bit_vector_factory: BitVectorFactory
+    ) -> "Tuple[LoudsOrdinalTree, PackedIntArray]":
+        """
+        Traverses the tree in level order, where the children of node v are
+        `targets[offsets[v]:offsets[v + 1]]`.
+        """
+        num_nodes = len(offsets) - 1
+        order = [root]
+        degrees: List[int] = []
+        # `order` grows as it is traversed, like a queue.
+        for node in order:
+            start, end = offsets[node], offsets[node + 1]
+            degrees.append(end - start)
+            order.extend(targets[start:end])
+            if len(order) > num_nodes:
+                raise ValueError("The nodes do not form a tree")
+        if len(order) != num_nodes:
+            raise ValueError("Some nodes are not reachable from the root")
+        return cls(degrees, bit_vector_factory=bit_vector_factory), PackedIntArray(order)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _check_node(self, i: int) -> None:
+        if not (0 <= i < self._size):
+            raise IndexError(f"Node out of bounds: {i}")
+
+    def get_root(self) -> int:
+        return 0
+
+    def degree(self, i: int) -> int:
+        self._check_node(i)
+        return self._poppy.select_zero(i + 1) - self._poppy.select_zero(i) - 1
+
+    def is_leaf(self, i: int) -> bool:
+        return self.degree(i) == 0
+
+    def degrees(self) -> List[int]:
+        """
+        Returns the degrees of all of the nodes in level order, decoded in a
+        single pass rather than with two `select_zero` calls per node.
+        """
+        size = 2 * self._size + 1
+        zeros = list(compress(range(size), ~self._bits[:size]))
+        return [end - start - 1 for start, end in zip(zeros, zeros[1:])]
+
+    def children(self, i: int) -> range:
+        """
+        Returns the identifiers of the children of node i, which form a
+        contiguous range.
+        """
+        self._check_node(i)
+        start = self._poppy.select_zero(i)
+        end = self._poppy.select_zero(i + 1)
+        # The child ids are the ranks of the 1s in (start, end), less one for
+        # the super-root.
+        first_child = self._poppy.rank(start)
+        return range(first_child, first_child + end - start - 1)
+
+    def child(self, i: int, k: int) -> Optional[int]:
+        """
+        Returns the k-th (zero-based) child of node i, if it exists.
+        """
+        children = self.children(i)
+        if not (0 <= k < len(children)):
+            return None
+        return children[k]
+
+    def first_child(self, i: int) -> Optional[int]:
+        return self.child(i, 0)
+
+    def parent(self, i: int) -> Optional[int]:
+        self._check_node(i)
+        if i == 0:
+            return None
+        return self._poppy.rank_zero(self._poppy.select(i)) - 1
+
+    def child_rank(self, i: int) -> int:
+        """
+        Returns the position of node i among the children of its parent. The
+        root has child rank 0.
+        """
+        self._check_node(i)
+        if i == 0:
+            return 0
+        position = self._poppy.select(i)
+        return position - self._poppy.select_zero(self._poppy.rank_zero(position) - 1) - 1
+
+    def next_sibling(self, i: int) -> Optional[int]:
+        self._check_node(i)
+        if i == 0 or not self._poppy[self._poppy.select(i) + 1]:
+            return None
+        return i + 1
@@ -0,0 +1,302 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from bitarray import bitarray
+from typing_extensions import Final
+
+from succinct.bit_vector import BitVectorFactory
+from succinct.packed_int_array import PackedIntArray
+from succinct.poppy import Poppy
+
+
+TERMINATOR: Final = '\0'
+
+
+class LoudsTrie:
+    """
+    A static trie mapping string keys to integer ids, encoded as in the
+    LOUDS-Sparse layer of "SuRF: Practical Range Query Filtering with Fast
+    Succinct Tries" by Zhang et al.
+
+    The edges of the trie are listed in level order, and within each node in
+    the order of their labels. Three sequences describe them:
+
+    - `labels`: The character of each edge.
+    - `has_child`: Whether each edge leads to a child node (a bit array).
+    - `louds`: Whether each edge is the first one of its node (a bit array).
+
+    The two bit arrays are built by `bit_vector_factory` (`Poppy` by default).
+
+    Every edge without a child ends a key. When a key is also a proper prefix
+    of other keys, it ends with an extra edge labeled `TERMINATOR` ('\\0'),
+    which sorts before every other label. Keys therefore cannot contain '\\0'.
+
+    The id of a key is its position in the sorted order of the keys, so the
+    keys with any given prefix have consecutive ids.
+    """
+    def __init__(
+        self,
+        keys: Iterable[str],
+        *,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> None:
+        """
+        Builds the trie from keys in strictly increasing order, in a single
+        pass over them.
+        """
+        # The edges of each level, in order.
+        level_labels: List[List[str]] = []
+        level_has_child: List[bitarray] = []
+        level_louds: List[bitarray] = []
+
+        # The level and the index within that level of the edge that ends
+        # each key.
+        terminal_levels: List[int] = []
+        terminal_indexes: List[int] = []
+
+        def add_edge(level: int, label: str, has_child: bool, is_first: bool) -> None:
+            if level == len(level_labels):
+                level_labels.append([])
+                level_has_child.append(bitarray())
+                level_louds.append(bitarray())
+            level_labels[level].append(label)
+            level_has_child[level].append(has_child)
+            level_louds[level].append(is_first)
+
+        def collapse_terminator(key: str) -> None:
+            """
+            If the terminator edge of the given key (the last key added) is
+            alone in its node, the edge that leads to it ends the key instead.
+            """
+            level = len(key)
+            if level == 0 or not level_louds[level][-1]:
+                return
+            level_labels[level].pop()
+            level_has_child[level].pop()
+            level_louds[level].pop()
+            level_has_child[level - 1][-1] = False
+            terminal_levels[-1] = level - 1
+            terminal_indexes[-1] = len(level_labels[level - 1]) - 1
+
+        previous: Optional[str] = None
+        for key in keys:
+            if TERMINATOR in key:
+                raise ValueError(f"The key {key!r} contains the terminator character")
+            if previous is not None and key <= previous:
+                raise ValueError(f"The keys are not in strictly increasing order: {previous!r}, {key!r}")
+
+            if previous is None:
+                common_prefix_length = 0
+            else:
+                common_prefix_length = 0
+                max_length = min(len(previous), len(key))
+                while common_prefix_length < max_length and \
+                        previous[common_prefix_length] == key[common_prefix_length]:
+                    common_prefix_length += 1
+                # Unless the new key extends the previous one, no more edges
+                # will be added to the node of the previous key's terminator.
+                if common_prefix_length < len(previous):
+                    collapse_terminator(previous)
+
+            # The edge at the level of the common prefix joins an existing
+            # node (except for the very first key), and every edge after it
+            # starts a new node.
+            for level in range(common_prefix_length, len(key)):
+                add_edge(level, key[level], True, previous is None or level > common_prefix_length)
+            add_edge(len(key), TERMINATOR, False, previous is None or len(key) > common_prefix_length)
+            terminal_levels.append(len(key))
+            terminal_indexes.append(len(level_labels[len(key)]) - 1)
+            previous = key
+
+        if previous is not None:
+            collapse_terminator(previous)
+
+        level_starts = [0]
+        for labels in level_labels:
+            level_starts.append(level_starts[-1] + len(labels))
+        self._num_edges = level_starts[-1]
+
+        self._labels = ''.join(''.join(labels) for labels in level_labels)
+        self._has_child_bits = bitarray()
+        self._louds_bits = bitarray()
+        for has_child, louds in zip(level_has_child, level_louds):
+            self._has_child_bits.extend(has_child)
+            self._louds_bits.extend(louds)
+        self._has_child = bit_vector_factory(self._has_child_bits)
+        self._louds = bit_vector_factory(self._louds_bits)
+
+        edge_of_id = [
+            level_starts[level] + index
+            for level, index in zip(terminal_levels, terminal_indexes)
+        ]
+        self._size = len(edge_of_id)
+        self._edge_of_id = PackedIntArray(edge_of_id)
+        # Childless edges in level order are ranked by `rank_zero`.
+        self._id_of_terminal = PackedIntArray(sorted(range(self._size), key=edge_of_id.__getitem__))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.prefix_iter(''):
+            yield key
+
+    def __contains__(self, key: str) -> bool:
+        return self.lookup(key) is not None
+
+    def _node_end(self, start: int) -> int:
+        """
+        Returns the end of the node whose first edge is at position `start`.
+        """
+        try:
+            return self._louds_bits.index(True, start + 1, self._num_edges)
+        except ValueError:
+            return self._num_edges
+
+    def _child_start(self, pos: int) -> int:
+        """
+        Returns the position of the first edge of the child of edge `pos`.
+        """
+        return self._louds.select(self._has_child.rank(pos))
+
+    def _id_at(self, pos: int) -> int:
+        return self._id_of_terminal[self._has_child.rank_zero(pos) - 1]
+
+    def _find_prefix(self, prefix: str) -> Tuple[int, bool]:
+        """
+        Follows `prefix` from the root. Returns the position of the first edge
+        of the node it leads to, or of the edge that ends it if that edge has
+        no child (in which case the second value is True). Returns -1 if no key
+        starts with `prefix`.
+        """
+        if self._size == 0 or TERMINATOR in prefix:
+            return -1, False
+        start = 0
+        for i, c in enumerate(prefix):
+            pos = self._labels.find(c, start, self._node_end(start))
+            if pos == -1:
+                return -1, False
+            if not self._has_child_bits[pos]:
+                return (pos, True) if i == len(prefix) - 1 else (-1, False)
+            start = self._child_start(pos)
+        return start, False
+
+    def lookup(self, key: str) -> Optional[int]:
+        """
+        Returns the id of the given key, or None if it is not in the trie.
+        """
+        pos, is_terminal = self._find_prefix(key)
+        if pos == -1:
+            return None
+        if is_terminal:
+            return self._id_at(pos)
+        # The terminator sorts first within its node.
+        if self._labels[pos] == TERMINATOR:
+            return self._id_at(pos)
+        return None
+
+    def reverse_lookup(self, key_id: int) -> str:
+        """
+        Returns the key with the given id.
+        """
+        if not (0 <= key_id < self._size):
+            raise IndexError(f"Index out of bounds: {key_id}")
+        pos = self._edge_of_id[key_id]
+        chars = [] if self._labels[pos] == TERMINATOR else [self._labels[pos]]
+        node = self._louds.rank(pos) - 1
+        while node != 0:
+            pos = self._has_child.select(node - 1)
+            chars.append(self._labels[pos])
+            node = self._louds.rank(pos) - 1
+        return ''.join(reversed(chars))
+
+    def prefix_iter(self, prefix: str) -> Iterator[Tuple[str, int]]:
+        """
+        Yields the keys that start with `prefix`, along with their ids, in
+        sorted order.
+        """
+        pos, is_terminal = self._find_prefix(prefix)
+        if pos == -1:
+            return
+        if is_terminal:
+            yield prefix, self._id_at(pos)
+            return
+
+        # Each entry holds the next edge to visit in a node, the end of that
+        # node, and the path to the node.
+        stack = [(pos, self._node_end(pos), prefix)]
+        while stack:
+            pos, end, path = stack.pop()
+            if pos >= end:
+                continue
+            stack.append((pos + 1, end, path))
+            label = self._labels[pos]
+            if self._has_child_bits[pos]:
+                child_start = self._child_start(pos)
+                stack.append((child_start, self._node_end(child_start), path + label))
+            else:
+                yield (path if label == TERMINATOR else path + label), self._id_at(pos)
+
+    def _leftmost_id(self, pos: int) -> int:
+        """
+        Returns the id of the smallest key below edge `pos`.
+        """
+        while self._has_child_bits[pos]:
+            pos = self._child_start(pos)
+        return self._id_at(pos)
+
+    def _next_id(self, pos: int) -> int:
+        """
+        Returns the id of the smallest key after all of those below edge
+        `pos` (which is len(self) if there is none).
+        """
+        while True:
+            if pos + 1 < self._num_edges and not self._louds_bits[pos + 1]:
+                return self._leftmost_id(pos + 1)
+            node = self._louds.rank(pos) - 1
+            if node == 0:
+                return self._size
+            pos = self._has_child.select(node - 1)
+
+    def _lower_bound(self, key: str) -> int:
+        """
+        Returns the number of keys less than `key`, which is the id of the
+        smallest key greater than or equal to it.
+        """
+        if self._size == 0:
+            return 0
+        start = 0
+        for i, c in enumerate(key):
+            end = self._node_end(start)
+            pos = start
+            while pos < end and self._labels[pos] < c:
+                pos += 1
+            if pos == end:
+                return self._next_id(end - 1)
+            if self._labels[pos] > c:
+                return self._leftmost_id(pos)
+            if not self._has_child_bits[pos]:
+                # The key ending at this edge is a proper prefix of `key`
+                # unless `key` ends here too.
+                if i == len(key) - 1 and c != TERMINATOR:
+                    return self._id_at(pos)
+                return self._next_id(pos)
+            start = self._child_start(pos)
+        return self._leftmost_id(start)
+
+    def successor(self, key: str) -> Optional[int]:
+        """
+        Returns the id of the smallest key greater than or equal to `key`, or
+        None if there is none.
+        """
+        key_id = self._lower_bound(key)
+        return key_id if key_id < self._size else None
+
+    def predecessor(self, key: str) -> Optional[int]:
+        """
+        Returns the id of the largest key less than or equal to `key`, or None
+        if there is none.
+        """
+        key_id = self._lower_bound(key)
+        if key_id < self._size and self.reverse_lookup(key_id) == key:
+            return key_id
+        return key_id - 1 if key_id > 0 else None
@@ -0,0 +1,132 @@
+from array import array
+from itertools import compress
+from operator import lt
+from typing import Iterable, Iterator, List
+from typing_extensions import Final
+
+from bitarray import bitarray
+
+from succinct.bit_vector import BitVectorFactory
+from succinct.eliasfano import EliasFano
+from succinct.packed_int_array import PackedIntArray
+from succinct.poppy import Poppy
+
+
+def _num_lower_bits(num_values: int, max_value: int) -> int:
+    """
+    The number of lower bits that minimizes the size of an Elias-Fano list,
+    i.e., floor(log2(universe / number of values)).
+    """
+    return max(0, ((max_value + 1) // num_values).bit_length() - 1)
+
+
+SCAN_LIMIT: Final = 32
+
+
+class MonotoneRunsArray:
+    """
+    A static array of nonnegative integers stored as its maximal runs of
+    nondecreasing values, each one an `EliasFano` list, with a bit array (a
+    `Poppy` unless another `bit_vector_factory` is given) that marks the start
+    of every run. Random access takes one `rank` and one
+    Elias-Fano lookup, however many runs there are, and a run with k values
+    below u takes about k·(2 + log(u / k)) bits.
+
+    This is how classical compressed suffix arrays store psi, which is
+    increasing within the range of the suffixes that start with each
+    character, so it has at most one run per character. Compared with a
+    `Permutation`, which is smaller on texts with few distinct contexts but
+    walks a tree of bit vectors for every lookup, it trades space for O(1)
+    access.
+    """
+    def __init__(
+        self,
+        values: Iterable[int],
+        *,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> None:
+        if not isinstance(values, array):
+            values = array('Q', values)
+        self._size = len(values)
+
+        # A run starts wherever a value is smaller than the one before it.
+        run_offsets = [0] if self._size > 0 else []
+        run_offsets.extend(compress(range(1, self._size), map(lt, values[1:], values[:-1])))
+        run_starts = bitarray(self._size)
+        run_starts.setall(False)
+        for offset in run_offsets:
+            run_starts[offset] = True
+        self._run_starts = bit_vector_factory(run_starts)
+        self._run_offsets = PackedIntArray(run_offsets)
+
+        self._runs: List[EliasFano] = []
+        for start, stop in zip(run_offsets, run_offsets[1:] + [self._size]):
+            max_value = values[stop - 1]
+            self._runs.append(EliasFano(
+                iter(values[start:stop]),
+                num_values=stop - start,
+                max_value=max_value,
+                num_lower_bits=_num_lower_bits(stop - start, max_value)
+            ))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: int) -> int:
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        run = self._run_starts.rank(key) - 1
+        return self._runs[run][key - self._run_offsets[run]]
+
+    def __iter__(self) -> Iterator[int]:
+        for run in self._runs:
+            yield from run
+
+    @property
+    def num_runs(self) -> int:
+        return len(self._runs)
+
+    def get_many(self, keys: Iterable[int]) -> "array[int]":
+        """
+        Retrieves the values at the given positions, as an `array('Q')`. The
+        positions are visited in sorted order, one run at a time, with a
+        cursor into the run that decodes forward from the previous position
+        when it is at most `SCAN_LIMIT` values ahead, rather than with a
+        `rank` and an Elias-Fano lookup per position.
+        """
+        keys = list(keys)
+        for key in keys:
+            if not (0 <= key < self._size):
+                raise IndexError(f"Index out of bounds: {key}")
+        results = array('Q', [0]) * len(keys)
+        run_offsets = self._run_offsets
+        num_runs = len(self._runs)
+        run = -1
+        next_offset = 0
+        values: Iterator[int] = iter(())
+        # The index within the run of the last value read, if any.
+        index = -1
+        value = 0
+        for idx in sorted(range(len(keys)), key=keys.__getitem__):
+            key = keys[idx]
+            if key >= next_offset:
+                while run + 1 < num_runs and run_offsets[run + 1] <= key:
+                    run += 1
+                next_offset = run_offsets[run + 1] if run + 1 < num_runs else self._size
+                index = -1
+                values = iter(())
+            i = key - run_offsets[run]
+            if not (0 <= index <= i <= index + SCAN_LIMIT):
+                values = self._runs[run].iter_from(i)
+                index = i - 1
+            while index < i:
+                value = next(values)
+                index += 1
+            results[idx] = value
+        return results
+
+    def to_array(self) -> "array[int]":
+        """
+        Decodes the whole array, one run at a time.
+        """
+        return array('Q', iter(self))
@@ -0,0 +1,117 @@
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from typing_extensions import Final
+
+
+WORD_SIZE: Final = 64
+WORD_MASK: Final = (1 << WORD_SIZE) - 1
+
+
+class PackedIntArray:
+    """
+    A static array of nonnegative integers, each stored in a fixed number of
+    bits (by default, the bit length of the largest value) inside an array of
+    64-bit words. Compare this with ~36 bytes per element for a Python list of
+    ints.
+    """
+    def __init__(
+        self,
+        values: Iterable[int],
+        *,
+        width: Optional[int] = None
+    ) -> None:
+        if width is None:
+            if not isinstance(values, Sequence):
+                values = list(values)
+            width = max(1, max(values, default=0).bit_length())
+        if not (1 <= width <= WORD_SIZE):
+            raise ValueError(f"The width must be between 1 and {WORD_SIZE}, not {width}")
+
+        self._width = width
+        self._mask = (1 << width) - 1
+
+        words = array('Q')
+        current_word = 0
+        bit_offset = 0
+        size = 0
+        for value in values:
+            if value < 0 or value > self._mask:
+                raise ValueError(f"The value '{value}' does not fit in {width} bits")
+            current_word |= (value << bit_offset) & WORD_MASK
+            bit_offset += width
+            if bit_offset >= WORD_SIZE:
+                words.append(current_word)
+                bit_offset -= WORD_SIZE
+                current_word = value >> (width - bit_offset)
+            size += 1
+        if bit_offset > 0:
+            words.append(current_word)
+
+        # One extra word so that reads that straddle two words never go out
+        # of bounds.
+        words.append(0)
+
+        self._words = words
+        self._size = size
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: int) -> int:
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        bit_position = key * self._width
+        word_idx = bit_position >> 6
+        bit_offset = bit_position & 63
+        value = self._words[word_idx] >> bit_offset
+        if bit_offset + self._width > WORD_SIZE:
+            value |= self._words[word_idx + 1] << (WORD_SIZE - bit_offset)
+        return value & self._mask
+
+    def __iter__(self) -> Iterator[int]:
+        width = self._width
+        mask = self._mask
+        words = self._words
+        word_idx = 0
+        bit_offset = 0
+        for _ in range(self._size):
+            value = words[word_idx] >> bit_offset
+            bit_offset += width
+            if bit_offset >= WORD_SIZE:
+                word_idx += 1
+                bit_offset -= WORD_SIZE
+                if bit_offset > 0:
+                    value |= words[word_idx] << (width - bit_offset)
+            yield value & mask
+
+    def get_many(self, keys: Iterable[int]) -> List[int]:
+        """
+        Returns the values at the given positions. The two words that hold a
+        value are combined once and reused for the following positions that
+        start in the same word, so sorted or clustered positions decode each
+        word once rather than once per position.
+        """
+        width = self._width
+        mask = self._mask
+        words = self._words
+        size = self._size
+        results = []
+        word_idx = -1
+        window = 0
+        for key in keys:
+            if not (0 <= key < size):
+                raise IndexError(f"Index out of bounds: {key}")
+            bit_position = key * width
+            if bit_position >> 6 != word_idx:
+                word_idx = bit_position >> 6
+                window = words[word_idx] | (words[word_idx + 1] << WORD_SIZE)
+            results.append((window >> (bit_position & 63)) & mask)
+        return results
+
+    def size_in_bytes(self) -> int:
+        return self._words.itemsize * len(self._words)
@@ -1,13 +1,20 @@
+import bisect
 import heapq
 from abc import ABCMeta, abstractmethod
+from array import array
 from collections import deque
 from dataclasses import dataclass
-from typing import Iterator, List
-from typing_extensions import Protocol
+from itertools import chain, compress, islice
+from operator import sub
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from typing_extensions import Final, Protocol
 
 from bitarray import bitarray
+from succinct.bit_vector import BitVector, BitVectorFactory
 from succinct.louds import LoudsBinaryTree
 from succinct.compressed_runs_bit_array import CompressedRunsBitArray
+from succinct.packed_int_array import PackedIntArray
+from succinct.poppy import Poppy
 
 
 class IndexedIntSequence(Protocol):
@@ -26,14 +33,6 @@ class HuffmanTreeNode(metaclass=ABCMeta):
     def __lt__(self, other: "HuffmanTreeNode") -> bool:
         return len(self) < len(other)
 
-    @abstractmethod
-    def iterator(
-        self,
-        values: IndexedIntSequence,
-        merge_sort_bitarray: bitarray
-    ) -> Iterator[int]:
-        pass
-
 
 @dataclass
 class HuffmanInnerNode(HuffmanTreeNode):
@@ -45,20 +44,6 @@ class HuffmanInnerNode(HuffmanTreeNode):
     def __len__(self) -> int:
         return self.size
 
-    def iterator(
-        self,
-        values: IndexedIntSequence,
-        merge_sort_bitarray: bitarray
-    ) -> Iterator[int]:
-        it_left = self.left_child.iterator(values, merge_sort_bitarray)
-        it_right = self.right_child.iterator(values, merge_sort_bitarray)
-
-        for b in merge_sort_bitarray[self.merge_sort_offset:(self.merge_sort_offset + self.size)]:
-            if not b:
-                yield next(it_left)
-            else:
-                yield next(it_right)
-
 
 @dataclass(frozen=True)
 class Run(HuffmanTreeNode):
@@ -68,27 +53,179 @@ class Run(HuffmanTreeNode):
     def __len__(self) -> int:
         return self.until - self.from_
 
-    def iterator(
-        self,
-        values: IndexedIntSequence,
-        merge_sort_bitarray: bitarray
-    ) -> Iterator[int]:
-        yield from (values[i] for i in range(self.from_, self.until))
+
+def _to_array(values: IndexedIntSequence) -> "array[int]":
+    """
+    Returns the values as an array('Q'), without copying them if they already
+    are one. A contiguous buffer of 64-bit integers is copied once, straight
+    from its memory, and anything else is converted value by value.
+    """
+    if isinstance(values, array) and values.typecode == 'Q':
+        return values
+    if isinstance(values, (list, tuple, array)):
+        return array('Q', values)
+    try:
+        # E.g., a NumPy array of 64-bit integers.
+        view = memoryview(values)  # type: ignore
+    except TypeError:
+        return array('Q', (values[i] for i in range(len(values))))
+    if view.ndim == 1 and view.itemsize == 8 and view.format in ('Q', 'L', 'q', 'l') and view.c_contiguous:
+        result = array('Q')
+        result.frombytes(view.cast('B'))
+        return result
+    return array('Q', view.tolist())
+
+
+SHORTCUT_PERIOD: Final = 16
+MERGE_CHUNK_SIZE: Final = 1 << 12
+
+T = TypeVar("T")
+
+
+_DOUBLE: Final = (2).__mul__
+_OR_ONE: Final = (1).__or__
+_AND_ONE: Final = (1).__and__
+_HALVE: Final = (1).__rrshift__
+
+
+def _merge_chunks(
+    x_values: Sequence[int],
+    y_values: Sequence[int]
+) -> Iterator[Tuple[Sequence[int], Sequence[int]]]:
+    """
+    Splits the merge of two sorted arrays of distinct values into pairs of
+    slices, with at most `MERGE_CHUNK_SIZE` values from each array, such that
+    the values of each pair precede those of the next pair. Merging the pairs
+    one at a time keeps the temporary lists small.
+    """
+    x_start = y_start = 0
+    while x_start < len(x_values) or y_start < len(y_values):
+        x_stop = min(x_start + MERGE_CHUNK_SIZE, len(x_values))
+        y_stop = min(y_start + MERGE_CHUNK_SIZE, len(y_values))
+        # Cut both slices at the smaller of their last values, unless one of
+        # them reaches the end of its array.
+        if x_stop < len(x_values) and (y_stop == len(y_values) or x_values[x_stop - 1] < y_values[y_stop - 1]):
+            y_stop = bisect.bisect_right(y_values, x_values[x_stop - 1], y_start, y_stop)
+        elif y_stop < len(y_values):
+            x_stop = bisect.bisect_right(x_values, y_values[y_stop - 1], x_start, x_stop)
+        yield x_values[x_start:x_stop], y_values[y_start:y_stop]
+        x_start, y_start = x_stop, y_stop
+
+
+def _merge_values(
+    x_values: Sequence[int],
+    y_values: Sequence[int],
+    merge_bits: bitarray,
+    keep_values: bool
+) -> "array[int]":
+    """
+    Merges two sorted arrays of distinct values, appending the side that each
+    merged value comes from (0 for x and 1 for y) to `merge_bits`. Unless
+    `keep_values` is set, only the bits are kept, and the array returned is
+    empty.
+    """
+    # Tag each value with the side it comes from (in the lowest bit) so that a
+    # single sort, which finds the two runs and merges them, also yields the
+    # bits of the merge. This is done a chunk at a time, as sorting makes a
+    # list of Python ints.
+    merged_values = array('Q')
+    for x_chunk, y_chunk in _merge_chunks(x_values, y_values):
+        tagged = array('Q', map(_DOUBLE, x_chunk))
+        tagged.extend(map(_OR_ONE, map(_DOUBLE, y_chunk)))
+        tagged_merge = sorted(tagged)
+        merge_bits.extend(map(_AND_ONE, tagged_merge))
+        if keep_values:
+            merged_values.extend(map(_HALVE, tagged_merge))
+    return merged_values
+
+
+def _compose_arrays(first: "array[int]", second: "array[int]") -> "array[int]":
+    """
+    Returns the dense form of first ∘ second, i.e., i -> first[second[i]].
+    """
+    return array('Q', map(first.__getitem__, second))
+
+
+def _compressed_runs_factory(bit_array: bitarray) -> BitVector:
+    # TODO: The choice of "4" lower-order bits here is somewhat arbitrary.
+    # Consider passing an `AdaptiveBitVectorFactory` instead.
+    return CompressedRunsBitArray(bit_array, num_lower_bits=4)
 
 
 class Permutation:
-    def __init__(self, values: IndexedIntSequence) -> None:
+    def __init__(
+        self,
+        values: IndexedIntSequence,
+        *,
+        bit_vector_factory: BitVectorFactory = _compressed_runs_factory
+    ) -> None:
+        values = _to_array(values)
         self._size = len(values)
+        self._bit_vector_factory = bit_vector_factory
         runs = self._extract_runs(values)
-        self._build_huffman_tree(values, runs)
+        # The runs are views of `values`, rather than copies. The values of
+        # the root (which are range(n)) are not needed.
+        view = memoryview(values)
+        self._build_huffman_tree(
+            runs,
+            lambda run: view[run.from_:run.until],
+            _merge_values,
+            bit_vector_factory,
+            keep_root_values=False
+        )
+        view.release()
+
+    @classmethod
+    def _sorting(
+        cls,
+        keys: Sequence[Any],
+        *,
+        bit_vector_factory: BitVectorFactory
+    ) -> Tuple["Permutation", "array[int]"]:
+        """
+        Builds the permutation that maps each index of `keys` to its position
+        in their stable sort, and returns it along with the indexes in sorted
+        order.
+
+        The tree is built over the runs of nondecreasing keys, and its merges
+        merge the indexes of the keys by (key, index). That order is the order
+        of the positions in the stable sort, so the merges have the same bits
+        as those of the permutation's own values, and the root's merge is the
+        sorted order.
+        """
+        permutation = cls.__new__(cls)
+        permutation._size = len(keys)
+        permutation._bit_vector_factory = bit_vector_factory
+        runs = permutation._extract_runs(keys)
+        decorated = list(zip(keys, range(len(keys))))
+
+        def merge_indexes(
+            x_indexes: Sequence[int],
+            y_indexes: Sequence[int],
+            merge_bits: bitarray,
+            keep_values: bool
+        ) -> "array[int]":
+            # Sorting finds the two runs and merges them in linear time.
+            merged = sorted(chain(x_indexes, y_indexes), key=decorated.__getitem__)
+            merge_bits.extend(map(set(y_indexes).__contains__, merged))
+            return array('Q', merged)
+
+        order = permutation._build_huffman_tree(
+            runs,
+            lambda run: range(run.from_, run.until),
+            merge_indexes,
+            bit_vector_factory,
+            keep_root_values=True
+        )
+        return permutation, array('Q', order)
 
-    def _extract_runs(self, values: IndexedIntSequence) -> List[HuffmanTreeNode]:
+    def _extract_runs(self, values: Sequence[Any]) -> List[HuffmanTreeNode]:
         run_starts: List[int] = [0]
-
-        for i in range(1, len(values)):
-            if values[i] < values[i - 1]:
-                run_starts.append(i)
-        self._run_starts = run_starts
+        run_starts.extend(
+            i for i, (previous, value) in enumerate(zip(values, islice(values, 1, None)), 1)
+            if value < previous
+        )
+        self._run_starts = PackedIntArray(run_starts)
 
         runs: List[HuffmanTreeNode] = []
         for i in range(len(run_starts)):
@@ -98,14 +235,38 @@ class Permutation:
 
         return runs
 
-    def _build_huffman_tree(self, values: IndexedIntSequence, tree_nodes: List[HuffmanTreeNode]) -> None:
-        # Determine the tree topology.
-        heapq.heapify(tree_nodes)
+    def _build_huffman_tree(
+        self,
+        tree_nodes: List[HuffmanTreeNode],
+        run_values: Callable[[Run], Sequence[int]],
+        merge: "Callable[[Sequence[int], Sequence[int], bitarray, bool], array[int]]",
+        bit_vector_factory: BitVectorFactory,
+        *,
+        keep_root_values: bool
+    ) -> Sequence[int]:
+        """
+        Builds the tree and its merge bit vector from the runs, where
+        `run_values` gives the sorted values of a run and `merge` merges the
+        values of two nodes, appending the side of each merged value (0 for
+        the first node and 1 for the second) to the bits. Returns the values
+        of the root if `keep_root_values` is set.
+        """
+        # Determine the tree topology, merging the sorted values of the two
+        # smallest nodes at each step. Every node keeps its values in an array
+        # until it is merged into its parent, so each value is copied once per
+        # level of the tree.
+        heap: List[Tuple[int, int, HuffmanTreeNode, Sequence[int]]] = []
+        for node in tree_nodes:
+            assert isinstance(node, Run)
+            heap.append((len(node), len(heap), node, run_values(node)))
+        heapq.heapify(heap)
+        sequence_number = len(heap)
+
         merge_sort_bitarray = bitarray()
         merge_sort_offset = 0
-        while len(tree_nodes) > 1:
-            x = heapq.heappop(tree_nodes)
-            y = heapq.heappop(tree_nodes)
+        while len(heap) > 1:
+            _, _, x, x_values = heapq.heappop(heap)
+            _, _, y, y_values = heapq.heappop(heap)
             merged = HuffmanInnerNode(
                 size=len(x) + len(y),
                 left_child=x,
@@ -113,15 +274,17 @@ class Permutation:
                 merge_sort_offset=merge_sort_offset
             )
 
-            # Populate the merge sort bitarray's values
-            it_left = ((value, False) for value in x.iterator(values, merge_sort_bitarray))
-            it_right = ((value, True) for value in y.iterator(values, merge_sort_bitarray))
-
-            for _, b in heapq.merge(it_left, it_right):
-                merge_sort_bitarray.append(b)
-                merge_sort_offset += 1
+            keep_values = len(heap) > 0 or keep_root_values
+            merged_values = merge(x_values, y_values, merge_sort_bitarray, keep_values)
+            del x_values
+            del y_values
+            merge_sort_offset += len(merged)
 
-            heapq.heappush(tree_nodes, merged)
+            heapq.heappush(heap, (len(merged), sequence_number, merged, merged_values))
+            sequence_number += 1
+        tree_nodes = [heap[0][2]]
+        root_values = heap[0][3]
+        del heap
 
         # Build a LOUDS representation of the tree topology
         louds = LoudsBinaryTree(
@@ -149,20 +312,58 @@ class Permutation:
             else:
                 raise TypeError
 
-        self._louds = louds
-        self._node_data = node_data
-
-        # TODO: The choice of "4" lower-order bits here is somewhat arbitrary.
-        # Consider passing it in as a constructor parameter.
-        self._merge_sort_poppy = CompressedRunsBitArray(merge_sort_bitarray, num_lower_bits=4)
-
+        self._node_data = PackedIntArray(node_data)
+
+        # Per-node tables, so that walking the tree needs neither LOUDS
+        # navigation nor prefix ranks on the merge bit vector (the LOUDS tree
+        # itself is only used to derive them, and is not kept):
+        # - The parent of each node, and whether it is a right child.
+        # - The first (left) child of each inner node, or 0 for leaves. (The
+        #   tree is full, so the right child is the next node.)
+        # - The number of 1 bits before each inner node's segment of the merge
+        #   bit vector.
+        num_nodes = len(node_data)
+        parents = [0] * num_nodes
+        is_right_child = bitarray(num_nodes)
+        is_right_child.setall(False)
+        first_children = [0] * num_nodes
+        inner_nodes = []
         number_of_runs = len(self._run_starts)
-        self._run_rank_to_louds_id = [0] * number_of_runs
-        for louds_id in range(len(self._node_data)):
-            if self._louds.is_leaf(louds_id):
-                run_offset = self._node_data[louds_id]
+        run_rank_to_louds_id = [0] * number_of_runs
+        for louds_id, left_child, right_child in louds.level_order():
+            if left_child is None or right_child is None:
+                run_offset = node_data[louds_id]
                 run_start = self._get_run_start_position(run_offset)
-                self._run_rank_to_louds_id[run_start] = louds_id
+                run_rank_to_louds_id[run_start] = louds_id
+            else:
+                first_children[louds_id] = left_child
+                parents[left_child] = parents[right_child] = louds_id
+                is_right_child[right_child] = True
+                inner_nodes.append(louds_id)
+        del louds
+
+        ones_before = [0] * num_nodes
+        ones = 0
+        previous_offset = 0
+        # Inner nodes were created (and their bits appended) in increasing
+        # order of their offsets.
+        for louds_id in sorted(inner_nodes, key=node_data.__getitem__):
+            offset = node_data[louds_id]
+            ones += merge_sort_bitarray.count(1, previous_offset, offset)
+            ones_before[louds_id] = ones
+            previous_offset = offset
+
+        self._parents = PackedIntArray(parents)
+        self._is_right_child = is_right_child
+        self._first_children = PackedIntArray(first_children)
+        self._ones_before = PackedIntArray(ones_before)
+        self._run_rank_to_louds_id = PackedIntArray(run_rank_to_louds_id)
+
+        self._merge_sort_poppy = bit_vector_factory(merge_sort_bitarray)
+        return root_values
+
+    def __len__(self) -> int:
+        return self._size
 
     def _get_run_start_position(self, run_id: int) -> int:
         low = 0
@@ -201,31 +402,23 @@ class Permutation:
         if not (0 <= key < self._size):
             raise IndexError(f"Index out of bounds: {key}")
         run_rank = self._get_run_start_position(key)
-        current_node = self._run_rank_to_louds_id[run_rank]
-        key = key - self._node_data[current_node]
-
-        while True:
-            parent = self._louds.get_parent(current_node)
-            if parent is None:
-                return key
+        node = self._run_rank_to_louds_id[run_rank]
+        key = key - self._node_data[node]
+
+        merge_sort_poppy = self._merge_sort_poppy
+        while node != 0:
+            parent = self._parents[node]
+            parent_offset = self._node_data[parent]
+            parent_rank = self._ones_before[parent]
+            if self._is_right_child[node]:
+                # get the index of the `k`th one in the parent node
+                key = merge_sort_poppy.select(key + parent_rank) - parent_offset
             else:
-                parent_offset = self._node_data[parent]
-                if self._louds.get_left_child(parent) == current_node:
-                    # # get the index of the `k`'th zero in the parent node
-                    parent_rank_zero = (
-                        0 if parent_offset == 0 else
-                        self._merge_sort_poppy.rank_zero(parent_offset - 1)
-                    )
-                    key = self._merge_sort_poppy.select_zero(key + parent_rank_zero) - parent_offset
-                    current_node = parent
-                else:
-                    # get the index of the `k`th one in the parent node
-                    parent_rank = (
-                        0 if parent_offset == 0 else
-                        self._merge_sort_poppy.rank(parent_offset - 1)
-                    )
-                    key = self._merge_sort_poppy.select(key + parent_rank) - parent_offset
-                    current_node = parent
+                # get the index of the `k`'th zero in the parent node
+                parent_rank_zero = parent_offset - parent_rank
+                key = merge_sort_poppy.select_zero(key + parent_rank_zero) - parent_offset
+            node = parent
+        return key
 
     def index_of(self, value: int) -> int:
         """
@@ -238,31 +431,395 @@ class Permutation:
         the rank_1 or rank_0 of that position, depending on whether it's 1 or 0.
         Recurse to either the left or right child, depending on that value.
         """
-        current_node = self._louds.get_root()
+        current_node = 0
+        merge_sort_poppy = self._merge_sort_poppy
         while True:
-            if self._louds.is_leaf(current_node):
+            first_child = self._first_children[current_node]
+            if first_child == 0:
                 return self._node_data[current_node] + value
+            offset = self._node_data[current_node]
+            ones_before = self._ones_before[current_node]
+            if merge_sort_poppy[offset + value]:
+                value = merge_sort_poppy.rank(offset + value) - ones_before - 1
+                current_node = first_child + 1
+            else:
+                value = merge_sort_poppy.rank_zero(offset + value) - (offset - ones_before) - 1
+                current_node = first_child
+
+    def get_many(self, keys: Iterable[int]) -> "array[int]":
+        """
+        Retrieves the elements at the given positions. Rather than walking the
+        tree once per key, the keys are grouped by node and moved up the tree
+        one node at a time, children before parents (i.e., in decreasing order
+        of LOUDS ids), so that each node's data is looked up once per batch.
+
+        If the bit vector has `select_many` and `select_zero_many` (as
+        `CompressedRunsBitArray` does), each node's keys are moved to its
+        parent with one such call, in a single forward pass over the runs of
+        the node's bits; otherwise, with one `select` per key.
+        """
+        keys = list(keys)
+        results = array('Q', [0]) * len(keys)
+
+        # For each node that has queries, their positions in `keys` and their
+        # current indexes within the node.
+        groups: Dict[int, Tuple[List[int], List[int]]] = {}
+        for idx, key in enumerate(keys):
+            if not (0 <= key < self._size):
+                raise IndexError(f"Index out of bounds: {key}")
+            node = self._run_rank_to_louds_id[self._get_run_start_position(key)]
+            group = groups.setdefault(node, ([], []))
+            group[0].append(idx)
+            group[1].append(key - self._node_data[node])
+
+        heap = [-node for node in groups]
+        heapq.heapify(heap)
+        merge_sort_poppy = self._merge_sort_poppy
+        while heap:
+            node = -heapq.heappop(heap)
+            idxs, node_keys = groups.pop(node)
+            if node == 0:
+                for idx, key in zip(idxs, node_keys):
+                    results[idx] = key
+                continue
+
+            parent = self._parents[node]
+            parent_offset = self._node_data[parent]
+            parent_rank = self._ones_before[parent]
+            if self._is_right_child[node]:
+                ranks = [key + parent_rank for key in node_keys]
+                select_many = getattr(merge_sort_poppy, 'select_many', None)
+                if select_many is not None:
+                    positions = select_many(ranks)
+                else:
+                    positions = list(map(merge_sort_poppy.select, ranks))
+            else:
+                parent_rank_zero = parent_offset - parent_rank
+                ranks = [key + parent_rank_zero for key in node_keys]
+                select_zero_many = getattr(merge_sort_poppy, 'select_zero_many', None)
+                if select_zero_many is not None:
+                    positions = select_zero_many(ranks)
+                else:
+                    positions = list(map(merge_sort_poppy.select_zero, ranks))
+            parent_keys = [position - parent_offset for position in positions]
+
+            if parent in groups:
+                groups[parent][0].extend(idxs)
+                groups[parent][1].extend(parent_keys)
+            else:
+                groups[parent] = (idxs, parent_keys)
+                heapq.heappush(heap, -parent)
+        return results
+
+    def index_of_many(self, values: Iterable[int]) -> "array[int]":
+        """
+        Retrieves the indexes of the given values. The values are grouped by
+        node and moved down the tree one node at a time, parents before
+        children, so that each node's data is looked up once per batch.
+
+        If the bit vector has `rank_many` (as `CompressedRunsBitArray` does),
+        each node's values are moved to its children with one such call;
+        otherwise, with one `rank` per value.
+        """
+        values = list(values)
+        results = array('Q', [0]) * len(values)
+        for value in values:
+            if not (0 <= value < self._size):
+                raise IndexError(f"Value out of bounds: {value}")
+
+        groups: Dict[int, Tuple[List[int], List[int]]] = {0: (list(range(len(values))), values)}
+        heap = [0]
+        merge_sort_poppy = self._merge_sort_poppy
+        while heap:
+            node = heapq.heappop(heap)
+            idxs, node_values = groups.pop(node)
+            first_child = self._first_children[node]
+            if first_child == 0:
+                node_offset = self._node_data[node]
+                for idx, value in zip(idxs, node_values):
+                    results[idx] = node_offset + value
+                continue
+
+            offset = self._node_data[node]
+            ones_before = self._ones_before[node]
+            zeros_before = offset - ones_before
+            positions = [offset + value for value in node_values]
+            rank_many = getattr(merge_sort_poppy, 'rank_many', None)
+            if rank_many is not None:
+                # The bit at each position is the difference of the ranks at
+                # it and just before it.
+                ranks = rank_many(positions + [position - 1 for position in positions])
+                bits: Iterable[int] = map(sub, ranks, ranks[len(positions):])
             else:
-                offset = self._node_data[current_node]
-                bit_value = self._merge_sort_poppy[offset + value]
-
-                if not bit_value:
-                    value = (
-                        self._merge_sort_poppy.rank_zero(offset + value) -
-                        (
-                            0 if offset == 0 else
-                            self._merge_sort_poppy.rank_zero(offset - 1)
-                        )
-                    ) - 1
-                    child = self._louds.get_left_child(current_node)
+                bits = map(merge_sort_poppy.__getitem__, positions)
+                ranks = list(map(merge_sort_poppy.rank, positions))
+
+            left: Tuple[List[int], List[int]] = ([], [])
+            right: Tuple[List[int], List[int]] = ([], [])
+            for idx, position, bit, rank in zip(idxs, positions, bits, ranks):
+                if bit:
+                    right[0].append(idx)
+                    right[1].append(rank - ones_before - 1)
+                else:
+                    left[0].append(idx)
+                    left[1].append(position + 1 - rank - zeros_before - 1)
+
+            for child, group in ((first_child, left), (first_child + 1, right)):
+                if group[0]:
+                    groups[child] = group
+                    heapq.heappush(heap, child)
+        return results
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Yields the elements of this permutation in order, decoding one run at
+        a time (with `get_many`), so that only a single run is held in memory.
+        Use `to_array` to decode everything faster at once.
+        """
+        run_starts = self._run_starts
+        for run_rank in range(len(run_starts)):
+            run_stop = run_starts[run_rank + 1] if run_rank + 1 < len(run_starts) else self._size
+            yield from self.get_many(range(run_starts[run_rank], run_stop))
+
+    def _merge_bits(self) -> bitarray:
+        """
+        Decodes the merge bit vector one run of 1s at a time, using nothing
+        but `select`: within a run starting at `position` with rank `ones`,
+        select(ones + k) == position + k, so the length of the run can be
+        found by exponential search, and the last probe is the start of the
+        next run. This costs O(1 + log(length)) selects per run of 1s.
+
+        Bit vectors that can decode themselves sequentially (with
+        `to_bitarray`, like `CompressedRunsBitArray`) are decoded that way
+        instead, in linear time.
+        """
+        merge_sort_poppy = self._merge_sort_poppy
+        to_bitarray = getattr(merge_sort_poppy, 'to_bitarray', None)
+        if to_bitarray is not None:
+            return to_bitarray()
+        bits = bitarray(len(merge_sort_poppy))
+        bits.setall(False)
+        select = merge_sort_poppy.select
+        ones = 0
+        position = select(0)
+        while position != -1:
+            # The run is known to be longer than `low` and at most `high`
+            # bits long, and the (high + 1)th 1 from `position` is at
+            # `next_position`.
+            low, high = 0, 1
+            next_position = select(ones + high)
+            while next_position == position + high:
+                low, high = high, 2 * high
+                next_position = select(ones + high)
+            while high - low > 1:
+                mid = (low + high) // 2
+                mid_position = select(ones + mid)
+                if mid_position == position + mid:
+                    low = mid
                 else:
-                    value = (
-                        self._merge_sort_poppy.rank(offset + value) -
-                        (
-                            0 if offset == 0 else
-                            self._merge_sort_poppy.rank(offset - 1)
-                        )
-                    ) - 1
-                    child = self._louds.get_right_child(current_node)
-                assert child is not None
-                current_node = child
+                    high, next_position = mid, mid_position
+            bits[position:position + high] = True
+            ones += high
+            position = next_position
+        return bits
+
+    def _decode_runs(self) -> Iterator[Tuple[int, "array[int]"]]:
+        """
+        Replays the merges from the root down. The root holds the values
+        0, 1, ..., n - 1 in order, and each inner node hands the values under
+        its 0 bits to its left child and those under its 1 bits to its right
+        child, which leaves every run with its values in order. Yields the
+        start of each run along with its values (in level order of the
+        leaves, not in the order of the runs).
+        """
+        bits = self._merge_bits()
+        # The values of the nodes that have been reached but not split yet.
+        pending = {0: array('Q', range(self._size))}
+        # Parents come before their children in level order.
+        for node in range(len(self._node_data)):
+            values = pending.pop(node)
+            offset = self._node_data[node]
+            first_child = self._first_children[node]
+            if first_child == 0:
+                yield offset, values
+                continue
+            segment = bits[offset:offset + len(values)]
+            pending[first_child + 1] = array('Q', compress(values, segment))
+            segment.invert()
+            pending[first_child] = array('Q', compress(values, segment))
+
+    def to_array(self) -> "array[int]":
+        """
+        Decodes the whole permutation in O(n (1 + log(runs))) time by
+        replaying the merges, rather than walking the tree once per element.
+        """
+        result = array('Q', [0]) * self._size
+        for run_start, values in self._decode_runs():
+            result[run_start:run_start + len(values)] = values
+        return result
+
+    def inverse_array(self) -> "array[int]":
+        """
+        Decodes the whole inverse permutation, i.e., `index_of` for every
+        value, in O(n (1 + log(runs))) time.
+        """
+        result = array('Q', [0]) * self._size
+        for run_start, values in self._decode_runs():
+            for i, value in enumerate(values, run_start):
+                result[value] = i
+        return result
+
+    def compose(self, other: "Permutation") -> "Permutation":
+        """
+        Returns the permutation self ∘ other, which maps i to
+        self[other[i]]. Both permutations are decoded once with `to_array`.
+        The result uses this permutation's bit vector factory.
+        """
+        if len(other) != self._size:
+            raise ValueError(f"Cannot compose permutations of sizes {self._size} and {len(other)}")
+        return Permutation(
+            _compose_arrays(self.to_array(), other.to_array()),
+            bit_vector_factory=self._bit_vector_factory
+        )
+
+    def power(self, exponent: int) -> "Permutation":
+        """
+        Returns this permutation composed with itself `exponent` times (or
+        its inverse, if `exponent` is negative), by repeated squaring of the
+        decoded permutation. The result uses this permutation's bit vector
+        factory.
+        """
+        base = self.to_array() if exponent >= 0 else self.inverse_array()
+        exponent = abs(exponent)
+        result = array('Q', range(self._size))
+        while exponent > 0:
+            if exponent & 1:
+                result = _compose_arrays(result, base)
+            exponent >>= 1
+            if exponent > 0:
+                base = _compose_arrays(base, base)
+        return Permutation(result, bit_vector_factory=self._bit_vector_factory)
+
+
+class ShortcutPermutation:
+    """
+    A permutation stored as a `PackedIntArray` (n log(n) bits with O(1)
+    access), plus the cycle shortcuts of "Succinct Representations of
+    Permutations and Functions" by Munro, Raman, Raman, and Rao, which answer
+    the inverse with at most `period` + 1 accesses.
+
+    Every cycle longer than `period` is sampled every `period` elements. The
+    samples are marked in a `Poppy`, and each one stores a back pointer to
+    the previous sample along its cycle. To find the inverse of `value`, walk
+    forward from it: either the walk gets back to `value` within `period`
+    steps, or it meets a sample, whose back pointer jumps to at most `period`
+    steps before `value`. The back pointers take about n log(n) / `period`
+    bits, so `period` trades space for time.
+
+    To make the inverse the fast direction instead, build this from the
+    inverse permutation (e.g., `Permutation.inverse_array()`).
+    """
+    def __init__(
+        self,
+        values: IndexedIntSequence,
+        *,
+        period: int = SHORTCUT_PERIOD
+    ) -> None:
+        if period < 1:
+            raise ValueError(f"The period must be positive, not {period}")
+        self._period = period
+        if isinstance(values, Permutation):
+            values = values.to_array()
+        size = len(values)
+        self._values = PackedIntArray((values[i] for i in range(size)), width=max(1, (size - 1).bit_length()))
+
+        is_sampled = bitarray(size)
+        is_sampled.setall(False)
+        back_pointers = [0] * size
+        visited = bitarray(size)
+        visited.setall(False)
+        for start in range(size):
+            if visited[start]:
+                continue
+            cycle = [start]
+            visited[start] = True
+            i = self._values[start]
+            while i != start:
+                if i >= size or visited[i]:
+                    raise ValueError(f"The values are not a permutation of 0, ..., {size - 1}")
+                visited[i] = True
+                cycle.append(i)
+                i = self._values[i]
+            if len(cycle) <= period:
+                continue
+            samples = cycle[::period]
+            for previous, sample in zip(samples[-1:] + samples[:-1], samples):
+                is_sampled[sample] = True
+                back_pointers[sample] = previous
+
+        self._size = size
+        self._is_sampled = Poppy(is_sampled)
+        self._back_pointers = PackedIntArray(
+            compress(back_pointers, is_sampled),
+            width=max(1, (size - 1).bit_length())
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def period(self) -> int:
+        return self._period
+
+    def __getitem__(self, key: int) -> int:
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._values)
+
+    def index_of(self, value: int) -> int:
+        """
+        Retrieve the index of the given value within this permutation, with
+        at most `period` + 1 accesses to it.
+        """
+        if not (0 <= value < self._size):
+            raise IndexError(f"Value out of bounds: {value}")
+        values = self._values
+        is_sampled = self._is_sampled
+        has_jumped = False
+        i = value
+        while True:
+            next_i = values[i]
+            if next_i == value:
+                return i
+            if not has_jumped and is_sampled[i]:
+                # The previous sample is at most `period` steps before
+                # `value` along the cycle.
+                i = self._back_pointers[is_sampled.rank(i) - 1]
+                has_jumped = True
+            else:
+                i = next_i
+
+
+def adaptive_sort(
+    values: Iterable[T],
+    *,
+    key: Optional[Callable[[T], Any]] = None,
+    bit_vector_factory: BitVectorFactory = _compressed_runs_factory
+) -> Tuple[List[T], Permutation]:
+    """
+    Sorts the values (stably, by `key` if given), and returns them along with
+    the `Permutation` that maps the index of each value to its index in the
+    sorted list. `index_of` maps the other way.
+
+    Both come from a single pass: the `Permutation` is built over the runs of
+    nondecreasing keys by merging the indexes of the values, and the root of
+    its tree holds the indexes in sorted order. The merges take O(n log(runs))
+    time, so nearly-sorted inputs are cheap to sort and to index.
+    """
+    values = list(values)
+    keys: List[Any] = values if key is None else [key(value) for value in values]
+    permutation, order = Permutation._sorting(keys, bit_vector_factory=bit_vector_factory)
+    return [values[i] for i in order], permutation
@@ -33,6 +33,7 @@ class Poppy:
         while len(self._bit_array) % 64 != 0:
             self._bit_array.append(False)
 
+        self._num_ones = bit_array.count()
         self._memory_view = memoryview(bit_array)
         self._level_0, self._level_1 = self._initialize_rank_structure()
 
@@ -246,6 +247,8 @@ class Poppy:
         Returns the position of the 1-bit having the provided rank.
         If no such bit exists, -1 is returned.
         """
+        if not (0 <= rank < self._num_ones):
+            return -1
 
         # Use binary search to find the upper (L0) block that contains the
         # bit with the target rank.
@@ -398,19 +401,58 @@ class Poppy:
         return self._size
 
     def select_zero(self, rank_zero: int) -> int:
-        low = 0
-        high = len(self) - 1
+        """
+        Returns the position of the 0-bit having the provided rank.
+        If no such bit exists, -1 is returned.
+        """
+        if not (0 <= rank_zero < self._size - self._num_ones):
+            return -1
 
-        while low <= high:
-            mid = (low + high) // 2
-            rz = self.rank_zero(mid)
-            if (not self[mid]) and rz == rank_zero + 1:
-                return mid
-            elif rz <= rank_zero:
-                low = mid + 1
+        # Use binary search to find the last lower (L1) block with at most
+        # rank_zero 0 bits before it. There are 2^21 lower blocks of 2048
+        # bits per upper block.
+        low = 0
+        high = len(self._level_1) // 2 - 1
+        while low < high:
+            mid = (low + high + 1) >> 1
+            zeros_before = 2048 * mid - self._level_0[mid >> 21] - self._level_1[2 * mid]
+            if zeros_before <= rank_zero:
+                low = mid
             else:
                 high = mid - 1
-        return -1
+        rank_zero -= 2048 * low - self._level_0[low >> 21] - self._level_1[2 * low]
+
+        # Then skip the basic blocks (512 bits) before the one that holds it.
+        packed_relative_counts = self._level_1[2 * low + 1]
+        basic_block_idx = 0
+        while basic_block_idx < 3:
+            relative_count = 512 - self._get_relative_count(
+                basic_block_index=basic_block_idx,
+                packed_relative_counts=packed_relative_counts
+            )
+            if rank_zero < relative_count:
+                break
+            rank_zero -= relative_count
+            basic_block_idx += 1
+
+        # Now scan the basic block 64 bits at a time, and then a byte at a
+        # time, counting the 0 bits of each byte as the 1 bits of its
+        # complement.
+        byte_offset = 256 * low + 64 * basic_block_idx
+        while True:
+            rank = self._bit_array.count(False, 8 * byte_offset, 8 * byte_offset + 64)
+            if rank_zero < rank:
+                break
+            rank_zero -= rank
+            byte_offset += 8
+
+        while True:
+            complement = self._memory_view[byte_offset] ^ 255
+            rank = RANK_IN_BYTE[256 * 7 + complement]
+            if rank_zero < rank:
+                return 8 * byte_offset + SELECT_IN_BYTE[256 * rank_zero + complement]
+            rank_zero -= rank
+            byte_offset += 1
 
     def __getstate__(self) -> Dict[str, Any]:
         state = dict(self.__dict__)
@@ -1,25 +1,34 @@
+import bisect
+from itertools import accumulate
 from typing import Optional, Iterator, List
 
 from bitarray import bitarray
 
+from succinct.packed_int_array import PackedIntArray
+
 
 class RunLengthEncodedBitArray:
     def __init__(self, bit_array: bitarray) -> None:
         prev_value = False
-        self._run_starts: List[int] = []
-        self._run_lengths: List[int] = []
+        run_starts: List[int] = []
+        run_lengths: List[int] = []
 
         for i in range(len(bit_array)):
             if bit_array[i] != prev_value:
                 if prev_value:
-                    self._run_lengths.append(i - self._run_starts[-1])
+                    run_lengths.append(i - run_starts[-1])
                 else:
-                    self._run_starts.append(i)
+                    run_starts.append(i)
             prev_value = bit_array[i]
 
-        if len(self._run_lengths) < len(self._run_starts):
-            self._run_lengths.append(len(bit_array) - self._run_starts[-1])
+        if len(run_lengths) < len(run_starts):
+            run_lengths.append(len(bit_array) - run_starts[-1])
+
+        self._run_starts = PackedIntArray(run_starts)
+        self._run_lengths = PackedIntArray(run_lengths)
 
+        # The number of 1 bits that precede each run.
+        self._ones_before_run = PackedIntArray(accumulate([0] + run_lengths[:-1]))
         self._size = len(bit_array)
 
     def __len__(self) -> int:
@@ -30,7 +39,7 @@ class RunLengthEncodedBitArray:
             yield self[i]
 
     def _get_run(self, i: int) -> Optional[int]:
-        if not self._run_starts:
+        if len(self._run_starts) == 0:
             return None
 
         low = 0
@@ -66,18 +75,13 @@ class RunLengthEncodedBitArray:
         return self._get_run(i) is not None
 
     def rank(self, i: int) -> int:
-        run = self._get_run(i)
-        rank_sum = 0
-        for j in range(len(self._run_starts)):
-            if self._run_starts[j] <= i and i - self._run_starts[j] >= self._run_lengths[j]:
-                rank_sum += self._run_lengths[j]
-            else:
-                break
-
-        if run is not None:
-            rank_sum += i - self._run_starts[run] + 1
-
-        return rank_sum
+        run = bisect.bisect_right(self._run_starts, i) - 1
+        if run < 0:
+            return 0
+        return self._ones_before_run[run] + min(
+            i - self._run_starts[run] + 1,
+            self._run_lengths[run]
+        )
 
     def rank_zero(self, i: int) -> int:
         return i - self.rank(i) + 1
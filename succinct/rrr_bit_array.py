@@ -0,0 +1,271 @@
+import math
+from array import array
+from typing import Iterator, List, Tuple
+
+from bitarray import bitarray
+from bitarray.util import ba2int, int2ba
+from typing_extensions import Final
+
+
+BLOCK_SIZE: Final = 15
+BLOCKS_PER_SUPERBLOCK: Final = 32
+SUPERBLOCK_SIZE: Final = BLOCK_SIZE * BLOCKS_PER_SUPERBLOCK
+SUPERBLOCKS_PER_HYPERBLOCK: Final = 64
+CLASS_WIDTH: Final = 4
+SELECT_SAMPLING_STEP: Final = 4096
+
+
+def _build_block_tables() -> "List[array[int]]":
+    """
+    Enumerates all of the 2^15 possible blocks, ordered first by class (the
+    number of 1 bits in the block) and then by value. The offset of a block is
+    its position within its class.
+    """
+    blocks = sorted(range(1 << BLOCK_SIZE), key=lambda v: (bin(v).count("1"), v))
+    blocks_by_class = array('H', blocks)
+
+    offset_of_block = array('H', [0] * (1 << BLOCK_SIZE))
+    class_starts = array('H', [0] * (BLOCK_SIZE + 2))
+    for i, block in enumerate(blocks):
+        block_class = bin(block).count("1")
+        if i == 0 or bin(blocks[i - 1]).count("1") != block_class:
+            class_starts[block_class] = i
+        offset_of_block[block] = i - class_starts[block_class]
+    class_starts[BLOCK_SIZE + 1] = 1 << BLOCK_SIZE
+
+    # The number of bits needed to store an offset within each class.
+    offset_widths = array('B', [
+        (class_starts[c + 1] - class_starts[c] - 1).bit_length()
+        for c in range(BLOCK_SIZE + 1)
+    ])
+    return [blocks_by_class, offset_of_block, class_starts, offset_widths]
+
+
+_BLOCKS_BY_CLASS, _OFFSET_OF_BLOCK, _CLASS_STARTS, _OFFSET_WIDTHS = _build_block_tables()
+
+
+def block_entropy_bits(bit_array: bitarray) -> int:
+    """
+    The number of bits that `RRRBitArray` needs for the offsets of the given
+    bit array. This is close to the zero-order entropy of the bit array (or
+    lower, when the 1 bits are clustered).
+    """
+    return sum(
+        _OFFSET_WIDTHS[bit_array.count(1, start, start + BLOCK_SIZE)]
+        for start in range(0, len(bit_array), BLOCK_SIZE)
+    )
+
+
+class RRRBitArray:
+    """
+    "Succinct indexable dictionaries with applications to encoding k-ary
+    trees, prefix sums and multisets" by Raman, Raman, and Rao.
+
+    The bit array is cut into blocks of 15 bits. Each block is stored as its
+    class (its number of 1 bits, in 4 bits) followed by its offset (its index
+    among all blocks of that class, in ceil(log2(15 choose class)) bits). This
+    takes about H0(B)·n bits plus ~27% of n for the classes, which pays off for
+    bit arrays that are neither sparse nor made of long runs, but whose zero-order
+    entropy is still well below 1.
+
+    Every 32 blocks (a superblock), the rank and the position of the next
+    offset are sampled, so `rank` and `__getitem__` decode at most 32 classes
+    and one offset. The samples are stored as 16-bit values relative to a
+    hyperblock of 64 superblocks, whose absolute values take 64 bits each.
+    `select` and `select_zero` additionally sample every 4096th bit to narrow
+    the binary search over the superblocks.
+    """
+    def __init__(self, bit_array: bitarray) -> None:
+        self._size = len(bit_array)
+
+        num_blocks = math.ceil(self._size / BLOCK_SIZE)
+        num_superblocks = math.ceil(num_blocks / BLOCKS_PER_SUPERBLOCK)
+        num_hyperblocks = math.ceil(num_superblocks / SUPERBLOCKS_PER_HYPERBLOCK)
+
+        self._classes = bitarray()
+        self._offsets = bitarray()
+        self._hyperblock_ranks = array('Q', [0] * num_hyperblocks)
+        self._hyperblock_offsets = array('Q', [0] * num_hyperblocks)
+        self._superblock_ranks = array('H', [0] * num_superblocks)
+        self._superblock_offsets = array('H', [0] * num_superblocks)
+
+        rank = 0
+        for block_idx in range(num_blocks):
+            if block_idx % BLOCKS_PER_SUPERBLOCK == 0:
+                superblock_idx = block_idx // BLOCKS_PER_SUPERBLOCK
+                hyperblock_idx = superblock_idx // SUPERBLOCKS_PER_HYPERBLOCK
+                if superblock_idx % SUPERBLOCKS_PER_HYPERBLOCK == 0:
+                    self._hyperblock_ranks[hyperblock_idx] = rank
+                    self._hyperblock_offsets[hyperblock_idx] = len(self._offsets)
+                self._superblock_ranks[superblock_idx] = (
+                    rank - self._hyperblock_ranks[hyperblock_idx]
+                )
+                self._superblock_offsets[superblock_idx] = (
+                    len(self._offsets) - self._hyperblock_offsets[hyperblock_idx]
+                )
+
+            start = block_idx * BLOCK_SIZE
+            block_bits = bit_array[start:start + BLOCK_SIZE]
+            block = ba2int(block_bits) << (BLOCK_SIZE - len(block_bits))
+            block_class = bin(block).count("1")
+
+            self._classes.extend(int2ba(block_class, length=CLASS_WIDTH))
+            width = _OFFSET_WIDTHS[block_class]
+            if width != 0:
+                self._offsets.extend(int2ba(_OFFSET_OF_BLOCK[block], length=width))
+            rank += block_class
+
+        self._num_ones = rank
+        self._select_samples = self._sample_superblocks(ones=True)
+        self._select_zero_samples = self._sample_superblocks(ones=False)
+
+    def _sample_superblocks(self, *, ones: bool) -> "array[int]":
+        """
+        For every SELECT_SAMPLING_STEP-th 1 bit (or 0 bit), records the
+        superblock that contains it.
+        """
+        samples = array('Q')
+        target = 0
+        for superblock_idx in range(len(self._superblock_ranks)):
+            end = self._superblock_count(superblock_idx + 1, ones=ones)
+            while target < end:
+                samples.append(superblock_idx)
+                target += SELECT_SAMPLING_STEP
+        return samples
+
+    def _superblock_count(self, superblock_idx: int, *, ones: bool) -> int:
+        """
+        The number of 1 bits (or 0 bits) that precede the given superblock.
+        """
+        if superblock_idx >= len(self._superblock_ranks):
+            rank = self._num_ones
+            position = self._size
+        else:
+            rank = self._superblock_rank(superblock_idx)
+            position = superblock_idx * SUPERBLOCK_SIZE
+        return rank if ones else position - rank
+
+    def _superblock_rank(self, superblock_idx: int) -> int:
+        return (
+            self._hyperblock_ranks[superblock_idx // SUPERBLOCKS_PER_HYPERBLOCK] +
+            self._superblock_ranks[superblock_idx]
+        )
+
+    def _superblock_offset(self, superblock_idx: int) -> int:
+        return (
+            self._hyperblock_offsets[superblock_idx // SUPERBLOCKS_PER_HYPERBLOCK] +
+            self._superblock_offsets[superblock_idx]
+        )
+
+    def _block_class(self, block_idx: int) -> int:
+        start = block_idx * CLASS_WIDTH
+        return ba2int(self._classes[start:start + CLASS_WIDTH])
+
+    def _decode_block(self, block_class: int, offset_position: int) -> int:
+        width = _OFFSET_WIDTHS[block_class]
+        offset = ba2int(self._offsets[offset_position:offset_position + width]) if width != 0 else 0
+        return _BLOCKS_BY_CLASS[_CLASS_STARTS[block_class] + offset]
+
+    def _seek(self, block_idx: int) -> Tuple[int, int, int]:
+        """
+        Returns the rank before the given block, the position of its offset,
+        and its class.
+        """
+        superblock_idx = block_idx // BLOCKS_PER_SUPERBLOCK
+        rank = self._superblock_rank(superblock_idx)
+        offset_position = self._superblock_offset(superblock_idx)
+        for i in range(superblock_idx * BLOCKS_PER_SUPERBLOCK, block_idx):
+            block_class = self._block_class(i)
+            rank += block_class
+            offset_position += _OFFSET_WIDTHS[block_class]
+        return rank, offset_position, self._block_class(block_idx)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[bool]:
+        offset_position = 0
+        for block_idx in range(math.ceil(self._size / BLOCK_SIZE)):
+            block_class = self._block_class(block_idx)
+            block = self._decode_block(block_class, offset_position)
+            offset_position += _OFFSET_WIDTHS[block_class]
+            for j in range(min(BLOCK_SIZE, self._size - block_idx * BLOCK_SIZE)):
+                yield bool((block >> (BLOCK_SIZE - 1 - j)) & 1)
+
+    def __getitem__(self, key: int) -> bool:
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        _, offset_position, block_class = self._seek(key // BLOCK_SIZE)
+        block = self._decode_block(block_class, offset_position)
+        return bool((block >> (BLOCK_SIZE - 1 - key % BLOCK_SIZE)) & 1)
+
+    def rank(self, i: int) -> int:
+        """
+        Returns the number of 1 bits up to and including position i.
+        """
+        rank, offset_position, block_class = self._seek(i // BLOCK_SIZE)
+        block = self._decode_block(block_class, offset_position)
+        return rank + bin(block >> (BLOCK_SIZE - 1 - i % BLOCK_SIZE)).count("1")
+
+    def rank_zero(self, i: int) -> int:
+        """
+        Returns the number of 0 bits up to and including position i.
+        """
+        return i - self.rank(i) + 1
+
+    def select(self, rank: int) -> int:
+        """
+        Returns the position of the 1-bit having the provided rank.
+        If no such bit exists, -1 is returned.
+        """
+        return self._select(rank, ones=True)
+
+    def select_zero(self, rank_zero: int) -> int:
+        """
+        Returns the position of the 0-bit having the provided rank.
+        If no such bit exists, -1 is returned.
+        """
+        return self._select(rank_zero, ones=False)
+
+    def _select(self, rank: int, *, ones: bool) -> int:
+        if not (0 <= rank < self._superblock_count(len(self._superblock_ranks), ones=ones)):
+            return -1
+
+        # Binary search for the last superblock that starts at or before the
+        # target bit, between two consecutive samples.
+        samples = self._select_samples if ones else self._select_zero_samples
+        sample_idx = rank // SELECT_SAMPLING_STEP
+        low = samples[sample_idx]
+        high = (
+            samples[sample_idx + 1] if sample_idx + 1 < len(samples) else
+            len(self._superblock_ranks) - 1
+        )
+        while low < high:
+            mid = (low + high + 1) >> 1
+            if self._superblock_count(mid, ones=ones) <= rank:
+                low = mid
+            else:
+                high = mid - 1
+
+        # Scan the blocks of the superblock.
+        superblock_idx = low
+        remaining = rank - self._superblock_count(superblock_idx, ones=ones)
+        offset_position = self._superblock_offset(superblock_idx)
+        block_idx = superblock_idx * BLOCKS_PER_SUPERBLOCK
+        while True:
+            block_class = self._block_class(block_idx)
+            count = block_class if ones else BLOCK_SIZE - block_class
+            if remaining < count:
+                break
+            remaining -= count
+            offset_position += _OFFSET_WIDTHS[block_class]
+            block_idx += 1
+
+        # Select within the block.
+        block = self._decode_block(block_class, offset_position)
+        for j in range(BLOCK_SIZE):
+            if bool((block >> (BLOCK_SIZE - 1 - j)) & 1) == ones:
+                if remaining == 0:
+                    return block_idx * BLOCK_SIZE + j
+                remaining -= 1
+        raise AssertionError("Unreachable")
@@ -1,13 +1,45 @@
-from collections import defaultdict
-from typing import Any, Iterable, Iterator, List, Tuple
+import bisect
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from itertools import accumulate, compress
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from bitarray import bitarray
+from typing_extensions import Protocol
 
+from succinct.bit_vector import BitVectorFactory
+from succinct.directly_addressable_codes import DirectlyAddressableCodes
+from succinct.packed_int_array import PackedIntArray
+from succinct.poppy import Poppy
 from succinct.permutation import Permutation
 from succinct.rle_bit_array import RunLengthEncodedBitArray
+from succinct.suffix_array import suffix_array_sais
+from succinct.wavelet_matrix import WaveletMatrix
 
 
 END_CHARACTER = '\0'
+SA_SAMPLING_RATE = 32
+ITER_BATCH_SIZE = 4096
+
+
+class Psi(Protocol):
+    """
+    The operations that `StringIndex` needs from its representation of psi,
+    which `Permutation` and `MonotoneRunsArray` both provide.
+    """
+    def __len__(self) -> int:
+        pass
+
+    def __getitem__(self, key: int) -> int:
+        pass
+
+    def get_many(self, keys: Iterable[int]) -> "array[int]":
+        pass
+
+
+PsiFactory = Callable[["array[int]"], Psi]
 
 
 def sort_bucket(s: str, bucket: Iterable[int], order: int) -> List[int]:
@@ -35,53 +67,175 @@ def suffix_array_ManberMyers(s: str) -> List[int]:
 
 
 class StringIndex:
-    def __init__(self, strings: List[str]) -> None:
-        self._size = len(strings)
+    """
+    A compressed self-index of a list of strings, based on the psi function
+    of the suffix array of their concatenation (each string followed by
+    `END_CHARACTER`, which the strings therefore cannot contain).
 
-        strings_sorted: List[Tuple[str, int]] = []
-        for i, s in enumerate(strings):
-            strings_sorted.append((s, i))
+    Besides retrieving the strings, it supports substring search: `count`
+    and `locate` find the suffix array range of a pattern by backward search
+    with psi, and `locate` maps each match to the string and offset at which
+    it occurs by following psi to the end of the string, or to one of the
+    sampled positions (every `sa_sampling_rate`th character of each string).
+    With `document_listing`, `documents_containing` lists the distinct
+    strings in that range from a `WaveletMatrix` over the document array (the
+    string id of each suffix). `startswith` counts on the ids being ordered
+    like the strings' suffixes.
 
-        s = "".join((x[0] for x in strings_sorted)) + END_CHARACTER
-        suffix_array = suffix_array_ManberMyers(s)
+    Psi is stored by `psi_factory`: a `Permutation` by default, or a
+    `MonotoneRunsArray` (one Elias-Fano list per character) for O(1) psi
+    lookups at the cost of more space.
+    """
+    def __init__(
+        self,
+        strings: List[str],
+        *,
+        bit_vector_factory: BitVectorFactory = RunLengthEncodedBitArray,
+        sa_sampling_rate: int = SA_SAMPLING_RATE,
+        document_listing: bool = False,
+        psi_factory: PsiFactory = Permutation
+    ) -> None:
+        if sa_sampling_rate < 1:
+            raise ValueError(f"The sampling rate must be positive, not {sa_sampling_rate}")
+        for string in strings:
+            if END_CHARACTER in string:
+                raise ValueError(f"The string {string!r} contains the end character")
+        self._size = len(strings)
+        self._sa_sampling_rate = sa_sampling_rate
 
-        self._alphabet_distinct: List[str] = []
-        alphabet_starts: List[int] = []
-        for i in range(len(s)):
-            if i == 0 or s[suffix_array[i - 1]] != s[suffix_array[i]]:
-                self._alphabet_distinct.append(s[suffix_array[i]])
-                alphabet_starts.append(i)
+        # The construction is a pipeline of stages over typed arrays, and
+        # each stage's input is freed as soon as it is consumed, so that at
+        # most about three integer arrays of the size of the text are alive at
+        # once.
 
-        self._alphabet_starts = alphabet_starts
+        # Stage 1: The text, and the positions at which each string starts.
+        # The end characters keep matches from spanning two strings.
+        s = END_CHARACTER.join(strings) + END_CHARACTER
+        starts = bitarray()
+        for string in strings:
+            starts.append(True)
+            starts.extend([False] * len(string))
 
-        inverse_suffix_array = [0] * len(suffix_array)
+        # Stage 2: The alphabet. Since the suffix array is sorted by first
+        # character, the suffixes starting with each character are a range
+        # of it.
+        char_counts = sorted(Counter(s).items())
+        self._alphabet_distinct: List[str] = [c for c, _ in char_counts]
+        self._alphabet_starts = PackedIntArray(
+            accumulate([0] + [count for _, count in char_counts[:-1]])
+        )
+        del char_counts
 
+        # Stage 3: The suffix array.
+        suffix_array = suffix_array_sais(s)
+        del s
+        size = len(suffix_array)
+
+        # Stage 4: The inverse suffix array, with the inverse of position 0
+        # repeated at the end so that psi can be read off without wrapping
+        # around.
+        inverse_suffix_array = array(suffix_array.typecode, [0]) * (size + 1)
         for i, x in enumerate(suffix_array):
             inverse_suffix_array[x] = i
+        inverse_suffix_array[size] = inverse_suffix_array[0]
 
-        # A.K.A. "nextCharIdx"
-        psi = [
-            inverse_suffix_array[(x + 1) % len(suffix_array)]
-            for x in suffix_array
-        ]
+        # Bit vector that marks psi entries as beginnings of strings.
+        psi_starts_bitarray = bitarray(size)
+        psi_starts_bitarray.setall(False)
+        for x in compress(range(size), starts):
+            psi_starts_bitarray[inverse_suffix_array[x]] = True
+        self._psi_starts = bit_vector_factory(psi_starts_bitarray)
+        del psi_starts_bitarray
 
-        self._psi = Permutation(psi)
+        # The id of each string is the rank of its first suffix among those
+        # of all of the strings. (The sort makes a list of one Python int per
+        # string.)
+        typecode = suffix_array.typecode
+        text_starts = array(typecode, compress(range(size), starts))
+        del starts
+        start_ranks = array(typecode, map(inverse_suffix_array.__getitem__, text_starts))
+        order = sorted(range(self._size), key=start_ranks.__getitem__)
+        del start_ranks
+        string_ids = array(typecode, [0]) * self._size
+        for string_id, i in enumerate(order):
+            string_ids[i] = string_id
 
-        # Bit vector that marks psi entries as beginnings of strings.
-        starts = bitarray()
-        for s, i in strings_sorted:
-            starts.append(True)
-            starts.extend([False] * (len(s) - 1))
-        starts.append(False)
+        # Sample every `sa_sampling_rate`th character of each string (other
+        # than the first), in order of string id and offset, recording its
+        # suffix array position, i.e., a sample of the inverse suffix array
+        # for `extract`, along with the index of the first sample of each
+        # string.
+        inverse_samples = array(typecode)
+        sample_string_ids = array(typecode)
+        sample_offsets = array(typecode)
+        sample_starts = array(typecode, [0])
+        for string_id, i in enumerate(order):
+            position = text_starts[i]
+            for offset in range(sa_sampling_rate, len(strings[i]), sa_sampling_rate):
+                inverse_samples.append(inverse_suffix_array[position + offset])
+                sample_string_ids.append(string_id)
+                sample_offsets.append(offset)
+            sample_starts.append(len(inverse_samples))
+        del order
+        self._inverse_samples = PackedIntArray(inverse_samples)
+        self._inverse_sample_starts = PackedIntArray(sample_starts)
+        del sample_starts
+        # The same samples by suffix array position. (The sort makes a list of
+        # one Python int per sample.)
+        is_sampled = bitarray(size)
+        is_sampled.setall(False)
+        for i in inverse_samples:
+            is_sampled[i] = True
+        self._is_sampled = Poppy(is_sampled)
+        by_position = sorted(range(len(inverse_samples)), key=inverse_samples.__getitem__)
+        del inverse_samples
+        self._sample_string_ids = PackedIntArray(map(sample_string_ids.__getitem__, by_position))
+        self._sample_offsets = PackedIntArray(map(sample_offsets.__getitem__, by_position))
+        del by_position
+        del sample_string_ids
+        del sample_offsets
 
-        psi_starts_bitarray = bitarray(len(starts))
-        psi_starts_bitarray.setall(False)
+        # The end characters, which come first in the suffix array, record the
+        # id and length of the string they end. For document listing, record
+        # the string id of each position of the text as well (the end
+        # characters belong to the strings they end).
+        end_string_ids = array(typecode, [0]) * self._size
+        end_lengths = array(typecode, [0]) * self._size
+        text_string_ids = array(typecode)
+        for string, string_id, position in zip(strings, string_ids, text_starts):
+            end = inverse_suffix_array[position + len(string)]
+            end_string_ids[end] = string_id
+            end_lengths[end] = len(string)
+            if document_listing:
+                text_string_ids.extend(array(typecode, [string_id]) * (len(string) + 1))
+        del string_ids
+        del text_starts
+        if document_listing and not strings:
+            # The text of no strings is a lone end character.
+            text_string_ids.append(0)
+        self._end_string_ids = PackedIntArray(end_string_ids)
+        self._end_lengths = DirectlyAddressableCodes(end_lengths)
+        del end_string_ids
+        del end_lengths
 
-        for i, x in enumerate(suffix_array):
-            if starts[x]:
-                psi_starts_bitarray[i] = True
+        # The document array: the string id of each suffix array position.
+        # The distinct strings that contain a pattern are the distinct values
+        # in the pattern's range of it. It takes log(len(strings)) bits per
+        # character, which is more than the rest of the index, so it is only
+        # built on request.
+        self._documents: Optional[WaveletMatrix] = None
+        if document_listing:
+            documents = array(suffix_array.typecode, map(text_string_ids.__getitem__, suffix_array))
+            self._documents = WaveletMatrix(documents, max_value=max(self._size - 1, 0))
+            del documents
+        del text_string_ids
 
-        self._psi_starts = RunLengthEncodedBitArray(psi_starts_bitarray)
+        # Stage 5: Psi (A.K.A. "nextCharIdx"), as an array('Q'), which
+        # `Permutation` and `MonotoneRunsArray` use without copying.
+        psi = array('Q', map(inverse_suffix_array.__getitem__, map((1).__add__, suffix_array)))
+        del suffix_array
+        del inverse_suffix_array
+        self._psi = psi_factory(psi)
 
     def __len__(self) -> int:
         return self._size
@@ -109,21 +263,245 @@ class StringIndex:
             raise IndexError(f"Index out of bounds: {key}")
         pos = self._psi_starts.select(key)
         assert pos >= 0
-        first_time = True
 
         result: List[str] = []
-        while first_time or not self._psi_starts[pos]:
-            first_time = False
+        ch = self._get_char_at_suffix_array_position(pos)
+        while ch != END_CHARACTER:
+            result.append(ch)
+            pos = self._psi[pos]
             ch = self._get_char_at_suffix_array_position(pos)
-            if ch != END_CHARACTER:
-                result.append(ch)
 
-            pos = self._psi[pos]
+        return "".join(result)
 
+    def extract(self, key: int, start: int, stop: int) -> str:
+        """
+        Returns `self[key][start:stop]` for 0 <= start <= stop, decoding only
+        those characters: the walk along psi starts from the sampled suffix
+        array position of the largest multiple of `sa_sampling_rate` that is
+        at most `start`, so it takes fewer than `sa_sampling_rate` steps to
+        reach `start`, plus one step per extracted character.
+        """
+        if not (0 <= key < self._size):
+            raise IndexError(f"Index out of bounds: {key}")
+        if start < 0 or stop < 0:
+            raise ValueError(f"The range [{start}, {stop}) must not be negative")
+
+        # The samples of a string are at offsets sa_sampling_rate,
+        # 2 * sa_sampling_rate, ..., up to its length (exclusive).
+        first_sample = self._inverse_sample_starts[key]
+        num_samples = self._inverse_sample_starts[key + 1] - first_sample
+        sample = min(start // self._sa_sampling_rate, num_samples)
+        if sample == 0:
+            pos = self._psi_starts.select(key)
+        else:
+            pos = self._inverse_samples[first_sample + sample - 1]
+        offset = sample * self._sa_sampling_rate
+
+        result: List[str] = []
+        ch = self._get_char_at_suffix_array_position(pos)
+        while ch != END_CHARACTER and offset < stop:
+            if offset >= start:
+                result.append(ch)
+            pos = self._psi[pos]
+            ch = self._get_char_at_suffix_array_position(pos)
+            offset += 1
         return "".join(result)
 
     def __iter__(self) -> Iterator[str]:
-        # TODO: This is not the fastest way to iterate over the data structure,
-        # but it is at least correct.
-        for i in range(len(self)):
-            yield self[i]
+        """
+        Yields the strings in order of id, decoding `ITER_BATCH_SIZE` of them
+        at a time with `get_many`, so that memory stays proportional to a
+        batch of strings rather than to the text. This takes one psi lookup
+        per character, in sorted batches, rather than decoding all of psi.
+        """
+        for start in range(0, self._size, ITER_BATCH_SIZE):
+            yield from self.get_many(range(start, min(start + ITER_BATCH_SIZE, self._size)))
+
+    def get_many(self, keys: Iterable[int]) -> List[str]:
+        """
+        Retrieves the strings with the given ids. The strings are decoded
+        together, one character at a time, with one `Psi.get_many` per step
+        for all of the unfinished ones. Each step looks up the positions in
+        increasing order. Psi is increasing within the range of each
+        character, so the lookups move forward through each of its runs.
+        A `Permutation` then answers them with one forward pass of its
+        run cursors per tree node, rather than a search per position.
+        """
+        keys = list(keys)
+        for key in keys:
+            if not (0 <= key < self._size):
+                raise IndexError(f"Index out of bounds: {key}")
+
+        alphabet_starts = list(self._alphabet_starts)
+        chars: List[List[str]] = [[] for _ in keys]
+        active = list(range(len(keys)))
+        positions: Sequence[int] = [self._psi_starts.select(key) for key in keys]
+        while active:
+            remaining = []
+            remaining_positions = []
+            for k, pos in sorted(zip(active, positions), key=itemgetter(1)):
+                ch = self._alphabet_distinct[bisect.bisect_right(alphabet_starts, pos) - 1]
+                if ch != END_CHARACTER:
+                    chars[k].append(ch)
+                    remaining.append(k)
+                    remaining_positions.append(pos)
+            active = remaining
+            positions = self._psi.get_many(remaining_positions)
+        return ["".join(string_chars) for string_chars in chars]
+
+    def _search(self, pattern: str) -> Tuple[int, int]:
+        """
+        Returns the range [start, stop) of suffix array positions of the
+        suffixes that start with `pattern`, which must not be empty.
+        """
+        if not pattern:
+            raise ValueError("The pattern must not be empty")
+        if END_CHARACTER in pattern:
+            return 0, 0
+        return self._backward_search(pattern)
+
+    def _backward_search(self, pattern: str) -> Tuple[int, int]:
+        """
+        Returns the range [start, stop) of suffix array positions of the
+        suffixes that start with `pattern` (which may contain end
+        characters), by backward search: the suffixes that start with c + P
+        are those in the range of c whose psi is in the range of P, and psi is
+        increasing within the range of c.
+        """
+        size = len(self._psi)
+        start, stop = 0, size
+        for ch in reversed(pattern):
+            k = bisect.bisect_left(self._alphabet_distinct, ch)
+            if k == len(self._alphabet_distinct) or self._alphabet_distinct[k] != ch:
+                return 0, 0
+            low = self._alphabet_starts[k]
+            high = self._alphabet_starts[k + 1] if k + 1 < len(self._alphabet_starts) else size
+            start, stop = self._psi_lower_bound(low, high, start), self._psi_lower_bound(low, high, stop)
+            if start >= stop:
+                return 0, 0
+        return start, stop
+
+    def _start_ids(self, start: int, stop: int) -> range:
+        """
+        Returns the ids of the strings whose first suffixes are in the range
+        [start, stop) of suffix array positions. Each string's first suffix is
+        marked in `_psi_starts`, and the ids are ordered like those suffixes,
+        so these are the ranks of the marks in the range.
+        """
+        if start >= stop:
+            return range(0)
+        first = self._psi_starts.rank(start - 1) if start > 0 else 0
+        return range(first, self._psi_starts.rank(stop - 1))
+
+    def _psi_lower_bound(self, low: int, high: int, value: int) -> int:
+        """
+        Returns the first position in [low, high) whose psi is at least
+        `value` (or `high`), given that psi is increasing on that range.
+        """
+        while low < high:
+            mid = (low + high) >> 1
+            if self._psi[mid] < value:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def count(self, pattern: str) -> int:
+        """
+        Returns the number of occurrences of `pattern` in the strings.
+        """
+        start, stop = self._search(pattern)
+        return stop - start
+
+    def locate(self, pattern: str) -> List[Tuple[int, int]]:
+        """
+        Returns the (string id, offset) pairs of the occurrences of `pattern`
+        in the strings, in sorted order.
+
+        Each occurrence follows psi forward to the next sampled position or
+        to the end of its string, which takes at most `sa_sampling_rate`
+        steps. The occurrences take their steps together, with
+        `Permutation.get_many`.
+        """
+        start, stop = self._search(pattern)
+        result: List[Tuple[int, int]] = []
+        positions: Iterable[int] = range(start, stop)
+        steps = 0
+        while True:
+            remaining = []
+            for pos in positions:
+                if pos < self._size:
+                    # The end character of a string.
+                    result.append((self._end_string_ids[pos], self._end_lengths[pos] - steps))
+                elif self._is_sampled[pos]:
+                    sample = self._is_sampled.rank(pos) - 1
+                    result.append((self._sample_string_ids[sample], self._sample_offsets[sample] - steps))
+                else:
+                    remaining.append(pos)
+            if not remaining:
+                break
+            positions = self._psi.get_many(remaining)
+            steps += 1
+        result.sort()
+        return result
+
+    def documents_containing(self, pattern: str, limit: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Returns an iterator over the (string id, number of occurrences) pairs
+        of the distinct strings that contain `pattern`, in increasing order of
+        id, or only the `limit` strings with the most occurrences, most first
+        (ties in increasing order of id).
+
+        If the index was built with `document_listing`, the strings are
+        listed lazily from the pattern's range of the document array, in
+        O(log(len(self))) rank operations each, without enumerating the
+        occurrences. Otherwise, the call is eager: it locates every
+        occurrence of the pattern up front and counts them per string before
+        returning.
+        """
+        if self._documents is None:
+            items = sorted(Counter(string_id for string_id, _ in self.locate(pattern)).items())
+            if limit is None:
+                return iter(items)
+            return iter(heapq.nsmallest(limit, items, key=lambda item: (-item[1], item[0])))
+
+        start, stop = self._search(pattern)
+        if limit is None:
+            return self._documents.range_distinct(start, stop)
+        return self._documents.top_k(start, stop, limit)
+
+    def startswith(self, prefix: str) -> range:
+        """
+        Returns the (lazy, contiguous) range of the ids of the strings that
+        start with `prefix`.
+        """
+        if not prefix:
+            return range(self._size)
+        return self._start_ids(*self._search(prefix))
+
+    def index_range(self, s: str) -> range:
+        """
+        Returns the (contiguous, possibly empty) range of the ids of the
+        copies of `s` in the strings.
+
+        These are the strings whose first suffixes start with `s` followed by
+        the end character, which backward search finds in O(len(s)) binary
+        searches over psi.
+        """
+        if END_CHARACTER in s:
+            return range(0)
+        return self._start_ids(*self._backward_search(s + END_CHARACTER))
+
+    def index(self, s: str) -> int:
+        """
+        Returns the (smallest) id of `s` in the strings, so that
+        `string_index[string_index.index(s)] == s`. Raises a ValueError if it
+        is not one of them.
+        """
+        ids = self.index_range(s)
+        if not ids:
+            raise ValueError(f"{s!r} is not in the index")
+        return ids[0]
+
+    def __contains__(self, s: str) -> bool:
+        return len(self.index_range(s)) > 0
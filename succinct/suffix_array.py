@@ -0,0 +1,195 @@
+from array import array
+from collections import Counter
+from itertools import compress, islice
+from operator import gt
+from typing import List, Optional, Sequence
+
+
+def _index_typecode(size: int) -> str:
+    """
+    Returns the smallest array typecode that holds positions into a text of
+    the given size (and -1).
+    """
+    return 'i' if size < 2 ** 31 else 'q'
+
+
+def _bucket_heads(counts: List[int]) -> List[int]:
+    heads = []
+    total = 0
+    for count in counts:
+        heads.append(total)
+        total += count
+    return heads
+
+
+def _bucket_tails(counts: List[int]) -> List[int]:
+    """
+    Returns the (exclusive) end of each bucket.
+    """
+    tails = []
+    total = 0
+    for count in counts:
+        total += count
+        tails.append(total)
+    return tails
+
+
+def _induce(
+    text: "array[int]",
+    is_s_type: bytearray,
+    counts: List[int],
+    suffix_array: "array[int]"
+) -> None:
+    """
+    Induces the order of the L-type suffixes from the S-type suffixes already
+    in `suffix_array`, scanning left to right, and then that of the S-type
+    suffixes from the L-type ones, scanning right to left.
+    """
+    heads = _bucket_heads(counts)
+    # Iterating over an array sees the values written ahead of the current
+    # position, in either direction.
+    for i in suffix_array:
+        j = i - 1
+        if j >= 0 and not is_s_type[j]:
+            c = text[j]
+            suffix_array[heads[c]] = j
+            heads[c] += 1
+
+    tails = _bucket_tails(counts)
+    for i in reversed(suffix_array):
+        j = i - 1
+        if j >= 0 and is_s_type[j]:
+            c = text[j]
+            tails[c] -= 1
+            suffix_array[tails[c]] = j
+
+
+def _sais(text: "array[int]", alphabet_size: int) -> "array[int]":
+    """
+    "Two Efficient Algorithms for Linear Time Suffix Array Construction" by
+    Nong, Zhang, and Chan.
+
+    The text must end with a 0, which occurs nowhere else, and every other
+    value must be in [1, alphabet_size).
+    """
+    n = len(text)
+    typecode = _index_typecode(n)
+    if n == 1:
+        return array(typecode, [0])
+
+    # Suffix i is S-type if it is smaller than suffix i + 1, and L-type
+    # otherwise. The sentinel is S-type.
+    reversed_types = bytearray([1])
+    is_s = 1
+    for next_c, c in zip(reversed(text), islice(reversed(text), 1, None)):
+        is_s = 1 if c < next_c or (c == next_c and is_s) else 0
+        reversed_types.append(is_s)
+    is_s_type = reversed_types[::-1]
+    del reversed_types
+
+    # The leftmost S-type positions of runs of S-type suffixes.
+    lms_positions = array(typecode, compress(range(1, n), map(gt, islice(is_s_type, 1, None), is_s_type)))
+    is_lms = bytearray(n)
+    for i in lms_positions:
+        is_lms[i] = 1
+
+    counts = [0] * alphabet_size
+    for c, count in Counter(text).items():
+        counts[c] = count
+
+    # Sort the LMS substrings by inducing from the LMS positions in any order.
+    suffix_array = array(typecode, [-1]) * n
+    tails = _bucket_tails(counts)
+    for i in reversed(lms_positions):
+        c = text[i]
+        tails[c] -= 1
+        suffix_array[tails[c]] = i
+    _induce(text, is_s_type, counts, suffix_array)
+
+    # Name the LMS substrings by their rank, giving equal substrings equal
+    # names. LMS positions are at least two apart, so `i // 2` is unique.
+    # Two LMS substrings (from an LMS position up to and including the next
+    # one) with the same characters also have the same types, since the
+    # types are determined from right to left, starting from the S-type
+    # last character.
+    substring_ends = array(typecode, [n - 1]) * (n // 2 + 1)
+    for i, next_i in zip(lms_positions, islice(lms_positions, 1, None)):
+        substring_ends[i // 2] = next_i
+    names = array(typecode, [-1]) * (n // 2 + 1)
+    name = -1
+    previous_substring = None
+    for i in suffix_array:
+        if not is_lms[i]:
+            continue
+        substring = text[i:substring_ends[i // 2] + 1]
+        # The sentinel is unique (its substring is the only one of length 1).
+        if substring != previous_substring or len(substring) == 1:
+            name += 1
+        names[i // 2] = name
+        previous_substring = substring
+    # Only the names are needed from here on, and the suffix array is built
+    # anew from the sorted LMS suffixes.
+    del suffix_array
+    del is_lms
+    del substring_ends
+    num_names = name + 1
+
+    reduced_text = array(typecode, (names[i // 2] for i in lms_positions))
+    del names
+    if num_names < len(lms_positions):
+        reduced_suffix_array = _sais(reduced_text, num_names)
+    else:
+        # Every LMS substring is distinct, so they are already sorted.
+        reduced_suffix_array = array(typecode, [0]) * len(lms_positions)
+        for i, name in enumerate(reduced_text):
+            reduced_suffix_array[name] = i
+    del reduced_text
+
+    # Place the sorted LMS suffixes at the ends of their buckets, and induce
+    # the order of every other suffix from them.
+    suffix_array = array(typecode, [-1]) * n
+    tails = _bucket_tails(counts)
+    for reduced_i in reversed(reduced_suffix_array):
+        i = lms_positions[reduced_i]
+        c = text[i]
+        tails[c] -= 1
+        suffix_array[tails[c]] = i
+    _induce(text, is_s_type, counts, suffix_array)
+    return suffix_array
+
+
+def sais(text: Sequence[int], *, alphabet_size: Optional[int] = None) -> "array[int]":
+    """
+    Returns the suffix array of a sequence of integers in [0, alphabet_size)
+    (an `array`, for instance), i.e., the starting positions of its suffixes
+    in lexicographic order, where a suffix that is a prefix of another sorts
+    first. This is the linear time SA-IS algorithm.
+    """
+    if alphabet_size is None:
+        alphabet_size = max(text, default=-1) + 1
+    if len(text) > 0 and not (0 <= min(text) and max(text) < alphabet_size):
+        raise ValueError(f"The values are not in [0, {alphabet_size})")
+    # Shift the values by one to make room for a unique, smallest sentinel.
+    shifted = array(_index_typecode(max(len(text), alphabet_size) + 1), map((1).__add__, text))
+    shifted.append(0)
+    suffix_array = _sais(shifted, alphabet_size + 1)
+    del shifted
+    # The sentinel suffix always sorts first.
+    del suffix_array[0]
+    return suffix_array
+
+
+def suffix_array_sais(s: str) -> "array[int]":
+    """
+    Returns the suffix array of `s`, ordering its characters by code point
+    (like `suffix_array_ManberMyers` in `succinct.string_index`), built with
+    SA-IS over the ranks of the distinct characters.
+    """
+    # Rank the characters from 1, leaving 0 for the sentinel.
+    ranks = {c: rank for rank, c in enumerate(sorted(set(s)), 1)}
+    text = array(_index_typecode(len(s) + 1), map(ranks.__getitem__, s))
+    text.append(0)
+    suffix_array = _sais(text, len(ranks) + 1)
+    del text
+    del suffix_array[0]
+    return suffix_array
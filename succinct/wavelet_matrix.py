@@ -0,0 +1,319 @@
+import heapq
+from array import array
+from itertools import compress, repeat
+from operator import and_, rshift
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from bitarray import bitarray
+
+from succinct.bit_vector import BitVector, BitVectorFactory
+from succinct.poppy import Poppy
+
+
+class WaveletMatrix:
+    """
+    "The Wavelet Matrix" by Claude, Navarro, and Ordóñez.
+
+    Represents a sequence of nonnegative integers with one bit array per bit of
+    the largest value (most significant bit first), using about n·log(σ) bits
+    plus the overhead of the bit arrays, which `bit_vector_factory` builds
+    (`Poppy` by default). At each level, the values are stably
+    partitioned by the current bit, with all of the 0s before all of the 1s.
+
+    Positions are zero-based. As with the bit arrays in this package, `rank`
+    counts up to and including the given position. Ranges of positions
+    (`range_count`, `quantile`) are half open, as are ranges of values.
+    """
+    def __init__(
+        self,
+        values: Iterable[int],
+        *,
+        max_value: Optional[int] = None,
+        bit_vector_factory: BitVectorFactory = Poppy
+    ) -> None:
+        # The values of each level are held in an array, and partitioned
+        # with `compress` rather than one value at a time.
+        try:
+            current = array('Q', values)
+        except OverflowError:
+            raise ValueError("The values must be nonnegative 64-bit integers") from None
+        self._size = len(current)
+        largest = max(current, default=0)
+        if max_value is None:
+            max_value = largest
+        elif largest > max_value:
+            raise ValueError(
+                f"The value '{largest}' is not in the range [0, {max_value}]"
+            )
+        self._num_levels = max(1, max_value.bit_length())
+
+        self._levels: List[BitVector] = []
+        self._num_zeros: List[int] = []
+        for level in range(self._num_levels):
+            shift = self._num_levels - 1 - level
+            bits = bitarray()
+            bits.extend(map(and_, map(rshift, current, repeat(shift)), repeat(1)))
+            self._levels.append(bit_vector_factory(bits))
+            zeros = array('Q', compress(current, ~bits))
+            self._num_zeros.append(len(zeros))
+            zeros.extend(compress(current, bits))
+            current = zeros
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self.access_many(range(self._size))
+
+    def __getitem__(self, key: int) -> int:
+        return self.access(key)
+
+    def _rank_one(self, level: int, p: int) -> int:
+        """
+        The number of 1 bits in positions [0, p) of the given level.
+        """
+        return self._levels[level].rank(p - 1) if p > 0 else 0
+
+    def _rank_zero(self, level: int, p: int) -> int:
+        """
+        The number of 0 bits in positions [0, p) of the given level.
+        """
+        return p - self._rank_one(level, p)
+
+    def _follow(self, level: int, bit: int, p: int) -> int:
+        """
+        Maps position p (or the boundary before it) from the given level to the
+        next level, along the side chosen by `bit`.
+        """
+        if bit:
+            return self._num_zeros[level] + self._rank_one(level, p)
+        return self._rank_zero(level, p)
+
+    def access(self, i: int) -> int:
+        """
+        Returns the value at position i.
+        """
+        if not (0 <= i < self._size):
+            raise IndexError(f"Index out of bounds: {i}")
+        value = 0
+        for level in range(self._num_levels):
+            bit = int(self._levels[level][i])
+            value = (value << 1) | bit
+            i = self._follow(level, bit, i)
+        return value
+
+    def rank(self, c: int, i: int) -> int:
+        """
+        Returns the number of occurrences of `c` in positions [0, i].
+        """
+        if not (0 <= i < self._size):
+            raise IndexError(f"Index out of bounds: {i}")
+        if not (0 <= c < (1 << self._num_levels)):
+            return 0
+        start, end = self._value_range(c, 0, i + 1)
+        return end - start
+
+    def _value_range(self, c: int, start: int, end: int) -> Tuple[int, int]:
+        """
+        Follows the path of `c` from positions [start, end) of the first level
+        to the range of the bottom level that holds the occurrences of `c`.
+        """
+        for level in range(self._num_levels):
+            bit = (c >> (self._num_levels - 1 - level)) & 1
+            start = self._follow(level, bit, start)
+            end = self._follow(level, bit, end)
+        return start, end
+
+    def select(self, c: int, k: int) -> int:
+        """
+        Returns the position of the k-th (zero-based) occurrence of `c`.
+        If no such occurrence exists, -1 is returned.
+        """
+        if k < 0 or not (0 <= c < (1 << self._num_levels)):
+            return -1
+        start, end = self._value_range(c, 0, self._size)
+        if start + k >= end:
+            return -1
+        return self._select_from_bottom(c, start + k)
+
+    def _select_from_bottom(self, c: int, p: int) -> int:
+        for level in reversed(range(self._num_levels)):
+            bit = (c >> (self._num_levels - 1 - level)) & 1
+            if bit:
+                p = self._levels[level].select(p - self._num_zeros[level])
+            else:
+                p = self._levels[level].select_zero(p)
+        return p
+
+    def count_less(self, i: int, j: int, x: int) -> int:
+        """
+        Returns the number of values less than `x` in positions [i, j).
+        """
+        i, j = max(0, i), min(j, self._size)
+        if i >= j or x <= 0:
+            return 0
+        if x >= (1 << self._num_levels):
+            return j - i
+
+        count = 0
+        for level in range(self._num_levels):
+            bit = (x >> (self._num_levels - 1 - level)) & 1
+            if bit:
+                count += self._rank_zero(level, j) - self._rank_zero(level, i)
+            i = self._follow(level, bit, i)
+            j = self._follow(level, bit, j)
+        return count
+
+    def range_count(self, i: int, j: int, lo: int, hi: int) -> int:
+        """
+        Returns the number of values v with lo <= v < hi in positions [i, j).
+        """
+        if lo >= hi:
+            return 0
+        return self.count_less(i, j, hi) - self.count_less(i, j, lo)
+
+    def quantile(self, i: int, j: int, k: int) -> int:
+        """
+        Returns the k-th (zero-based) smallest value in positions [i, j).
+        """
+        i, j = max(0, i), min(j, self._size)
+        if not (0 <= k < j - i):
+            raise IndexError(f"There is no value of rank {k} in positions [{i}, {j})")
+
+        value = 0
+        for level in range(self._num_levels):
+            zeros = self._rank_zero(level, j) - self._rank_zero(level, i)
+            bit = 0 if k < zeros else 1
+            if bit:
+                k -= zeros
+            value = (value << 1) | bit
+            i = self._follow(level, bit, i)
+            j = self._follow(level, bit, j)
+        return value
+
+    def _children(self, level: int, i: int, j: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """
+        Returns the ranges of the next level that hold the values with a 0 bit
+        and with a 1 bit at the given level, among positions [i, j) of it.
+        """
+        zeros_i, zeros_j = self._rank_zero(level, i), self._rank_zero(level, j)
+        num_zeros = self._num_zeros[level]
+        return (zeros_i, zeros_j), (num_zeros + i - zeros_i, num_zeros + j - zeros_j)
+
+    def range_distinct(self, i: int, j: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields each distinct value in positions [i, j) with its number of
+        occurrences there, in increasing order of value. Only the nodes whose
+        ranges are not empty are visited, so each value takes O(log σ) rank
+        operations, however often it occurs.
+        """
+        i, j = max(0, i), min(j, self._size)
+        if i >= j:
+            return
+        # Each entry holds a level, the bits of the values above it, and a
+        # nonempty range of it.
+        stack = [(0, 0, i, j)]
+        while stack:
+            level, value, i, j = stack.pop()
+            if level == self._num_levels:
+                yield value, j - i
+                continue
+            (zeros_i, zeros_j), (ones_i, ones_j) = self._children(level, i, j)
+            if ones_i < ones_j:
+                stack.append((level + 1, (value << 1) | 1, ones_i, ones_j))
+            if zeros_i < zeros_j:
+                stack.append((level + 1, value << 1, zeros_i, zeros_j))
+
+    def top_k(self, i: int, j: int, k: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the (at most) k most frequent values in positions [i, j) with
+        their numbers of occurrences there, most frequent first and ties in
+        increasing order of value.
+
+        This is the greedy algorithm of "New algorithms on wavelet trees and
+        applications to information retrieval" by Gagie, Navarro, and
+        Puglisi: the nodes are expanded in decreasing order of the size of
+        their ranges, so a value is reported as soon as its leaf is reached.
+        """
+        i, j = max(0, i), min(j, self._size)
+        if i >= j or k <= 0:
+            return
+        # Entries are ordered by size, then by the smallest value below the
+        # node (with leaves first), and hold the level and the range.
+        heap = [(i - j, 0, 0, i, j)]
+        while heap:
+            negative_size, low, negative_level, i, j = heapq.heappop(heap)
+            level = -negative_level
+            if level == self._num_levels:
+                yield low, j - i
+                k -= 1
+                if k == 0:
+                    return
+                continue
+            (zeros_i, zeros_j), (ones_i, ones_j) = self._children(level, i, j)
+            if zeros_i < zeros_j:
+                heapq.heappush(heap, (zeros_i - zeros_j, low, -level - 1, zeros_i, zeros_j))
+            if ones_i < ones_j:
+                one = low | (1 << (self._num_levels - 1 - level))
+                heapq.heappush(heap, (ones_i - ones_j, one, -level - 1, ones_i, ones_j))
+
+    def access_many(self, positions: Iterable[int]) -> List[int]:
+        """
+        Returns the values at the given positions. The positions are processed
+        one level at a time.
+        """
+        current = list(positions)
+        for i in current:
+            if not (0 <= i < self._size):
+                raise IndexError(f"Index out of bounds: {i}")
+
+        values = [0] * len(current)
+        for level in range(self._num_levels):
+            bit_array = self._levels[level]
+            for idx, i in enumerate(current):
+                bit = int(bit_array[i])
+                values[idx] = (values[idx] << 1) | bit
+                current[idx] = self._follow(level, bit, i)
+        return values
+
+    def rank_many(self, c: int, positions: Iterable[int]) -> List[int]:
+        """
+        Returns `rank(c, i)` for each of the given positions, following the
+        path of `c` one level at a time.
+        """
+        ends = [i + 1 for i in positions]
+        for end in ends:
+            if not (1 <= end <= self._size):
+                raise IndexError(f"Index out of bounds: {end - 1}")
+        if not (0 <= c < (1 << self._num_levels)):
+            return [0] * len(ends)
+
+        start = 0
+        for level in range(self._num_levels):
+            bit = (c >> (self._num_levels - 1 - level)) & 1
+            start = self._follow(level, bit, start)
+            ends = [self._follow(level, bit, end) for end in ends]
+        return [end - start for end in ends]
+
+    def select_many(self, c: int, ks: Iterable[int]) -> List[int]:
+        """
+        Returns `select(c, k)` for each of the given ranks, following the path
+        of `c` back up one level at a time.
+        """
+        ks = list(ks)
+        if not (0 <= c < (1 << self._num_levels)):
+            return [-1] * len(ks)
+        start, end = self._value_range(c, 0, self._size)
+
+        positions = [start + k if 0 <= k < end - start else -1 for k in ks]
+        for level in reversed(range(self._num_levels)):
+            bit = (c >> (self._num_levels - 1 - level)) & 1
+            bit_array = self._levels[level]
+            num_zeros = self._num_zeros[level]
+            positions = [
+                -1 if p < 0 else
+                bit_array.select(p - num_zeros) if bit else
+                bit_array.select_zero(p)
+                for p in positions
+            ]
+        return positions
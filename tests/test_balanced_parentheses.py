@@ -0,0 +1,109 @@
+import pickle
+from typing import Dict, List, Optional
+from unittest import mock
+
+import pytest
+from bitarray import bitarray
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from succinct import balanced_parentheses
+from succinct.balanced_parentheses import BalancedParenthesesTree
+from succinct.louds import LoudsBinaryTree
+
+
+def _random_parents(data: st.DataObject, num_nodes: int) -> List[int]:
+    """
+    A random tree, with the nodes labeled in random order. Deep paths are
+    favored so that searches cross many blocks.
+    """
+    labels = data.draw(st.permutations(range(num_nodes)))
+    parents = [-1] * num_nodes
+    for i in range(1, num_nodes):
+        parent = data.draw(st.one_of(st.just(i - 1), st.integers(min_value=0, max_value=i - 1)))
+        parents[labels[i]] = labels[parent]
+    return parents
+
+
+@given(st.data(), st.integers(min_value=1, max_value=150))
+@settings(deadline=None)
+def test_balanced_parentheses_tree(data: st.DataObject, num_nodes: int) -> None:
+    parents = _random_parents(data, num_nodes)
+    # Tiny blocks so that the range min-max tree is exercised.
+    with mock.patch.object(balanced_parentheses, "BLOCK_SIZE", 16):
+        tree, order = BalancedParenthesesTree.from_parents(parents)
+    assert len(tree) == num_nodes
+    assert sorted(order) == list(range(num_nodes))
+
+    ids = {node: i for i, node in enumerate(order)}
+    parent_of: List[Optional[int]] = [None] * num_nodes
+    for node, parent in enumerate(parents):
+        if parent != -1:
+            parent_of[ids[node]] = ids[parent]
+
+    def ancestors(i: int) -> List[int]:
+        path = [i]
+        while parent_of[path[-1]] is not None:
+            path.append(parent_of[path[-1]])  # type: ignore
+        return path
+
+    sizes: Dict[int, int] = {i: 0 for i in range(num_nodes)}
+    for i in range(num_nodes):
+        for a in ancestors(i):
+            sizes[a] += 1
+
+    for i in range(num_nodes):
+        path = ancestors(i)
+        assert tree.parent(i) == parent_of[i]
+        assert tree.depth(i) == len(path) - 1
+        assert tree.subtree_size(i) == sizes[i]
+        assert tree.is_leaf(i) == (sizes[i] == 1)
+        for d in range(len(path) + 1):
+            assert tree.level_ancestor(i, d) == (path[d] if d < len(path) else None)
+
+        children = [j for j in range(num_nodes) if parent_of[j] == i]
+        assert tree.first_child(i) == (children[0] if children else None)
+        for k, child in enumerate(children):
+            assert tree.next_sibling(child) == (children[k + 1] if k + 1 < len(children) else None)
+
+        p = tree._open(i)
+        assert tree.find_close(p) == p + 2 * sizes[i] - 1
+        assert tree.enclose(p) == (-1 if i == 0 else tree._open(path[1]))
+
+    for i in data.draw(st.lists(st.integers(min_value=0, max_value=num_nodes - 1), max_size=20)):
+        for j in data.draw(st.lists(st.integers(min_value=0, max_value=num_nodes - 1), max_size=5)):
+            common = set(ancestors(i))
+            expected = next(a for a in ancestors(j) if a in common)
+            assert tree.lca(i, j) == expected
+            assert tree.is_ancestor(i, j) == (i in ancestors(j))
+
+
+def test_balanced_parentheses_tree_from_louds_binary_tree() -> None:
+    # 0 has children 1 and 2, 1 has a right child 3, and 2 has a left child 4.
+    children = {0: (1, 2), 1: (None, 3), 2: (4, None), 3: (None, None), 4: (None, None)}
+    louds = LoudsBinaryTree(
+        root=0,
+        get_left_child=lambda n: children[n][0],
+        get_right_child=lambda n: children[n][1]
+    )
+    tree, louds_ids, preorder_ids = BalancedParenthesesTree.from_louds(louds)
+    assert list(louds_ids) == [0, 1, 3, 2, 4]
+    for louds_id in range(5):
+        assert louds_ids[preorder_ids[louds_id]] == louds_id
+    assert tree.lca(preorder_ids[3], preorder_ids[4]) == preorder_ids[0]
+    assert tree.subtree_size(preorder_ids[1]) == 2
+
+    copy = pickle.loads(pickle.dumps(tree))
+    assert copy.lca(2, 4) == 0
+
+
+def test_balanced_parentheses_tree_invalid() -> None:
+    for bits in ["", "10" + "10", "1100" + "0", "0110"]:
+        with pytest.raises(ValueError):
+            BalancedParenthesesTree(bitarray(bits))
+
+    tree = BalancedParenthesesTree(bitarray("110100"))
+    with pytest.raises(ValueError):
+        tree.find_close(2)
+    with pytest.raises(IndexError):
+        tree.depth(3)
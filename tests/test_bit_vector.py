@@ -0,0 +1,180 @@
+from typing import List
+
+import pytest
+from bitarray import bitarray
+from hypothesis import assume, example, given, settings
+from hypothesis import strategies as st
+
+from succinct.bit_vector import (
+    AdaptiveBitVectorFactory,
+    BitArrayStatistics,
+    BitVectorPolicy,
+    candidates,
+    choose_bit_vector,
+    make_bit_vector,
+    minimize_query_cost,
+    minimize_space
+)
+from succinct.directly_addressable_codes import DirectlyAddressableCodes
+from succinct.louds import LoudsOrdinalTree
+from succinct.louds_trie import LoudsTrie
+from succinct.monotone_runs_array import MonotoneRunsArray
+from succinct.permutation import Permutation
+from succinct.string_index import StringIndex
+from succinct.wavelet_matrix import WaveletMatrix
+
+
+def test_bit_array_statistics() -> None:
+    stats = BitArrayStatistics.from_bit_array(bitarray('0011101000'))
+    assert stats.size == 10
+    assert stats.num_ones == 4
+    assert stats.num_zeros == 6
+    assert stats.num_runs == 5
+    assert stats.num_one_runs == 2
+    assert stats.num_zero_runs == 3
+
+    stats = BitArrayStatistics.from_bit_array(bitarray())
+    assert stats.num_runs == 0
+
+
+def test_choose_bit_vector_sparse() -> None:
+    bits = bitarray(1 << 16)
+    bits.setall(False)
+    for i in range(0, len(bits), 4099):
+        bits[i] = True
+    assert choose_bit_vector(bits).name == "elias_fano"
+    assert choose_bit_vector(bits, policy=minimize_query_cost).name == "poppy"
+
+
+def test_choose_bit_vector_few_runs() -> None:
+    bits = bitarray('0' * 5000 + '1' * 3000 + '0' * 8000)
+    assert choose_bit_vector(bits).name in ("run_length_encoded", "compressed_runs")
+
+
+def test_choose_bit_vector_clustered_medium_density() -> None:
+    # Alternating stretches of sparse and dense bits, with many short runs.
+    bits = bitarray()
+    for i in range(4000):
+        if i % 3 == 0:
+            bits.extend('110111101101111')
+        else:
+            bits.extend('000010000000000')
+    assert choose_bit_vector(bits).name == "rrr"
+
+
+def test_choose_bit_vector_dense() -> None:
+    bits = bitarray()
+    bits.frombytes(bytes(range(256)) * 16)
+    assert choose_bit_vector(bits).name == "poppy"
+
+
+@given(
+    st.binary(min_size=8, max_size=2000),
+    st.sampled_from([minimize_space, minimize_query_cost])
+)
+@settings(max_examples=200, deadline=None)
+@example(bb=bytes([0] * 64), policy=minimize_space)
+@example(bb=bytes([255] * 64), policy=minimize_space)
+def test_make_bit_vector(bb: bytes, policy: BitVectorPolicy) -> None:
+    assume(len(bb) % 8 == 0)
+
+    bits = bitarray()
+    bits.frombytes(bb)
+    expected = bitarray(bits)
+    bit_vector = make_bit_vector(bits, policy=policy)
+
+    assert len(bit_vector) == len(expected)
+    num_ones = 0
+    for i in range(len(expected)):
+        assert bit_vector[i] == expected[i]
+        if expected[i]:
+            num_ones += 1
+        assert bit_vector.rank(i) == num_ones
+        assert bit_vector.rank_zero(i) == i + 1 - num_ones
+
+    num_zeros = len(expected) - num_ones
+    assert bit_vector.select(-1) == -1
+    assert bit_vector.select(num_ones) == -1
+    assert bit_vector.select_zero(-1) == -1
+    assert bit_vector.select_zero(num_zeros) == -1
+
+
+@pytest.mark.parametrize(
+    "bits", ['', '1' * 30 + '0' * 39, '0' * 10, '1' * 10, '0110100010111']
+)
+def test_candidates_select_out_of_range(bits: str) -> None:
+    num_ones = bits.count('1')
+    num_zeros = len(bits) - num_ones
+    for candidate in candidates(BitArrayStatistics.from_bit_array(bitarray(bits))):
+        bit_vector = candidate.factory(bitarray(bits))
+        ones = [bit_vector.select(rank) for rank in range(num_ones)]
+        zeros = [bit_vector.select_zero(rank) for rank in range(num_zeros)]
+        assert ones == [i for i, bit in enumerate(bits) if bit == '1'], candidate.name
+        assert zeros == [i for i, bit in enumerate(bits) if bit == '0'], candidate.name
+        for rank in (-1, num_ones, num_ones + 1):
+            assert bit_vector.select(rank) == -1, candidate.name
+        for rank in (-1, num_zeros, num_zeros + 1):
+            assert bit_vector.select_zero(rank) == -1, candidate.name
+
+
+@given(
+    st.integers(min_value=1, max_value=70)
+    .map(lambda x: list(range(x))).flatmap(st.permutations)
+)
+@settings(max_examples=100, deadline=None)
+def test_permutation_with_adaptive_factory(values: List[int]) -> None:
+    permutation = Permutation(values, bit_vector_factory=AdaptiveBitVectorFactory())
+
+    for i, value in enumerate(values):
+        assert permutation.index_of(value) == i
+        assert permutation[i] == value
+
+
+def test_string_index_with_adaptive_factory() -> None:
+    strings = ["banana", "bandana", "cabana", "ananas"]
+    string_index = StringIndex(
+        strings,
+        bit_vector_factory=AdaptiveBitVectorFactory(minimize_query_cost)
+    )
+    assert set(string_index) == set(strings)
+
+
+@given(st.lists(st.integers(min_value=0, max_value=40), max_size=200))
+@settings(max_examples=100, deadline=None)
+def test_bit_vector_users_with_adaptive_factory(values: List[int]) -> None:
+    factory = AdaptiveBitVectorFactory(minimize_space)
+
+    wavelet_matrix = WaveletMatrix(values, bit_vector_factory=factory)
+    assert list(wavelet_matrix) == values
+    for c in set(values):
+        assert wavelet_matrix.rank_many(c, range(len(values))) == [
+            values[:i + 1].count(c) for i in range(len(values))
+        ]
+        assert wavelet_matrix.select(c, values.count(c) - 1) == len(values) - 1 - values[::-1].index(c)
+
+    codes = DirectlyAddressableCodes(values, chunk_width=2, bit_vector_factory=factory)
+    assert list(codes) == values
+    assert [codes[i] for i in range(len(values))] == values
+
+    runs = MonotoneRunsArray(values, bit_vector_factory=factory)
+    assert [runs[i] for i in range(len(values))] == values
+
+
+def test_louds_with_adaptive_factory() -> None:
+    factory = AdaptiveBitVectorFactory(minimize_space)
+    parents = [-1, 0, 0, 0, 1, 1, 3, 6, 6, 6]
+    tree, order = LoudsOrdinalTree.from_parents(parents, bit_vector_factory=factory)
+    expected, expected_order = LoudsOrdinalTree.from_parents(parents)
+    assert list(order) == list(expected_order)
+    assert tree.degrees() == expected.degrees()
+    for i in range(len(parents)):
+        assert list(tree.children(i)) == list(expected.children(i))
+        assert tree.parent(i) == expected.parent(i)
+        assert tree.child_rank(i) == expected.child_rank(i)
+
+    keys = ["", "f", "far", "fas", "fast", "fat", "s", "top", "toy", "trie", "trip", "try"]
+    trie = LoudsTrie(keys, bit_vector_factory=factory)
+    assert list(trie) == keys
+    assert [trie.lookup(key) for key in keys] == list(range(len(keys)))
+    assert [trie.reverse_lookup(i) for i in range(len(keys))] == keys
+    assert trie.successor("fb") == keys.index("s")
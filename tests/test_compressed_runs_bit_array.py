@@ -1,11 +1,14 @@
 from datetime import timedelta
+from random import Random
 from typing import List
+from unittest import mock
 
 from bitarray import bitarray
 from hypothesis import assume, example, given, settings
 from hypothesis import strategies as st
 
 from succinct.compressed_runs_bit_array import CompressedRunsBitArray
+from succinct.elias_fano_bit_array import EliasFanoBitArray
 
 
 def test_compressed_runs_bit_array_rank_example_1a() -> None:
@@ -204,6 +207,8 @@ def test_compressed_runs_bit_array_getitem(bb: bytes) -> None:
 
     for i in range(len(bits)):
         assert crba[i] == bits[i]
+    assert crba.to_bitarray() == bits
+    assert list(crba) == list(bits)
 
 
 @given(st.binary(min_size=8, max_size=10000))
@@ -270,3 +275,48 @@ def test_compressed_runs_bit_array_select_zero(bb: bytes) -> None:
 
     for i, pos in enumerate(select_zero_answers):
         assert crba.select_zero(i) == pos
+
+
+@given(st.booleans(), st.lists(st.integers(min_value=1, max_value=40), max_size=200), st.integers())
+@settings(max_examples=500, deadline=None)
+@example(first_bit=True, run_lengths=[], seed=0)
+@example(first_bit=False, run_lengths=[5], seed=0)
+def test_compressed_runs_bit_array_batches(first_bit: bool, run_lengths: List[int], seed: int) -> None:
+    random = Random(seed)
+    bits = bitarray()
+    bit = first_bit
+    for run_length in run_lengths:
+        bits.extend([bit] * run_length)
+        bit = not bit
+    assume(len(bits) > 0)
+    crba = CompressedRunsBitArray(bitarray(bits), num_lower_bits=random.choice([None, 0, 4]))
+
+    num_ones = bits.count()
+    num_zeros = len(bits) - num_ones
+    ranks = list(range(-1, num_ones + 1))
+    random.shuffle(ranks)
+    assert crba.select_many(ranks) == [crba.select(rank) for rank in ranks]
+    ranks_zero = list(range(-1, num_zeros + 1))
+    random.shuffle(ranks_zero)
+    assert crba.select_zero_many(ranks_zero) == [crba.select_zero(rank) for rank in ranks_zero]
+
+    positions = random.sample(range(len(bits)), min(len(bits), 50)) + [-1]
+    assert crba.rank_many(positions) == [bits[:i + 1].count() for i in positions]
+
+
+def test_compressed_runs_bit_array_batches_move_forward() -> None:
+    # Every query of a sorted batch is at most one run past the previous one,
+    # so the cursors over the run starts never have to seek again after the
+    # first time.
+    bits = bitarray('1101001110001011110000010110011101' * 20)
+    crba = CompressedRunsBitArray(bitarray(bits))
+    select_from = EliasFanoBitArray.select_from
+    with mock.patch.object(EliasFanoBitArray, 'select_from', autospec=True, side_effect=select_from) as seeks:
+        assert crba.rank_many(range(len(bits))) == [bits[:i + 1].count() for i in range(len(bits))]
+        assert seeks.call_count == 2
+        seeks.reset_mock()
+        assert crba.select_many(range(bits.count())) == list(bits.search(bitarray('1')))
+        assert seeks.call_count == 2
+        seeks.reset_mock()
+        assert crba.select_zero_many(range(len(bits) - bits.count())) == list((~bits).search(bitarray('1')))
+        assert seeks.call_count == 2
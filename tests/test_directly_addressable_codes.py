@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+from hypothesis import example, given, settings
+from hypothesis import strategies as st
+
+from succinct.directly_addressable_codes import DirectlyAddressableCodes
+from succinct.permutation import Permutation
+
+
+@given(
+    st.lists(
+        st.one_of(
+            st.integers(min_value=0, max_value=20),
+            st.integers(min_value=0, max_value=(1 << 70))
+        ),
+        max_size=300
+    ),
+    st.one_of(st.none(), st.integers(min_value=1, max_value=16))
+)
+@settings(max_examples=300, deadline=None)
+@example(values=[], chunk_width=None)
+@example(values=[0, 0, 0], chunk_width=None)
+@example(values=[1, 1000000, 3, 0], chunk_width=3)
+def test_directly_addressable_codes(values: List[int], chunk_width: Optional[int]) -> None:
+    dac = DirectlyAddressableCodes(values, chunk_width=chunk_width)
+
+    assert len(dac) == len(values)
+    assert list(dac) == values
+    for i, value in enumerate(values):
+        assert dac[i] == value
+    assert dac.get_many(reversed(range(len(values)))) == values[::-1]
+
+
+def test_directly_addressable_codes_skewed() -> None:
+    values = [i % 7 for i in range(10000)] + [1 << 40]
+    dac = DirectlyAddressableCodes(values)
+
+    assert dac.chunk_width == 3
+    assert dac.num_levels == 14
+    assert dac[10000] == 1 << 40
+    assert len(dac._chunks[1]) == 1
+
+
+def test_directly_addressable_codes_as_permutation_input() -> None:
+    values = [3, 4, 5, 0, 1, 2, 6, 7]
+    permutation = Permutation(DirectlyAddressableCodes(values))
+    assert [permutation[i] for i in range(len(values))] == values
@@ -0,0 +1,94 @@
+from typing import List, Tuple
+from unittest import mock
+
+from bitarray import bitarray
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from succinct import dynamic_bit_array
+from succinct.dynamic_bit_array import DynamicBitArray
+
+
+def _check(dba: DynamicBitArray, expected: List[bool]) -> None:
+    assert len(dba) == len(expected)
+    assert list(dba) == expected
+
+    ones = [i for i, b in enumerate(expected) if b]
+    zeros = [i for i, b in enumerate(expected) if not b]
+    rank = 0
+    for i, b in enumerate(expected):
+        assert dba[i] == b
+        rank += b
+        assert dba.rank(i) == rank
+        assert dba.rank_zero(i) == i + 1 - rank
+    for i, pos in enumerate(ones):
+        assert dba.select(i) == pos
+    for i, pos in enumerate(zeros):
+        assert dba.select_zero(i) == pos
+    assert dba.select(len(ones)) == -1
+    assert dba.select_zero(len(zeros)) == -1
+
+
+operations = st.lists(
+    st.tuples(
+        st.sampled_from(["insert", "delete", "set"]),
+        st.integers(min_value=0, max_value=10000),
+        st.booleans()
+    ),
+    max_size=300
+)
+
+
+@given(st.lists(st.booleans(), max_size=200), operations)
+@settings(max_examples=300, deadline=None)
+def test_dynamic_bit_array(initial: List[bool], ops: List[Tuple[str, int, bool]]) -> None:
+    # Use tiny nodes so that the tree splits and merges a lot.
+    with mock.patch.object(dynamic_bit_array, "LEAF_CAPACITY", 8), \
+            mock.patch.object(dynamic_bit_array, "MAX_CHILDREN", 8):
+        dba = DynamicBitArray(bitarray(initial))
+        expected = list(initial)
+
+        for op, i, bit in ops:
+            if op == "insert":
+                i %= len(expected) + 1
+                dba.insert(i, bit)
+                expected.insert(i, bit)
+            elif expected:
+                i %= len(expected)
+                if op == "delete":
+                    assert dba.delete(i) == expected.pop(i)
+                else:
+                    dba.set(i, bit)
+                    expected[i] = bit
+
+        _check(dba, expected)
+        assert dba.freeze()._bit_array[:len(expected)] == bitarray(expected)
+
+
+def test_dynamic_bit_array_large() -> None:
+    bits = bitarray('1101000111' * 10000)
+    dba = DynamicBitArray(bits)
+    for i in range(0, 5000, 7):
+        dba.insert(3 * i, True)
+        bits.insert(3 * i, True)
+    for i in range(0, 5000, 11):
+        del dba[2 * i]
+        del bits[2 * i]
+
+    poppy = dba.freeze()
+    assert len(poppy) == len(bits)
+    for i in range(0, len(bits), 97):
+        assert dba[i] == bits[i]
+        assert dba.rank(i) == poppy.rank(i)
+    for i in range(0, bits.count(), 101):
+        assert dba.select(i) == poppy.select(i)
+
+
+def test_dynamic_bit_array_empty() -> None:
+    dba = DynamicBitArray()
+    assert len(dba) == 0
+    assert dba.select(0) == -1
+    dba.append(True)
+    dba.append(False)
+    assert list(dba) == [True, False]
+    assert dba.select_zero(0) == 1
@@ -1,3 +1,4 @@
+import bisect
 from typing import List
 
 from bitarray import bitarray
@@ -60,3 +61,8 @@ def test_elias_fano_lookup(values: List[int]) -> None:
     ef = EliasFano(iter(values), num_values=len(values), max_value=max(values))
     for i, value in enumerate(values):
         assert ef[i] == value
+    assert list(ef) == values
+    for start in (0, len(values) // 2, len(values) - 1, len(values)):
+        assert list(ef.iter_from(start)) == values[start:]
+    for value in range(-1, max(values) + 2):
+        assert ef.bisect_right(value) == bisect.bisect_right(values, value)
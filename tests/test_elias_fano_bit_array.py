@@ -20,6 +20,8 @@ def test_elias_fano_bit_array_bit_array(bb: bytes) -> None:
 
     for i in range(len(bits)):
         assert efba[i] == bits[i]
+    assert efba.to_bitarray() == bits
+    assert list(efba) == list(bits)
 
 
 @given(st.binary(min_size=8, max_size=10000))
@@ -0,0 +1,69 @@
+import bisect
+from typing import List, Set
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from succinct.front_coding import FrontCodedDictionary, _read_varint, _write_varint
+
+
+@given(
+    st.sets(st.text(alphabet="abcé\U0001F600", max_size=8), max_size=80),
+    st.lists(st.text(alphabet="abcdé", max_size=8), max_size=20),
+    st.integers(min_value=1, max_value=5)
+)
+@settings(deadline=None)
+def test_front_coded_dictionary(key_set: Set[str], queries: List[str], bucket_size: int) -> None:
+    keys = sorted(key_set)
+    dictionary = FrontCodedDictionary(iter(keys), bucket_size=bucket_size)
+    assert len(dictionary) == len(keys)
+    assert list(dictionary) == keys
+
+    for key_id, key in enumerate(keys):
+        assert dictionary.extract(key_id) == key
+        assert dictionary.locate(key) == key_id
+        assert key in dictionary
+
+    for query in queries + [key[:-1] for key in keys]:
+        assert dictionary.locate(query) == (keys.index(query) if query in key_set else None)
+        ids = dictionary.prefix_range(query)
+        expected = [key_id for key_id, key in enumerate(keys) if key.startswith(query)]
+        assert list(ids) == expected
+        assert list(dictionary.prefix_iter(query)) == [keys[key_id] for key_id in expected]
+
+    start = len(keys) // 3
+    assert list(dictionary.iter_range(start, start + 7)) == keys[start:start + 7]
+
+
+def test_front_coded_dictionary_paths() -> None:
+    keys = sorted(f"/usr/share/doc/package{i}/README" for i in range(1000))
+    dictionary = FrontCodedDictionary(keys)
+    assert dictionary.size_in_bytes() < sum(len(key) for key in keys) // 2
+    assert dictionary.prefix_range("/usr/share/doc/package99") == range(
+        bisect.bisect_left(keys, "/usr/share/doc/package99"),
+        bisect.bisect_left(keys, "/usr/share/doc/package9:")
+    )
+    assert dictionary.extract(500) == keys[500]
+
+
+def test_front_coded_dictionary_invalid() -> None:
+    empty = FrontCodedDictionary([])
+    assert len(empty) == 0
+    assert empty.locate("") is None
+    assert list(empty) == []
+    assert empty.prefix_range("a") == range(0, 0)
+
+    with pytest.raises(ValueError):
+        FrontCodedDictionary(["b", "a"])
+    with pytest.raises(ValueError):
+        FrontCodedDictionary(["a"], bucket_size=0)
+    with pytest.raises(IndexError):
+        FrontCodedDictionary(["a"]).extract(1)
+
+
+@given(st.integers(min_value=0, max_value=2**70))
+def test_varint(value: int) -> None:
+    data = bytearray(b"x")
+    _write_varint(data, value)
+    assert _read_varint(bytes(data), 1) == (value, len(data))
@@ -1,6 +1,10 @@
 from dataclasses import dataclass
-from succinct.louds import LoudsBinaryTree
-from typing import Dict, Optional
+from succinct.louds import LoudsBinaryTree, LoudsOrdinalTree
+from typing import Dict, List, Optional
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
 
 
 def test_louds_binary_tree() -> None:
@@ -52,3 +56,107 @@ def test_louds_binary_tree() -> None:
 
         if n.left_child is None and n.right_child is None:
             assert louds.is_leaf(n.id)
+
+
+def _random_parents(data: st.DataObject, num_nodes: int) -> List[int]:
+    """
+    A random tree, with the nodes labeled in random order.
+    """
+    labels = data.draw(st.permutations(range(num_nodes)))
+    parents = [-1] * num_nodes
+    for i in range(1, num_nodes):
+        parent = data.draw(st.integers(min_value=0, max_value=i - 1))
+        parents[labels[i]] = labels[parent]
+    return parents
+
+
+@given(st.data(), st.integers(min_value=1, max_value=200))
+@settings(deadline=None)
+def test_louds_ordinal_tree(data: st.DataObject, num_nodes: int) -> None:
+    parents = _random_parents(data, num_nodes)
+    tree, order = LoudsOrdinalTree.from_parents(parents)
+    assert len(tree) == num_nodes
+    assert sorted(order) == list(range(num_nodes))
+    assert parents[order[0]] == -1
+
+    ids = {node: i for i, node in enumerate(order)}
+    expected_children: Dict[int, List[int]] = {i: [] for i in range(num_nodes)}
+    for node, parent in enumerate(parents):
+        if parent != -1:
+            expected_children[ids[parent]].append(ids[node])
+
+    assert tree.degrees() == [len(expected_children[i]) for i in range(num_nodes)]
+    assert tree.parent(0) is None
+    assert tree.child_rank(0) == 0
+    assert tree.next_sibling(0) is None
+    for i in range(num_nodes):
+        children = expected_children[i]
+        assert list(tree.children(i)) == children
+        assert tree.degree(i) == len(children)
+        assert tree.is_leaf(i) == (not children)
+        assert tree.first_child(i) == (children[0] if children else None)
+        assert tree.child(i, len(children)) is None
+        for k, child in enumerate(children):
+            assert tree.child(i, k) == child
+            assert tree.parent(child) == i
+            assert tree.child_rank(child) == k
+            assert tree.next_sibling(child) == (children[k + 1] if k + 1 < len(children) else None)
+
+    # The same tree, given as adjacency lists.
+    adjacency = [[node for node, parent in enumerate(parents) if parent == v] for v in range(num_nodes)]
+    tree2, order2 = LoudsOrdinalTree.from_adjacency(adjacency, root=order[0])
+    assert list(order2) == list(order)
+    assert [tree2.degree(i) for i in range(num_nodes)] == [tree.degree(i) for i in range(num_nodes)]
+
+
+def test_louds_ordinal_tree_invalid() -> None:
+    with pytest.raises(ValueError):
+        LoudsOrdinalTree([])
+    with pytest.raises(ValueError):
+        LoudsOrdinalTree([2, 0])
+    with pytest.raises(ValueError):
+        LoudsOrdinalTree.from_parents([-1, 0, -1])
+    with pytest.raises(ValueError):
+        LoudsOrdinalTree.from_adjacency([[1], [0]])
+    with pytest.raises(ValueError):
+        LoudsOrdinalTree.from_adjacency([[1], [], []])
+
+    tree = LoudsOrdinalTree([3, 0, 0, 0])
+    assert tree.children(0) == range(1, 4)
+    with pytest.raises(IndexError):
+        tree.degree(4)
+
+
+@given(st.data(), st.integers(min_value=1, max_value=200))
+@settings(deadline=None)
+def test_louds_binary_tree_bulk_traversal(data: st.DataObject, num_nodes: int) -> None:
+    # children[i] is [left, right], attached to random free slots.
+    children: List[List[Optional[int]]] = [[None, None]]
+    for i in range(1, num_nodes):
+        free_slots = [(node, side) for node in range(i) for side in range(2) if children[node][side] is None]
+        node, side = data.draw(st.sampled_from(free_slots))
+        children[node][side] = i
+        children.append([None, None])
+
+    louds = LoudsBinaryTree(
+        root=0,
+        get_left_child=lambda n: children[n][0],
+        get_right_child=lambda n: children[n][1]
+    )
+    assert len(louds) == num_nodes
+
+    expected = [(i, louds.get_left_child(i), louds.get_right_child(i)) for i in range(num_nodes)]
+    assert list(louds.level_order()) == expected
+
+    ids = data.draw(st.lists(st.integers(min_value=0, max_value=num_nodes - 1)))
+    assert louds.parents(ids) == [louds.get_parent(i) for i in ids]
+    assert louds.children(ids) == [(louds.get_left_child(i), louds.get_right_child(i)) for i in ids]
+
+    for i in ids:
+        path = louds.get_path(i)
+        assert path[0] == (0, False)
+        assert path[-1][0] == i
+        for (parent, _), (child, is_right_child) in zip(path, path[1:]):
+            assert louds.get_parent(child) == parent
+            assert louds.is_right_child(child) == is_right_child
+            assert (louds.get_right_child(parent) if is_right_child else louds.get_left_child(parent)) == child
@@ -0,0 +1,67 @@
+import bisect
+from typing import List, Set
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from succinct.louds_trie import LoudsTrie
+
+
+keys_strategy = st.sets(st.text(alphabet="abcé\U0001F600", max_size=6), max_size=60)
+queries_strategy = st.lists(st.text(alphabet="abcdé\0", max_size=7), max_size=20)
+
+
+@given(keys_strategy, queries_strategy)
+@settings(deadline=None)
+def test_louds_trie(key_set: Set[str], queries: List[str]) -> None:
+    keys = sorted(key_set)
+    trie = LoudsTrie(iter(keys))
+    assert len(trie) == len(keys)
+    assert list(trie) == keys
+
+    for key_id, key in enumerate(keys):
+        assert trie.lookup(key) == key_id
+        assert key in trie
+        assert trie.reverse_lookup(key_id) == key
+
+    for query in queries + [key[:-1] for key in keys]:
+        assert trie.lookup(query) == (keys.index(query) if query in key_set else None)
+
+        expected = [(key, key_id) for key_id, key in enumerate(keys) if key.startswith(query)]
+        assert list(trie.prefix_iter(query)) == (expected if "\0" not in query else [])
+
+        lower_bound = bisect.bisect_left(keys, query)
+        assert trie.successor(query) == (lower_bound if lower_bound < len(keys) else None)
+        upper_bound = bisect.bisect_right(keys, query)
+        assert trie.predecessor(query) == (upper_bound - 1 if upper_bound > 0 else None)
+
+
+def test_louds_trie_examples() -> None:
+    keys = ["", "f", "far", "fas", "fast", "fat", "s", "top", "toy", "trie", "trip", "try"]
+    trie = LoudsTrie(keys)
+    assert [trie.lookup(key) for key in keys] == list(range(len(keys)))
+    assert trie.lookup("fa") is None
+    assert trie.lookup("tries") is None
+    assert [key for key, _ in trie.prefix_iter("tri")] == ["trie", "trip"]
+    assert [key_id for _, key_id in trie.prefix_iter("fas")] == [3, 4]
+    assert trie.successor("fb") == keys.index("s")
+    assert trie.predecessor("fb") == keys.index("fat")
+    assert trie.successor("u") is None
+    with pytest.raises(IndexError):
+        trie.reverse_lookup(len(keys))
+
+
+def test_louds_trie_invalid() -> None:
+    empty = LoudsTrie([])
+    assert len(empty) == 0
+    assert empty.lookup("") is None
+    assert empty.successor("a") is None
+    assert list(empty.prefix_iter("")) == []
+
+    with pytest.raises(ValueError):
+        LoudsTrie(["b", "a"])
+    with pytest.raises(ValueError):
+        LoudsTrie(["a", "a"])
+    with pytest.raises(ValueError):
+        LoudsTrie(["a\0b"])
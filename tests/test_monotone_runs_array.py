@@ -0,0 +1,35 @@
+from array import array
+from typing import List
+
+import pytest
+from hypothesis import example, given, settings
+from hypothesis import strategies as st
+
+from succinct.monotone_runs_array import MonotoneRunsArray
+
+
+@given(st.lists(st.integers(min_value=0, max_value=1000), max_size=300))
+@settings(max_examples=500, deadline=None)
+@example(values=[])
+@example(values=[0, 0, 0])
+@example(values=[5, 4, 3, 2, 1])
+@example(values=list(range(1000)))
+def test_monotone_runs_array(values: List[int]) -> None:
+    runs = MonotoneRunsArray(values)
+
+    assert len(runs) == len(values)
+    assert runs.num_runs == sum(1 for i in range(len(values)) if i == 0 or values[i] < values[i - 1])
+    assert list(runs) == values
+    for i, value in enumerate(values):
+        assert runs[i] == value
+    assert list(runs.get_many(reversed(range(len(values))))) == values[::-1]
+    # Positions far apart, close together, and repeated, in no order.
+    keys = list(range(len(values) - 1, -1, -50)) + list(range(0, len(values), 3)) + [0, 0] * bool(values)
+    assert list(runs.get_many(keys)) == [values[key] for key in keys]
+    assert list(runs.to_array()) == values
+    assert list(MonotoneRunsArray(array('Q', values))) == values
+
+    with pytest.raises(IndexError):
+        runs[len(values)]
+    with pytest.raises(IndexError):
+        runs.get_many([len(values)])
@@ -0,0 +1,55 @@
+import pickle
+from typing import List
+
+import pytest
+from hypothesis import example, given, settings
+from hypothesis import strategies as st
+
+from succinct.packed_int_array import PackedIntArray
+
+
+@given(st.lists(st.integers(min_value=0, max_value=(1 << 64) - 1), max_size=300))
+@settings(max_examples=500)
+@example(values=[])
+@example(values=[0, 0, 0])
+@example(values=[(1 << 64) - 1] * 3)
+@example(values=list(range(1000)))
+def test_packed_int_array(values: List[int]) -> None:
+    packed = PackedIntArray(values)
+
+    assert len(packed) == len(values)
+    assert list(packed) == values
+    for i, value in enumerate(values):
+        assert packed[i] == value
+    keys = list(range(len(values) - 1, -1, -1)) + list(range(0, len(values), 7)) * 2
+    assert packed.get_many(keys) == [packed[key] for key in keys]
+    assert list(pickle.loads(pickle.dumps(packed))) == values
+
+
+@given(st.integers(min_value=1, max_value=64), st.lists(st.integers(min_value=0), max_size=100))
+@settings(max_examples=500)
+def test_packed_int_array_width(width: int, values: List[int]) -> None:
+    values = [value % (1 << width) for value in values]
+    packed = PackedIntArray(iter(values), width=width)
+
+    assert packed.width == width
+    assert list(packed) == values
+    assert [packed[i] for i in range(len(values))] == values
+    assert packed.get_many(range(len(values))) == values
+
+
+def test_packed_int_array_is_compact() -> None:
+    packed = PackedIntArray(range(1 << 12))
+    assert packed.width == 12
+    assert packed.size_in_bytes() <= (12 * (1 << 12)) // 8 + 8
+
+
+def test_packed_int_array_errors() -> None:
+    with pytest.raises(ValueError):
+        PackedIntArray([4], width=2)
+    with pytest.raises(ValueError):
+        PackedIntArray([-1])
+    with pytest.raises(IndexError):
+        PackedIntArray([1, 2, 3])[3]
+    with pytest.raises(IndexError):
+        PackedIntArray([1, 2, 3]).get_many([0, 3])
@@ -1,7 +1,12 @@
+from array import array
 from typing import List
+from unittest import mock
 
-from succinct.permutation import Permutation
+from succinct import permutation as permutation_module
+from succinct.permutation import Permutation, ShortcutPermutation, adaptive_sort
+from succinct.poppy import Poppy
 
+import pytest
 from hypothesis import given, settings, example
 from hypothesis import strategies as st
 
@@ -23,3 +28,141 @@ def test_permutation_example(values: List[int]) -> None:
     for i, value in enumerate(values):
         assert permutation.index_of(value) == i
         assert permutation[i] == value
+
+
+class _Sequence:
+    """
+    Supports nothing but `__getitem__` and `__len__`.
+    """
+    def __init__(self, values: List[int]) -> None:
+        self._values = values
+
+    def __getitem__(self, key: int) -> int:
+        return self._values[key]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def test_permutation_input_types() -> None:
+    values = [5, 6, 7, 0, 1, 8, 9, 2, 3, 4]
+    # A buffer of 64-bit integers (as from NumPy), and a strided one.
+    buffer = memoryview(array('q', values))
+    strided = memoryview(array('Q', [x for value in values for x in (value, 0)]))[::2]
+    for sequence in [array('Q', values), array('l', values), tuple(values), _Sequence(values), buffer, strided]:
+        permutation = Permutation(sequence)  # type: ignore
+        assert [permutation[i] for i in range(len(values))] == values
+        assert [permutation.index_of(value) for value in values] == list(range(len(values)))
+
+
+def test_permutation_many_runs() -> None:
+    # Every element is a run of its own.
+    values = list(reversed(range(5000)))
+    permutation = Permutation(values)
+    for i in range(0, 5000, 37):
+        assert permutation[i] == values[i]
+        assert permutation.index_of(values[i]) == i
+
+
+@given(
+    st.integers(min_value=1, max_value=70)
+    .map(lambda x: list(range(x))).flatmap(st.permutations),
+    st.data()
+)
+@settings(deadline=None)
+def test_permutation_batches(values: List[int], data: st.DataObject) -> None:
+    permutation = Permutation(values)
+    keys = data.draw(st.lists(st.integers(min_value=0, max_value=len(values) - 1)))
+
+    assert list(permutation.get_many(keys)) == [values[key] for key in keys]
+    assert list(permutation.index_of_many(keys)) == [values.index(key) for key in keys]
+    assert list(permutation.get_many(range(len(values)))) == values
+
+
+@given(
+    st.integers(min_value=1, max_value=70)
+    .map(lambda x: list(range(x))).flatmap(st.permutations),
+    st.data()
+)
+@settings(deadline=None)
+def test_permutation_decode_and_compose(values: List[int], data: st.DataObject) -> None:
+    permutation = Permutation(values)
+    inverse = [0] * len(values)
+    for i, value in enumerate(values):
+        inverse[value] = i
+
+    assert list(permutation.to_array()) == values
+    assert list(permutation.inverse_array()) == inverse
+    # Poppy has no sequential decoding, so its merge bits are read by select.
+    assert list(Permutation(values, bit_vector_factory=Poppy).to_array()) == values
+    assert list(permutation) == values
+
+    other_values = data.draw(st.permutations(list(range(len(values)))))
+    other = Permutation(other_values)
+    assert list(permutation.compose(other).to_array()) == [values[i] for i in other_values]
+
+    exponent = data.draw(st.integers(min_value=-5, max_value=5))
+    expected = list(range(len(values)))
+    for _ in range(abs(exponent)):
+        expected = [(values if exponent > 0 else inverse)[i] for i in expected]
+    assert list(permutation.power(exponent).to_array()) == expected
+
+
+@given(
+    st.integers(min_value=1, max_value=70)
+    .map(lambda x: list(range(x))).flatmap(st.permutations),
+    st.integers(min_value=1, max_value=8)
+)
+@settings(deadline=None)
+def test_shortcut_permutation(values: List[int], period: int) -> None:
+    permutation = ShortcutPermutation(values, period=period)
+    assert len(permutation) == len(values)
+    assert list(permutation) == values
+    for i, value in enumerate(values):
+        assert permutation[i] == value
+        assert permutation.index_of(value) == i
+
+
+def test_shortcut_permutation_from_permutation() -> None:
+    values = list(reversed(range(100))) + list(range(100, 200))
+    permutation = ShortcutPermutation(Permutation(values), period=3)
+    assert [permutation.index_of(value) for value in values] == list(range(200))
+
+    with pytest.raises(ValueError):
+        ShortcutPermutation([0, 2, 2])
+    with pytest.raises(ValueError):
+        ShortcutPermutation([0, 3, 1])
+
+
+@given(st.lists(st.integers(min_value=-5, max_value=5), max_size=60))
+@settings(deadline=None)
+def test_adaptive_sort(values: List[int]) -> None:
+    sorted_values, permutation = adaptive_sort(values)
+    assert sorted_values == sorted(values)
+    for i, value in enumerate(values):
+        assert sorted_values[permutation[i]] == value
+    # Equal values keep their order.
+    order = sorted(range(len(values)), key=values.__getitem__)
+    assert list(permutation.inverse_array()) == order
+    # The merges of the indexes have the same bits as those of the ranks.
+    ranks = [0] * len(values)
+    for rank, i in enumerate(order):
+        ranks[i] = rank
+    assert permutation._merge_bits() == Permutation(ranks)._merge_bits()
+
+    sorted_values, permutation = adaptive_sort(values, key=abs)
+    assert sorted_values == sorted(values, key=abs)
+    assert [values[permutation.index_of(i)] for i in range(len(values))] == sorted_values
+
+
+@given(
+    st.integers(min_value=1, max_value=70)
+    .map(lambda x: list(range(x))).flatmap(st.permutations)
+)
+@settings(deadline=None)
+def test_permutation_chunked_merges(values: List[int]) -> None:
+    # Tiny chunks so that every merge is split.
+    with mock.patch.object(permutation_module, "MERGE_CHUNK_SIZE", 3):
+        permutation = Permutation(values)
+    assert list(permutation.to_array()) == values
+    assert list(permutation.inverse_array()) == sorted(range(len(values)), key=values.__getitem__)
@@ -336,3 +336,4 @@ def test_select_zero_poppy(bb: bytes) -> None:
 
     for i, pos in enumerate(select_zero_answers):
         assert poppy.select_zero(i) == pos
+    assert poppy.select_zero(len(select_zero_answers)) == -1
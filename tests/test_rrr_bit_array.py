@@ -0,0 +1,62 @@
+from typing import List
+
+from bitarray import bitarray
+from hypothesis import example, given, settings
+from hypothesis import strategies as st
+
+from succinct.rrr_bit_array import RRRBitArray
+
+
+@given(st.binary(min_size=0, max_size=2000), st.integers(min_value=0, max_value=7))
+@settings(max_examples=300, deadline=None)
+@example(bb=bytes([42] * 136), trim=0)
+@example(bb=bytes([0] * 1000), trim=3)
+@example(bb=bytes([255] * 1000), trim=5)
+def test_rrr_bit_array(bb: bytes, trim: int) -> None:
+    bits = bitarray()
+    bits.frombytes(bb)
+    del bits[len(bits) - min(trim, len(bits)):]
+    rrr = RRRBitArray(bits)
+
+    assert len(rrr) == len(bits)
+    assert list(rrr) == bits.tolist()
+
+    select_answers: List[int] = []
+    select_zero_answers: List[int] = []
+    for i in range(len(bits)):
+        assert rrr[i] == bits[i]
+        if bits[i]:
+            select_answers.append(i)
+        else:
+            select_zero_answers.append(i)
+        assert rrr.rank(i) == len(select_answers)
+        assert rrr.rank_zero(i) == len(select_zero_answers)
+
+    for i, pos in enumerate(select_answers):
+        assert rrr.select(i) == pos
+    for i, pos in enumerate(select_zero_answers):
+        assert rrr.select_zero(i) == pos
+
+    assert rrr.select(len(select_answers)) == -1
+    assert rrr.select_zero(len(select_zero_answers)) == -1
+
+
+def test_rrr_bit_array_select_samples() -> None:
+    # Enough bits to need several select samples.
+    bits = bitarray('0001' * 20000)
+    rrr = RRRBitArray(bits)
+
+    for i in range(0, 20000, 997):
+        assert rrr.select(i) == 4 * i + 3
+        assert rrr.select_zero(3 * i) == 4 * i
+    assert rrr.rank(len(bits) - 1) == 20000
+
+
+def test_rrr_bit_array_compresses_low_entropy() -> None:
+    bits = bitarray(1 << 15)
+    bits.setall(False)
+    for i in range(0, len(bits), 13):
+        bits[i] = True
+    rrr = RRRBitArray(bits)
+
+    assert len(rrr._offsets) + len(rrr._classes) < 3 * len(bits) // 4
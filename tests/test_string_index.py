@@ -1,8 +1,13 @@
-from typing import List
+from collections import Counter
+from typing import List, Tuple
+from unittest import mock
 
 import hypothesis.strategies as st
+import pytest
 from hypothesis import given, settings, example
 
+from succinct import string_index as string_index_module
+from succinct.monotone_runs_array import MonotoneRunsArray
 from succinct.string_index import StringIndex
 
 
@@ -51,3 +56,135 @@ def test_string_index(strings: List[str]) -> None:
     assert len(strings) == len(string_index)
 
     assert set(string_index) == set(strings)
+
+
+def _occurrences(strings: List[str], pattern: str) -> List[Tuple[int, int]]:
+    return sorted(
+        (string_id, offset)
+        for string_id, string in enumerate(strings)
+        for offset in range(len(string))
+        if string.startswith(pattern, offset)
+    )
+
+
+@given(
+    st.lists(st.text(alphabet=list('abc'), max_size=20), max_size=10),
+    st.text(alphabet=list('abcd'), min_size=1, max_size=3),
+    st.integers(min_value=1, max_value=5)
+)
+@settings(deadline=None)
+def test_string_index_search(strings: List[str], pattern: str, sa_sampling_rate: int) -> None:
+    string_index = StringIndex(strings, sa_sampling_rate=sa_sampling_rate)
+    assert sorted(string_index) == sorted(strings)
+
+    # Ids are assigned by the index, so compare against its own strings.
+    indexed_strings = list(string_index)
+    expected = _occurrences(indexed_strings, pattern)
+    assert string_index.count(pattern) == len(expected)
+    assert string_index.locate(pattern) == expected
+
+    listing_index = StringIndex(strings, sa_sampling_rate=sa_sampling_rate, document_listing=True)
+    assert list(listing_index) == indexed_strings
+    counts = sorted(Counter(string_id for string_id, _ in expected).items())
+    by_frequency = sorted(counts, key=lambda item: (-item[1], item[0]))
+    for index in (string_index, listing_index):
+        assert list(index.documents_containing(pattern)) == counts
+        for limit in (0, 1, 2, len(counts) + 1):
+            assert list(index.documents_containing(pattern, limit)) == by_frequency[:limit]
+
+    assert list(string_index.startswith(pattern)) == [
+        string_id for string_id, string in enumerate(indexed_strings) if string.startswith(pattern)
+    ]
+    assert list(string_index.startswith("")) == list(range(len(strings)))
+
+    for s in set(strings) | {pattern, ""}:
+        ids = [string_id for string_id, string in enumerate(indexed_strings) if string == s]
+        assert list(string_index.index_range(s)) == ids
+        assert (s in string_index) == bool(ids)
+        if ids:
+            assert string_index.index(s) == ids[0]
+        else:
+            with pytest.raises(ValueError):
+                string_index.index(s)
+
+
+def test_string_index_search_errors() -> None:
+    string_index = StringIndex(["abc", "bcd"])
+    assert string_index.count("\0") == 0
+    with pytest.raises(ValueError):
+        string_index.count("")
+    with pytest.raises(ValueError):
+        StringIndex(["a\0b"])
+    assert "a\0b" not in StringIndex(["a", "b"])
+
+
+def test_string_index_lookup_duplicates() -> None:
+    strings = ["ab", "a", "ab", "", "b", "ab", ""]
+    string_index = StringIndex(strings)
+    ids = string_index.index_range("ab")
+    assert len(ids) == 3
+    assert [string_index[i] for i in ids] == ["ab"] * 3
+    assert string_index[string_index.index("")] == ""
+    assert len(string_index.index_range("")) == 2
+    assert "abc" not in string_index
+
+
+@given(
+    st.lists(st.text(alphabet=list('abc'), max_size=20), max_size=10),
+    st.data()
+)
+@settings(deadline=None)
+def test_string_index_get_many(strings: List[str], data: st.DataObject) -> None:
+    string_index = StringIndex(strings)
+    indexed_strings = list(string_index)
+    assert indexed_strings == [string_index[i] for i in range(len(strings))]
+
+    keys = data.draw(st.lists(st.sampled_from(range(len(strings))), max_size=15)) if strings else []
+    expected = [indexed_strings[key] for key in keys]
+    assert string_index.get_many(keys) == expected
+    # Iterate over several batches.
+    with mock.patch.object(string_index_module, 'ITER_BATCH_SIZE', 3):
+        assert list(string_index) == indexed_strings
+
+    with pytest.raises(IndexError):
+        string_index.get_many([len(strings)])
+
+
+@given(
+    st.lists(st.text(alphabet=list('abc'), max_size=30), min_size=1, max_size=10),
+    st.integers(min_value=1, max_value=8),
+    st.data()
+)
+@settings(deadline=None)
+def test_string_index_extract(strings: List[str], sa_sampling_rate: int, data: st.DataObject) -> None:
+    string_index = StringIndex(strings, sa_sampling_rate=sa_sampling_rate)
+    indexed_strings = list(string_index)
+    key = data.draw(st.integers(min_value=0, max_value=len(strings) - 1))
+    start = data.draw(st.integers(min_value=0, max_value=35))
+    stop = data.draw(st.integers(min_value=0, max_value=35))
+    assert string_index.extract(key, start, stop) == indexed_strings[key][start:stop]
+    assert string_index.extract(key, 0, len(indexed_strings[key])) == indexed_strings[key]
+
+    with pytest.raises(IndexError):
+        string_index.extract(len(strings), 0, 1)
+    with pytest.raises(ValueError):
+        string_index.extract(key, -1, 1)
+
+
+@given(
+    st.lists(st.text(alphabet=list('abc'), max_size=20), max_size=10),
+    st.text(alphabet=list('abc'), min_size=1, max_size=3)
+)
+@settings(deadline=None)
+def test_string_index_monotone_runs_psi(strings: List[str], pattern: str) -> None:
+    string_index = StringIndex(strings)
+    runs_index = StringIndex(strings, psi_factory=MonotoneRunsArray)
+    # Psi is increasing within the range of each character, except where the
+    # last suffix wraps around to the first one.
+    assert isinstance(runs_index._psi, MonotoneRunsArray)
+    assert runs_index._psi.num_runs <= len(runs_index._alphabet_distinct) + 1
+
+    indexed_strings = list(string_index)
+    assert list(runs_index) == indexed_strings
+    assert [runs_index[i] for i in range(len(strings))] == indexed_strings
+    assert runs_index.locate(pattern) == string_index.locate(pattern)
@@ -0,0 +1,37 @@
+from typing import List
+
+import pytest
+from hypothesis import given, settings, example
+from hypothesis import strategies as st
+
+from succinct.string_index import suffix_array_ManberMyers
+from succinct.suffix_array import sais, suffix_array_sais
+
+
+@given(st.text(alphabet=list('ab\0c'), max_size=200))
+@settings(max_examples=500, deadline=None)
+@example('')
+@example('banana')
+@example('mmiissiissiippii')
+def test_suffix_array_sais(s: str) -> None:
+    expected = sorted(range(len(s)), key=lambda i: s[i:])
+    assert list(suffix_array_sais(s)) == expected
+    assert list(suffix_array_sais(s + '\0')) == suffix_array_ManberMyers(s + '\0')
+
+
+@given(st.lists(st.integers(min_value=0, max_value=5), max_size=200))
+@settings(deadline=None)
+def test_sais(text: List[int]) -> None:
+    expected = sorted(range(len(text)), key=lambda i: text[i:])
+    assert list(sais(text)) == expected
+    assert list(sais(text, alphabet_size=10)) == expected
+
+
+def test_sais_repetitive_text() -> None:
+    for s in ['a' * 5000, 'ab' * 2500, 'abaababaabaab' * 300]:
+        assert list(suffix_array_sais(s)) == sorted(range(len(s)), key=lambda i: s[i:])
+
+
+def test_sais_out_of_range() -> None:
+    with pytest.raises(ValueError):
+        sais([0, 3, 1], alphabet_size=3)
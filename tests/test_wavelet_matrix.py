@@ -0,0 +1,68 @@
+from collections import Counter
+from typing import List
+
+from hypothesis import example, given, settings
+from hypothesis import strategies as st
+
+from succinct.wavelet_matrix import WaveletMatrix
+
+
+@given(
+    st.lists(st.integers(min_value=0, max_value=40), max_size=200),
+    st.integers(min_value=0, max_value=200),
+    st.integers(min_value=0, max_value=200),
+    st.integers(min_value=0, max_value=45),
+    st.integers(min_value=0, max_value=45)
+)
+@settings(max_examples=300, deadline=None)
+@example(values=[0], i=0, j=1, lo=0, hi=1)
+@example(values=[5, 5, 5, 5], i=1, j=3, lo=5, hi=6)
+def test_wavelet_matrix(values: List[int], i: int, j: int, lo: int, hi: int) -> None:
+    wm = WaveletMatrix(values)
+
+    assert len(wm) == len(values)
+    assert list(wm) == values
+    for p, value in enumerate(values):
+        assert wm.access(p) == value
+
+    for c in set(values) | {41, 64}:
+        occurrences = [p for p, v in enumerate(values) if v == c]
+        assert [wm.rank(c, p) for p in range(len(values))] == [
+            sum(1 for v in values[:p + 1] if v == c) for p in range(len(values))
+        ]
+        assert wm.rank_many(c, range(len(values))) == [
+            wm.rank(c, p) for p in range(len(values))
+        ]
+        for k, p in enumerate(occurrences):
+            assert wm.select(c, k) == p
+        assert wm.select(c, len(occurrences)) == -1
+        assert wm.select_many(c, range(len(occurrences) + 1)) == occurrences + [-1]
+
+    window = values[i:j]
+    assert wm.range_count(i, j, lo, hi) == sum(1 for v in window if lo <= v < hi)
+    for k, value in enumerate(sorted(window)):
+        assert wm.quantile(i, j, k) == value
+
+    counts = sorted(Counter(window).items())
+    assert list(wm.range_distinct(i, j)) == counts
+    by_frequency = sorted(counts, key=lambda item: (-item[1], item[0]))
+    for k in (0, 1, 3, len(counts) + 1):
+        assert list(wm.top_k(i, j, k)) == by_frequency[:k]
+
+
+def test_wavelet_matrix_access_many() -> None:
+    values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8, 9, 7, 9]
+    wm = WaveletMatrix(values, max_value=15)
+    assert wm.access_many([14, 0, 7, 7]) == [9, 3, 6, 6]
+    assert wm.range_count(0, len(values), 3, 6) == 6
+    assert wm.quantile(2, 9, 3) == 5
+
+
+def test_wavelet_matrix_empty() -> None:
+    wm = WaveletMatrix([])
+    assert len(wm) == 0
+    assert list(wm) == []
+    assert wm.select(0, 0) == -1
+    assert wm.range_count(0, 0, 0, 1) == 0
+    assert list(wm.range_distinct(0, 0)) == []
+    assert list(wm.top_k(0, 0, 1)) == []